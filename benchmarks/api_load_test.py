@@ -0,0 +1,148 @@
+"""
+Closed-loop load test of the fraud API: requests per second and p50/p95/p99 latency.
+
+`--concurrency` clients each keep one connection open and send the next request as
+soon as the previous answer arrives, for `--duration` seconds. Either point it at
+running servers:
+
+    python api_load_test.py --flask-url http://127.0.0.1:5000 --asgi-url http://127.0.0.1:8000
+
+or let it start both from fraud_api/src (Flask development server and uvicorn) with
+--start. The default request is a /predict call with zero-valued features, sized
+from the served model's feature list.
+"""
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+
+import numpy as np
+
+API_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'fraud_api', 'src'))
+
+
+def wait_until_up(url, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url + '/', timeout=1):
+                return
+        except OSError:
+            time.sleep(0.5)
+    raise RuntimeError(f'{url} did not come up within {timeout}s')
+
+
+def start_servers(flask_port, asgi_port):
+    """Start the Flask and ASGI servers, return their processes."""
+    flask = subprocess.Popen(
+        [sys.executable, '-m', 'flask', '--app', 'serve_model', 'run', '--port', str(flask_port)],
+        cwd=API_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    asgi = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'serve_model_asgi:app', '--port', str(asgi_port),
+         '--log-level', 'warning'],
+        cwd=API_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return [flask, asgi]
+
+
+def default_payload(url):
+    with urllib.request.urlopen(url + '/model') as response:
+        n_features = len(json.load(response)['feature_names'])
+    return {'features': [0.0] * n_features}
+
+
+def client(url, path, body, deadline, latencies, statuses):
+    parsed = urllib.parse.urlparse(url)
+    connection = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=30)
+    headers = {'Content-Type': 'application/json'}
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            connection.request('POST', path, body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            status = 'error'
+        latencies.append(time.perf_counter() - start)
+        statuses[status] = statuses.get(status, 0) + 1
+    connection.close()
+
+
+def run_load(url, path, payload, concurrency, duration):
+    """Drive `url` for `duration` seconds and return the result summary."""
+    body = json.dumps(payload).encode()
+    deadline = time.perf_counter() + duration
+    # one latency list and status count per client, merged once they are done
+    results = [([], {}) for _ in range(concurrency)]
+    threads = [threading.Thread(target=client, args=(url, path, body, deadline, *result))
+               for result in results]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    latencies = [latency for client_latencies, _ in results for latency in client_latencies]
+    statuses = {}
+    for _, client_statuses in results:
+        for status, count in client_statuses.items():
+            statuses[status] = statuses.get(status, 0) + count
+    ok = statuses.get(200, 0)
+    p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99]) if latencies else [np.nan] * 3
+    return {'requests': len(latencies), 'rps': ok / elapsed, 'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99,
+            'statuses': dict(sorted(statuses.items(), key=str))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--flask-url', help='base URL of a running Flask server')
+    parser.add_argument('--asgi-url', help='base URL of a running ASGI server')
+    parser.add_argument('--start', action='store_true', help='start both servers from fraud_api/src')
+    parser.add_argument('--flask-port', type=int, default=5000)
+    parser.add_argument('--asgi-port', type=int, default=8000)
+    parser.add_argument('--path', default='/predict', help='endpoint to load (POST)')
+    parser.add_argument('--payload', help='JSON request body, or @file to read it from')
+    parser.add_argument('--concurrency', type=int, default=16, help='concurrent clients')
+    parser.add_argument('--duration', type=float, default=10, help='seconds of load per server')
+    args = parser.parse_args()
+
+    processes = []
+    if args.start:
+        processes = start_servers(args.flask_port, args.asgi_port)
+        args.flask_url = f'http://127.0.0.1:{args.flask_port}'
+        args.asgi_url = f'http://127.0.0.1:{args.asgi_port}'
+    servers = [(name, url) for name, url in [('flask', args.flask_url), ('asgi', args.asgi_url)] if url]
+    if not servers:
+        parser.error('give --flask-url and/or --asgi-url, or --start')
+
+    try:
+        for _, url in servers:
+            wait_until_up(url)
+        if args.payload:
+            payload = json.load(open(args.payload[1:])) if args.payload.startswith('@') else json.loads(args.payload)
+        else:
+            payload = default_payload(servers[0][1])
+
+        print(f'{args.concurrency} clients, {args.duration:g}s per server, POST {args.path}')
+        print(f'{"server":<8}{"requests":>10}{"RPS (200)":>11}{"p50 (ms)":>10}{"p95 (ms)":>10}{"p99 (ms)":>10}  statuses')
+        for name, url in servers:
+            # warm up the lazily loaded model before measuring
+            run_load(url, args.path, payload, 1, 1)
+            result = run_load(url, args.path, payload, args.concurrency, args.duration)
+            print(f'{name:<8}{result["requests"]:>10}{result["rps"]:>11.1f}{result["p50_ms"]:>10.2f}'
+                  f'{result["p95_ms"]:>10.2f}{result["p99_ms"]:>10.2f}  {result["statuses"]}')
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == '__main__':
+    main()
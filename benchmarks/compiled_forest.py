@@ -0,0 +1,103 @@
+"""
+Load time, resident memory and latency of the RandomForest: joblib pickle versus compiled node arrays.
+
+Each loader runs in a fresh interpreter so its peak RSS is measured in isolation.
+Run from the benchmarks directory (the src modules log to ../logs):
+
+    python compiled_forest.py --model ../fraud_api/models/RF.pkl
+
+Without --model a 100-tree, unbounded-depth forest is trained on synthetic data
+(15 features, like the e-commerce model) in a temporary directory.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from data_loading import peak_rss_mb  # noqa: E402
+
+LOADERS = ['pickle', 'compiled', 'compiled-mmap']
+
+
+def train_synthetic_model(path, n_rows, n_trees):
+    from sklearn.ensemble import RandomForestClassifier
+
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=(n_rows, 15))
+    y = (x[:, 0] + x[:, 4] * x[:, 7] + rng.normal(size=n_rows) > 2).astype(int)
+    joblib.dump(RandomForestClassifier(n_estimators=n_trees, random_state=42, n_jobs=-1).fit(x, y), path)
+
+
+def median_seconds(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+
+def run_loader(loader, model_path):
+    """Load the model the way `loader` does and print load seconds, peak RSS (MB) and latencies (ms)."""
+    from src.compiled_forest import CompiledForest
+
+    start = time.perf_counter()
+    if loader == 'pickle':
+        model = joblib.load(model_path)
+        # the API predicts one request at a time
+        model.set_params(n_jobs=1)
+    else:
+        model = CompiledForest.load(os.path.splitext(model_path)[0] + '.forest',
+                                    mmap_mode='r' if loader.endswith('mmap') else None)
+    load_s = time.perf_counter() - start
+
+    x = np.random.default_rng(1).normal(size=(1000, model.n_features_in_ if loader == 'pickle'
+                                              else model.n_features))
+    single_ms = median_seconds(lambda: model.predict_proba(x[:1]), 200) * 1000
+    batch_ms = median_seconds(lambda: model.predict_proba(x), 10) * 1000
+    print(f'{load_s} {peak_rss_mb()} {single_ms} {batch_ms}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--model', help='path of a joblib pickled RandomForest (RF.pkl)')
+    parser.add_argument('--rows', type=int, default=50000, help='rows of the synthetic training data')
+    parser.add_argument('--trees', type=int, default=100, help='trees of the synthetic forest')
+    parser.add_argument('--run', choices=LOADERS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        return run_loader(args.run, args.model)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model_path = os.path.join(tmp_dir, 'RF.pkl')
+        if args.model:
+            joblib.dump(joblib.load(args.model), model_path)
+        else:
+            train_synthetic_model(model_path, args.rows, args.trees)
+
+        # one-off export, not part of the startup cost
+        from src.compiled_forest import CompiledForest
+        forest = CompiledForest.from_model_file(model_path)
+        print(f'{len(forest.roots)} trees, {len(forest.left)} nodes, max depth {forest.max_depth}, '
+              f'pickle {os.path.getsize(model_path) / 2**20:.1f} MB, '
+              f'compiled {os.path.getsize(os.path.splitext(model_path)[0] + ".forest") / 2**20:.1f} MB')
+
+        print(f'{"loader":<15}{"load (s)":>10}{"peak RSS (MB)":>16}{"1 row (ms)":>12}{"1000 rows (ms)":>16}')
+        for loader in LOADERS:
+            output = subprocess.run(
+                [sys.executable, __file__, '--run', loader, '--model', model_path],
+                check=True, capture_output=True, text=True).stdout.split()
+            load_s, peak_mb, single_ms, batch_ms = map(float, output[-4:])
+            print(f'{loader:<15}{load_s:>10.3f}{peak_mb:>16.1f}{single_ms:>12.3f}{batch_ms:>16.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+Startup time and resident memory of the API data load: csv versus columnar copy.
+
+Each loader runs in a fresh interpreter so its peak RSS is measured in isolation.
+Run from the benchmarks directory (the src modules log to ../logs):
+
+    python data_loading.py --csv ../data/cleaned_data.csv
+
+Without --csv a synthetic cleaned_data.csv is generated in a temporary directory.
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+API_COLUMNS = ['purchase_time', 'device_id', 'browser', 'country', 'class']
+LOADERS = ['import-only', 'csv', 'feather', 'feather-mmap', 'parquet']
+
+
+def write_synthetic_csv(path, n_rows):
+    rng = np.random.default_rng(0)
+    signup = pd.Timestamp('2015-01-01') + pd.to_timedelta(rng.integers(0, 200 * 86400, n_rows), 's')
+    purchase = signup + pd.to_timedelta(rng.integers(1, 120 * 86400, n_rows), 's')
+    pd.DataFrame({
+        'user_id': rng.integers(1, 400000, n_rows),
+        'transaction_frequency': 1,
+        'signup_time': signup,
+        'purchase_time': purchase,
+        'velocity_check': (purchase - signup).total_seconds(),
+        'purchase_hour': purchase.hour,
+        'purchase_weekday': purchase.dayofweek,
+        'purchase_value': rng.integers(9, 150, n_rows),
+        'device_id': [''.join(chars) for chars in rng.choice(list('ABCDEFGHIJKLMNOPQRSTUVWXYZ'), (n_rows, 13))],
+        'source': rng.choice(['SEO', 'Ads', 'Direct'], n_rows),
+        'browser': rng.choice(['Chrome', 'Safari', 'IE', 'FireFox', 'Opera'], n_rows),
+        'sex': rng.choice(['M', 'F'], n_rows),
+        'age': rng.integers(18, 76, n_rows),
+        'ip_address': rng.uniform(0, 2 ** 32 - 1, n_rows),
+        'country': rng.choice([f'Country{i}' for i in range(180)], n_rows),
+        'class': (rng.random(n_rows) < 0.1).astype(int),
+    }).to_csv(path, index=False)
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB."""
+    try:
+        # VmHWM is reset on exec, unlike ru_maxrss which is inherited from the parent
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_loader(loader, csv_path):
+    """Load the data the way `loader` does and print seconds and peak RSS (MB)."""
+    from src.columnar_data import ColumnarData
+
+    start = time.perf_counter()
+    if loader == 'csv':
+        data = pd.read_csv(csv_path, parse_dates=['purchase_time', 'signup_time'])
+    elif loader != 'import-only':
+        fmt = loader.split('-')[0]
+        data = ColumnarData(csv_path, 'cleaned', fmt=fmt).load(
+            columns=API_COLUMNS, memory_map=loader.endswith('mmap'))
+        # touch the columns the endpoints use
+        data.groupby('browser', observed=True)['class'].sum()
+    elapsed = time.perf_counter() - start
+    peak_mb = peak_rss_mb()
+    print(f'{elapsed} {peak_mb}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--csv', help='path of cleaned_data.csv')
+    parser.add_argument('--rows', type=int, default=130000, help='rows of the synthetic csv')
+    parser.add_argument('--run', choices=LOADERS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        return run_loader(args.run, args.csv)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = args.csv or os.path.join(tmp_dir, 'cleaned_data.csv')
+        if not args.csv:
+            write_synthetic_csv(csv_path, args.rows)
+
+        # one-off conversion, not part of the startup cost
+        from src.columnar_data import ColumnarData
+        for fmt in ['feather', 'parquet']:
+            ColumnarData(csv_path, 'cleaned', fmt=fmt).convert()
+
+        print(f'{"loader":<14}{"load (s)":>10}{"peak RSS (MB)":>16}')
+        for loader in LOADERS:
+            output = subprocess.run(
+                [sys.executable, __file__, '--run', loader, '--csv', csv_path],
+                check=True, capture_output=True, text=True).stdout.split()
+            elapsed, peak_mb = map(float, output[-2:])
+            print(f'{loader:<14}{elapsed:>10.3f}{peak_mb:>16.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Peak memory and time of categorical encoding: encode_data versus encode_data_compact.
+
+Each method runs in a fresh interpreter on the same synthetic frame with a
+high-cardinality device_id; the peak RSS is reset after the frame is built so only
+the encoding is measured (Linux). Run from the benchmarks directory:
+
+    python encoding_memory.py --rows 1000000
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath('..'))
+
+from data_loading import peak_rss_mb  # noqa: E402
+
+METHODS = ['encode_data', 'compact-codes', 'compact-hash', 'compact-frequency', 'compact-target']
+
+
+def current_rss_mb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+
+
+def make_frame(n_rows):
+    rng = np.random.default_rng(0)
+    letters = np.array(list('ABCDEFGHIJKLMNOPQRSTUVWXYZ'))
+    # ~90% distinct device ids, like Fraud_Data.csv
+    devices = np.array([''.join(c) for c in letters[rng.integers(0, 26, (int(n_rows * 0.9), 13))]], dtype=object)
+    return pd.DataFrame({
+        'user_id': rng.permutation(n_rows),
+        'device_id': devices[rng.integers(0, len(devices), n_rows)],
+        'source': rng.choice(['SEO', 'Ads', 'Direct'], n_rows).astype(object),
+        'browser': rng.choice(['Chrome', 'Safari', 'IE', 'FireFox', 'Opera'], n_rows).astype(object),
+        'sex': rng.choice(['M', 'F'], n_rows).astype(object),
+        'purchase_value': rng.integers(9, 150, n_rows),
+        'class': (rng.random(n_rows) < 0.1).astype(int),
+    })
+
+
+def run_method(method, n_rows):
+    from src.encoding import DataProcessing
+
+    dp = DataProcessing(make_frame(n_rows))
+    with open('/proc/self/clear_refs', 'w') as f:
+        # reset the peak RSS to the current RSS
+        f.write('5')
+    before = current_rss_mb()
+    start = time.perf_counter()
+    if method == 'encode_data':
+        dp.encode_data()
+    else:
+        dp.encode_data_compact(method.split('-')[1], high_cardinality_columns=['device_id', 'user_id'],
+                               target='class')
+    elapsed = time.perf_counter() - start
+    print(f'{elapsed} {peak_rss_mb() - before}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--run', choices=METHODS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        return run_method(args.run, args.rows)
+
+    print(f'{"method":<20}{"time (s)":>10}{"extra peak RSS (MB)":>22}')
+    for method in METHODS:
+        output = subprocess.run([sys.executable, __file__, '--run', method, '--rows', str(args.rows)],
+                                check=True, capture_output=True, text=True).stdout.split()
+        elapsed, extra_mb = map(float, output[-2:])
+        print(f'{method:<20}{elapsed:>10.2f}{extra_mb:>22.1f}')
+
+
+if __name__ == '__main__':
+    main()
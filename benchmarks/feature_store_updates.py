@@ -0,0 +1,56 @@
+"""
+Update throughput of the online feature store.
+
+Replays synthetic transactions through OnlineFeatureStore.update and reports
+updates/sec and the number of entities kept. Run from the benchmarks directory
+(the src modules log to ../logs):
+
+    python feature_store_updates.py --rows 500000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath('..'))
+
+from src.feature_store import OnlineFeatureStore  # noqa: E402
+
+
+def make_transactions(n_rows, n_users):
+    rng = np.random.default_rng(0)
+    purchase = pd.Timestamp('2015-01-01') + pd.to_timedelta(np.sort(rng.integers(0, 365 * 86400, n_rows)), 's')
+    signup = purchase - pd.to_timedelta(rng.integers(1, 120 * 86400, n_rows), 's')
+    return pd.DataFrame({
+        'user_id': rng.integers(0, n_users, n_rows),
+        'device_id': rng.integers(0, n_users, n_rows).astype(str),
+        'ip_address': rng.uniform(0, 2 ** 32 - 1, n_rows),
+        'signup_time': signup,
+        'purchase_time': purchase,
+    }).to_dict(orient='records')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--users', type=int, default=50000)
+    args = parser.parse_args()
+
+    transactions = make_transactions(args.rows, args.users)
+    print(f'{"ttl (days)":>10}{"max entities":>14}{"updates/sec":>14}{"users kept":>12}{"evicted":>10}')
+    for ttl_days, max_entities in [(float('inf'), None), (30, None), (30, 10000)]:
+        store = OnlineFeatureStore(ttl=ttl_days * 86400, max_entities=max_entities)
+        start = time.perf_counter()
+        for transaction in transactions:
+            store.update(transaction)
+        elapsed = time.perf_counter() - start
+        stats = store.stats()
+        print(f'{ttl_days:>10}{str(max_entities):>14}{args.rows / elapsed:>14.0f}'
+              f'{stats["user_id"]:>12}{stats["evicted"]:>10}')
+
+
+if __name__ == '__main__':
+    main()
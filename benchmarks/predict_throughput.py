@@ -0,0 +1,64 @@
+"""
+Throughput benchmark for the fraud API: single-row /predict versus /predict_batch.
+
+Start the API first (`python serve_model.py` from fraud_api/src), then run:
+
+    python benchmarks/predict_throughput.py --url http://127.0.0.1:5000
+
+Rows are random feature vectors, the model output is not checked.
+"""
+import argparse
+import http.client
+import json
+import time
+import urllib.parse
+
+import numpy as np
+
+N_FEATURES = 15
+BATCH_SIZES = [1, 10, 100, 1000, 10000]
+
+
+def rows_per_second(connection, path, payloads, rows_per_payload):
+    # one kept-alive connection, the bodies are encoded before timing
+    bodies = [json.dumps(payload).encode() for payload in payloads]
+    headers = {'Content-Type': 'application/json'}
+    start = time.perf_counter()
+    for body in bodies:
+        connection.request('POST', path, body=body, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        if response.status >= 400:
+            raise RuntimeError(f'{path} answered {response.status}')
+    elapsed = time.perf_counter() - start
+    return len(payloads) * rows_per_payload / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--single-requests', type=int, default=500,
+                        help='number of /predict calls for the single-row baseline')
+    parser.add_argument('--rows', type=int, default=20000,
+                        help='approximate number of rows sent per batch size')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    parsed = urllib.parse.urlparse(args.url)
+    connection = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=60)
+
+    single = [{'features': row} for row in rng.normal(size=(args.single_requests, N_FEATURES)).tolist()]
+    baseline = rows_per_second(connection, '/predict', single, 1)
+    print(f'{"endpoint":<16}{"batch size":>12}{"rows/sec":>14}{"speedup":>10}')
+    print(f'{"/predict":<16}{1:>12}{baseline:>14.0f}{1:>10.1f}')
+
+    for batch_size in BATCH_SIZES:
+        n_batches = max(1, args.rows // batch_size)
+        batches = [rng.normal(size=(batch_size, N_FEATURES)).tolist() for _ in range(n_batches)]
+        throughput = rows_per_second(connection, '/predict_batch', batches, batch_size)
+        print(f'{"/predict_batch":<16}{batch_size:>12}{throughput:>14.0f}{throughput / baseline:>10.1f}')
+    connection.close()
+
+
+if __name__ == '__main__':
+    main()
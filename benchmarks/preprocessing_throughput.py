@@ -0,0 +1,77 @@
+"""
+Batch transform throughput: refitting DataProcessing every time versus the fitted artifact.
+
+Run from the benchmarks directory (the src modules log to ../logs):
+
+    python preprocessing_throughput.py --rows 130000
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath('..'))
+
+from src.encoding import DataProcessing  # noqa: E402
+
+
+def make_cleaned_data(n_rows):
+    rng = np.random.default_rng(0)
+    purchase = pd.Timestamp('2015-01-01') + pd.to_timedelta(rng.integers(0, 200 * 86400, n_rows), 's')
+    return pd.DataFrame({
+        'user_id': rng.integers(1, 400000, n_rows),
+        'transaction_frequency': 1,
+        'signup_time': (purchase - pd.Timedelta(days=3)).astype(str).astype(object),
+        'purchase_time': purchase.astype(str).astype(object),
+        'velocity_check': rng.uniform(1, 1e7, n_rows),
+        'purchase_hour': purchase.hour,
+        'purchase_weekday': purchase.dayofweek,
+        'purchase_value': rng.integers(9, 150, n_rows),
+        'device_id': np.array([''.join(c) for c in rng.choice(list('ABCDEFGHIJKLMNOP'), (n_rows, 13))], dtype=object),
+        'source': rng.choice(['SEO', 'Ads', 'Direct'], n_rows).astype(object),
+        'browser': rng.choice(['Chrome', 'Safari', 'IE', 'FireFox', 'Opera'], n_rows).astype(object),
+        'sex': rng.choice(['M', 'F'], n_rows).astype(object),
+        'age': rng.integers(18, 76, n_rows),
+        'ip_address': rng.uniform(0, 2 ** 32 - 1, n_rows),
+        'country': rng.choice([f'Country{i}' for i in range(180)], n_rows).astype(object),
+    })
+
+
+def timed(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=130000)
+    args = parser.parse_args()
+
+    df = make_cleaned_data(args.rows)
+
+    def refit():
+        dp = DataProcessing(df)
+        dp.standardize_data(dp.encode_data())
+
+    preprocessor = DataProcessing(df).fit_preprocessor()
+    records = df.head(2000).to_dict(orient='records')
+
+    refit_s = timed(refit)
+    fitted_s = timed(lambda: preprocessor.transform(df))
+    single_s = timed(lambda: [preprocessor.transform_one(r) for r in records]) / len(records)
+
+    print(f'{"path":<28}{"rows/sec":>14}')
+    print(f'{"refit encode + standardize":<28}{args.rows / refit_s:>14.0f}')
+    print(f'{"fitted transform (batch)":<28}{args.rows / fitted_s:>14.0f}')
+    print(f'{"fitted transform_one":<28}{1 / single_s:>14.0f}   ({single_s * 1e6:.1f} us/row)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Training wall-clock and model size: current xgboost_classifier versus hist + early stopping.
+
+Uses creditcard.csv when given (target `Class`), otherwise a synthetic imbalanced
+dataset. Run from the benchmarks directory (the src modules log to ../logs):
+
+    python xgboost_training.py --csv ../data/creditcard.csv
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import average_precision_score
+
+sys.path.append(os.path.abspath('..'))
+
+from src.model_training import SplitData, TrainData, XGBoostTrials  # noqa: E402
+
+
+def synthetic_data(n_rows):
+    rng = np.random.default_rng(0)
+    x = pd.DataFrame(rng.normal(size=(n_rows, 30)), columns=[f'V{i}' for i in range(30)])
+    score = x['V0'] * 1.5 + x['V1'] - x['V2'] * x['V3'] + rng.normal(size=n_rows)
+    y = pd.Series((score > np.quantile(score, 0.98)).astype(int), name='Class')
+    return x, y
+
+
+def describe(name, model, fit_time, x_test, y_test):
+    booster = model.get_booster()
+    size_kb = len(booster.save_raw('ubj')) / 1024
+    pr_auc = average_precision_score(y_test, model.predict_proba(x_test)[:, 1])
+    print(f'{name:<34}{fit_time:>10.2f}{booster.num_boosted_rounds():>8}{size_kb:>12.0f}{pr_auc:>9.4f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--csv', help='path of creditcard.csv')
+    parser.add_argument('--rows', type=int, default=200000, help='rows of the synthetic dataset')
+    parser.add_argument('--n-jobs', type=int, default=None)
+    args = parser.parse_args()
+
+    if args.csv:
+        df = pd.read_csv(args.csv)
+        x, y = df.drop(columns=['Class']), df['Class']
+    else:
+        x, y = synthetic_data(args.rows)
+    x_train, x_val, x_test, y_train, y_val, y_test = SplitData(x, y).split_data_with_validation()
+
+    print(f'{"configuration":<34}{"fit (s)":>10}{"trees":>8}{"size (KB)":>12}{"PR-AUC":>9}')
+
+    # current configuration, trained on train + validation as before
+    full_x, full_y = pd.concat([x_train, x_val]), pd.concat([y_train, y_val])
+    start = time.perf_counter()
+    model = TrainData(full_x, full_y).xgboost_classifier(n_jobs=args.n_jobs)
+    describe('xgboost_classifier (default)', model, time.perf_counter() - start, x_test, y_test)
+
+    start = time.perf_counter()
+    model = TrainData(x_train, y_train).xgboost_hist_classifier(x_val, y_val, n_jobs=args.n_jobs)
+    describe('hist + early stopping (aucpr)', model, time.perf_counter() - start, x_test, y_test)
+
+    start = time.perf_counter()
+    trials = XGBoostTrials(x_train, y_train, x_val, y_val, n_jobs=args.n_jobs)
+    quantize_time = time.perf_counter() - start
+    for max_depth in (4, 6, 8):
+        start = time.perf_counter()
+        model = trials.train(max_depth=max_depth)
+        describe(f'reused QuantileDMatrix, depth {max_depth}', model, time.perf_counter() - start, x_test, y_test)
+    print(f'(QuantileDMatrix built once in {quantize_time:.2f}s)')
+
+
+if __name__ == '__main__':
+    main()
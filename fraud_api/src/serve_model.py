@@ -1,18 +1,107 @@
-from flask import Flask, request, jsonify
-import joblib
+from flask import Flask, Response, g, request, jsonify
+from collections import OrderedDict
 import pandas as pd
 import shap
 import numpy as np
+import logging
 import os
 import sys
+import threading
+import time
 
 # Add the path to the sys.path
 sys.path.append(os.path.abspath('..'))
+# Project root, for the shared src package
+sys.path.append(os.path.abspath('../..'))
+
+# Configure logging before importing src modules, they fall back to ../logs otherwise
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+from src.ip_geolocation import SortedIPGeolocation  # noqa: E402
+from src.micro_batching import MicroBatcher  # noqa: E402
+from src.aggregate_store import FraudAggregates, records_to_transactions  # noqa: E402
+from src.columnar_data import ColumnarData  # noqa: E402
+from src.feature_store import OnlineFeatureStore  # noqa: E402
+from src.model_registry import ActiveModel, ModelRegistry  # noqa: E402
+from src import instrumentation  # noqa: E402
+
 app = Flask(__name__)
 
-# Load the trained model
-model = joblib.load(
-    'C:/Users/Temp/Desktop/KAI-Projects/Fraud-detection-in-Ecommerce-and-credit-card/fraud_api/models/RF.pkl')
+# Per route request counts and latencies, served at /metrics (METRICS_ENABLED=0 turns them off)
+REQUESTS = instrumentation.REGISTRY.counter(
+    "fraud_api_requests_total", "HTTP requests handled.", ["method", "route", "status"])
+REQUEST_LATENCY = instrumentation.REGISTRY.histogram(
+    "fraud_api_request_duration_seconds", "HTTP request latency.", ["method", "route"])
+
+
+def record_request(method, route, status, seconds):
+    REQUESTS.inc(method=method, route=route, status=str(status))
+    REQUEST_LATENCY.observe(seconds, method=method, route=route)
+
+
+if instrumentation.METRICS_ENABLED:
+    @app.before_request
+    def start_timer():
+        g.request_start = time.perf_counter()
+
+    @app.after_request
+    def observe_request(response):
+        start = g.pop("request_start", None)
+        if start is not None:
+            # the route template keeps the label set bounded
+            route = request.url_rule.rule if request.url_rule else "unmatched"
+            record_request(request.method, route, response.status_code, time.perf_counter() - start)
+        return response
+
+# Locations, overridable through the environment
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+DATA_DIR = os.environ.get("DATA_DIR", os.path.join(PROJECT_DIR, "data"))
+MODEL_REGISTRY = os.environ.get("MODEL_REGISTRY", os.path.join(PROJECT_DIR, "fraud_api", "models", "registry"))
+MODEL_NAME = os.environ.get("MODEL_NAME", "RF")
+# pinned version, the latest registered one by default
+MODEL_VERSION = os.environ.get("MODEL_VERSION") or None
+
+# Served model version: compiled forest, preprocessing artifact and feature order,
+# loaded on first use and replaced without restart through /model/swap
+registry = ModelRegistry(MODEL_REGISTRY)
+
+
+def warm_up(version):
+    # the SHAP explainer is built with the version, before it serves any request
+    with explainer_lock:
+        version_explainer(version)
+
+
+active_model = ActiveModel(registry, MODEL_NAME, MODEL_VERSION, on_load=warm_up)
+
+# /predict_batch calls larger than this use the fitted model's vectorized predict_proba,
+# smaller ones (and /predict) the lower latency compiled forest
+COMPILED_FOREST_MAX_ROWS = int(os.environ.get("COMPILED_FOREST_MAX_ROWS", "100"))
+
+# IP ranges, opened from the prebuilt memory mapped index next to the csv
+geolocation = SortedIPGeolocation.from_csv(os.path.join(DATA_DIR, "IpAddress_to_Country.csv"))
+
+
+# Optional micro-batching of concurrent /predict calls, tuned through the environment
+MICRO_BATCHING = os.environ.get("MICRO_BATCHING", "0") == "1"
+MICRO_BATCH_MAX_SIZE = int(os.environ.get("MICRO_BATCH_MAX_SIZE", "64"))
+MICRO_BATCH_MAX_WAIT_MS = float(os.environ.get("MICRO_BATCH_MAX_WAIT_MS", "2"))
+# time allowed to score a batch, a request waits at most the batching delay plus this
+MICRO_BATCH_PREDICT_BUDGET_MS = float(os.environ.get("MICRO_BATCH_PREDICT_BUDGET_MS", "1000"))
+MICRO_BATCH_TIMEOUT = (MICRO_BATCH_MAX_WAIT_MS + MICRO_BATCH_PREDICT_BUDGET_MS) / 1000
+
+
+def predict_rows(rows, version):
+    # batches are keyed by version, rows are scored by the version they were built for
+    return version.forest.predict(rows)
+
+
+batcher = MicroBatcher(predict_rows, max_batch_size=MICRO_BATCH_MAX_SIZE,
+                       max_wait=MICRO_BATCH_MAX_WAIT_MS / 1000)
+if MICRO_BATCHING:
+    batcher.start()
 
 
 @app.route("/")
@@ -20,68 +109,302 @@ def home():
     return "Fraud Detection Model API is running!"
 
 
+def transaction_features(transaction, version, record=False):
+    """
+    Model input for a raw transaction: online features, country, then the fitted preprocessing.
+
+    The feature store is only updated with `record`, so scoring the same transaction
+    twice (e.g. a retried request) does not count it twice.
+    """
+    if version.preprocessor is None:
+        raise ValueError(f"raw transactions need the preprocessing artifact, {version.version} has none")
+    enriched = {**transaction, **feature_store.update(transaction, record=record)}
+    enriched["country"] = geolocation.lookup(transaction["ip_address"])
+    return version.preprocessor.transform_one(enriched), enriched["country"]
+
+
+def feature_row(values, feature_names):
+    """One record's feature values as floats, rejected unless numeric and of the model's width."""
+    try:
+        row = np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        raise ValueError(f"expected {len(feature_names)} numeric features")
+    if row.shape != (len(feature_names),):
+        raise ValueError(f"expected {len(feature_names)} numeric features, got shape {row.shape}")
+    return row
+
+
+# The route bodies below take the decoded JSON request and return the response
+# payload, shared with the ASGI entry point (serve_model_asgi.py)
+
+def predict_payload(body):
+    response = {}
+    # one version for the whole request, even if a swap happens meanwhile
+    version = active_model.current
+    ip_address = body.get("ip_address")
+    if "transaction" in body:
+        # raw transaction, every model feature is derived server side; {"record": true}
+        # also adds it to the feature store, which makes the call not idempotent
+        input_data, response["country"] = transaction_features(
+            body["transaction"], version, record=bool(body.get("record", False)))
+    elif ip_address is not None:
+        # features are sent without the country, it is derived from the raw ip
+        input_data = list(body["features"])
+        country = geolocation.lookup(ip_address)
+        if country not in country_feature:
+            raise ValueError(f"no known country for ip_address {ip_address}")
+        input_data.insert(version.feature_names.index("country"), country_feature[country])
+        response["country"] = country
+    else:
+        input_data = list(body["features"])
+    # checked before queuing, a malformed row would fail the whole micro batch
+    input_data = feature_row(input_data, version.feature_names)
+    if MICRO_BATCHING:
+        prediction = batcher.submit(input_data, timeout=MICRO_BATCH_TIMEOUT, key=version)
+    else:
+        prediction = version.forest.predict([input_data])[0]
+    response["prediction"] = int(prediction)
+    response["model_version"] = version.version
+    return response
+
+
 @app.route("/predict", methods=["POST"])
 def predict():
     try:
-        input_data = request.json["features"]
-        prediction = model.predict([input_data])[0]
-        return jsonify({"prediction": int(prediction)})
+        return jsonify(predict_payload(request.json))
     except Exception as e:
         return jsonify({"error": str(e)})
 
 
-@app.route("/explain", methods=["POST"])
-def explain():
+def batch_to_matrix(payload, feature_names):
+    """
+    Convert a /predict_batch payload into a 2D feature matrix.
+
+    Two layouts are accepted:
+      - a JSON array of records, each record either a list of feature values in
+        `feature_names` order or an object keyed by feature name;
+      - a columnar object {"columns": {feature_name: [values, ...], ...}}.
+    """
+    if isinstance(payload, dict) and "columns" in payload:
+        columns = payload["columns"]
+        return np.column_stack([np.asarray(columns[name], dtype=np.float64)
+                                for name in feature_names])
+    if not isinstance(payload, list) or not payload:
+        raise ValueError("expected a non-empty JSON array of records or a columnar object")
+    if isinstance(payload[0], dict):
+        payload = [[record[name] for name in feature_names] for record in payload]
+    matrix = np.asarray(payload, dtype=np.float64)
+    if matrix.ndim != 2 or matrix.shape[1] != len(feature_names):
+        raise ValueError(f"each record must have {len(feature_names)} features")
+    return matrix
+
+
+def predict_batch_payload(body):
+    version = active_model.current
+    features = batch_to_matrix(body, version.feature_names)
+    # one vectorized call for the whole batch
+    if len(features) > COMPILED_FOREST_MAX_ROWS:
+        model = version.model
+        proba = model.predict_proba(pd.DataFrame(features, columns=version.feature_names))
+    else:
+        model = version.forest
+        proba = model.predict_proba(features)
+    labels = model.classes_[proba.argmax(axis=1)]
+    fraud_column = list(model.classes_).index(1)
+    return {
+        "probabilities": proba[:, fraud_column].tolist(),
+        "predictions": labels.astype(int).tolist(),
+        "model_version": version.version
+    }
+
+
+@app.route("/predict_batch", methods=["POST"])
+def predict_batch():
+    try:
+        return jsonify(predict_batch_payload(request.get_json()))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+
+def model_info_payload():
+    return {**active_model.current.info(), "available_versions": registry.versions(MODEL_NAME)}
+
+
+def swap_model_payload(body):
+    # {"version": "v3"}, the latest registered version when omitted
+    return active_model.swap((body or {}).get("version")).info()
+
+
+def batching_metrics_payload():
+    return {"enabled": MICRO_BATCHING, **batcher.metrics()}
+
+
+@app.route("/model", methods=["GET"])
+def model_info():
+    return jsonify(model_info_payload())
+
+
+@app.route("/model/swap", methods=["POST"])
+def swap_model():
     try:
-        data = request.get_json()
-        df = pd.DataFrame(data, index=[0])
+        return jsonify(swap_model_payload(request.get_json(silent=True)))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+
+@app.route("/batching_metrics", methods=["GET"])
+def batching_metrics():
+    return jsonify(batching_metrics_payload())
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    # Prometheus text format: request metrics and the timed pipeline stages of this process
+    return Response(instrumentation.REGISTRY.render(), content_type=instrumentation.CONTENT_TYPE)
+
 
-        explainer = shap.Explainer(model, df)
-        shap_values = explainer(df)
+# Running per user / device / ip state used to enrich raw transactions
+FEATURE_STORE_TTL_DAYS = float(os.environ.get("FEATURE_STORE_TTL_DAYS", "90"))
+FEATURE_STORE_MAX_ENTITIES = int(os.environ.get("FEATURE_STORE_MAX_ENTITIES", "1000000"))
+feature_store = OnlineFeatureStore(ttl=FEATURE_STORE_TTL_DAYS * 86400,
+                                   max_entities=FEATURE_STORE_MAX_ENTITIES)
 
-        feature_importance = np.abs(shap_values.values).tolist()
-        return jsonify({"shap_values": feature_importance})
 
+def enrich_payload(transaction):
+    features = feature_store.update(transaction)
+    if transaction.get("ip_address") is not None:
+        features["country"] = geolocation.lookup(transaction["ip_address"])
+    return features
+
+
+@app.route("/enrich", methods=["POST"])
+def enrich():
+    try:
+        return jsonify(enrich_payload(request.get_json()))
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
 
-data = pd.read_csv("C:/Users/Temp/Desktop/KAI-Projects/Fraud-detection-in-Ecommerce-and-credit-card/data/cleaned_data.csv",
-                   parse_dates=["purchase_time", "signup_time"])
+# SHAP explainer of the served version, built when the version is loaded from a fixed
+# sample of the preprocessed training data
+SHAP_BACKGROUND_SIZE = int(os.environ.get("SHAP_BACKGROUND_SIZE", "50"))
+# explainers of the most recently used versions: requests still holding the version
+# served before a swap do not evict the new version's explainer, nor the reverse
+EXPLAINER_CACHE_SIZE = 2
+explainers = OrderedDict()
+explainer_lock = threading.Lock()
+
+
+def version_explainer(version):
+    """TreeExplainer of a model version; called with explainer_lock held."""
+    if version.path in explainers:
+        explainers.move_to_end(version.path)
+        return explainers[version.path]
+    background = pd.read_csv(os.path.join(DATA_DIR, "standard_data.csv"),
+                             usecols=version.feature_names)[version.feature_names]
+    background = background.sample(n=min(SHAP_BACKGROUND_SIZE, len(background)), random_state=42)
+    explainers[version.path] = shap.TreeExplainer(version.model, data=background,
+                                                  feature_perturbation="interventional")
+    while len(explainers) > EXPLAINER_CACHE_SIZE:
+        explainers.popitem(last=False)
+    return explainers[version.path]
+
+
+def class_shap_values(df, version):
+    """SHAP values of every row of `df`, shape (rows, features, classes) for classifiers."""
+    with explainer_lock:
+        values = version_explainer(version).shap_values(df, check_additivity=False)
+    return np.stack(values, axis=-1) if isinstance(values, list) else values
+
+
+def fraud_shap_values(values, version):
+    """The fraud class of `class_shap_values`, shape (rows, features)."""
+    fraud_column = list(version.forest.classes_).index(1)
+    return values[:, :, fraud_column] if values.ndim == 3 else values
+
+
+def explain_payload(data, top_k=None, fraud_only=False):
+    # a single record object, or an array of them for batch explanations
+    records = data if isinstance(data, list) else [data]
+    version = active_model.current
+    df = pd.DataFrame(records)[version.feature_names]
+    values = class_shap_values(df, version)
+    shap_values = fraud_shap_values(values, version)
+
+    if top_k is None:
+        # absolute values, (rows, features, classes) as always unless only the fraud class is asked for
+        return {"shap_values": np.abs(shap_values if fraud_only else values).tolist()}
+
+    # only the k most influential features per row, with their signed contribution
+    top = np.argsort(-np.abs(shap_values), axis=1)[:, :top_k]
+    return {"top_features": [
+        [{"feature": version.feature_names[i], "shap_value": float(row[i])} for i in order]
+        for row, order in zip(shap_values, top)
+    ]}
+
+
+@app.route("/explain", methods=["POST"])
+def explain():
+    try:
+        return jsonify(explain_payload(request.get_json(), request.args.get("top_k", type=int),
+                                       request.args.get("fraud_only", "0") == "1"))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+
+# Only the columns the API needs, from the columnar copy of the csv (built on first use)
+data = ColumnarData(os.path.join(DATA_DIR, "cleaned_data.csv"), "cleaned").load(
+    columns=["purchase_time", "device_id", "browser", "country", "class"])
+
+# Country feature exactly as produced at training time: LabelEncoder codes
+# (sorted category order) standardized with the column's mean and std.
+countries = data["country"].astype(str)
+country_codes = pd.Series(
+    np.arange(countries.nunique()), index=np.sort(countries.unique()))
+encoded_country = countries.map(country_codes)
+country_feature = ((country_codes - encoded_country.mean()) /
+                   encoded_country.std(ddof=0)).to_dict()
+
+
+# Dashboard rollups, computed once and updated incrementally by /ingest
+aggregates = FraudAggregates(data)
+
+
+def cached_response(payload):
+    """JSON response carrying the aggregates' ETag / Last-Modified, 304 when unchanged."""
+    response = jsonify(payload)
+    response.set_etag(aggregates.etag)
+    response.last_modified = aggregates.last_modified
+    return response.make_conditional(request)
 
 
 @app.route("/summary", methods=["GET"])
 def get_summary():
-    total_transactions = len(data)
-    fraud_cases = data["class"].sum()
-    fraud_percentage = round((fraud_cases / total_transactions) * 100, 2)
-
-    summary = {
-        "total_transactions": total_transactions,
-        "fraud_cases": int(fraud_cases),
-        "fraud_percentage": fraud_percentage
-    }
-    return jsonify(summary)
+    return cached_response(aggregates.summary())
 
 
 @app.route("/fraud_trends", methods=["GET"])
 def fraud_trends():
-    trends = data.groupby(data["purchase_time"].dt.date)[
-        "class"].sum().reset_index()
-    trends.columns = ["date", "fraud_cases"]
-    return jsonify(trends.to_dict(orient="records"))
+    return cached_response(aggregates.fraud_trends())
 
 
 @app.route("/fraud_by_device_browser", methods=["GET"])
 def fraud_by_device_browser():
-    device_fraud = data.groupby("device_id")[
-        "class"].sum().nlargest(10).to_dict()
-    browser_fraud = data.groupby("browser")["class"].sum().to_dict()
-
-    return jsonify({
-        "fraud_by_device": device_fraud,
-        "fraud_by_browser": browser_fraud
-    })
+    return cached_response(aggregates.fraud_by_device_browser())
+
+
+def ingest_payload(records):
+    transactions = records_to_transactions(records)
+    aggregates.append(transactions)
+    return {"ingested": len(transactions), "version": aggregates.version}
+
+
+@app.route("/ingest", methods=["POST"])
+def ingest():
+    try:
+        return jsonify(ingest_payload(request.get_json()))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
 
 
 if __name__ == "__main__":
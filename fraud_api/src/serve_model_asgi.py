@@ -0,0 +1,227 @@
+"""
+ASGI entry point of the fraud API, serving the same routes as serve_model.py.
+
+Model work (/predict, /predict_batch, /explain, /ingest, /model/swap) runs on a
+bounded thread pool so the event loop keeps accepting requests; when the pool and
+its queue are full the request is answered 429 straight away, and a call that does
+not finish in time is answered 504. Responses are serialized with orjson. Request
+counts and latencies are recorded per route like in the Flask app and served with
+the pipeline stage timings at /metrics.
+
+Run from fraud_api/src:
+
+    uvicorn serve_model_asgi:app --host 0.0.0.0 --port 8000
+"""
+from contextlib import asynccontextmanager
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, Response
+from starlette.routing import Route
+from werkzeug.http import http_date, parse_date
+import orjson
+import os
+import time
+
+# shared model, feature store and aggregates state, and the route bodies
+import serve_model as api
+from src.inference_pool import InferencePool, PoolSaturated
+from src import instrumentation
+
+# Pool bounds and request timeout, tuned through the environment
+INFERENCE_THREADS = int(os.environ.get("INFERENCE_THREADS", str(os.cpu_count() or 1)))
+INFERENCE_QUEUE_SIZE = int(os.environ.get("INFERENCE_QUEUE_SIZE", "64"))
+REQUEST_TIMEOUT_MS = float(os.environ.get("REQUEST_TIMEOUT_MS", "2000"))
+
+pool = InferencePool(max_workers=INFERENCE_THREADS, max_queue=INFERENCE_QUEUE_SIZE)
+
+
+def orjson_default(value):
+    # dates as HTTP dates, like Flask's jsonify
+    return http_date(value)
+
+
+class ORJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content):
+        return orjson.dumps(content, default=orjson_default,
+                            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS |
+                            orjson.OPT_PASSTHROUGH_DATETIME)
+
+
+async def read_json(request):
+    body = await request.body()
+    return orjson.loads(body) if body else None
+
+
+async def offload(fn, *args, error_status=400):
+    """Run a route body on the inference pool and turn its outcome into a response."""
+    try:
+        return ORJSONResponse(await pool.run(fn, *args, timeout=REQUEST_TIMEOUT_MS / 1000))
+    except PoolSaturated:
+        return ORJSONResponse({"error": "server busy, retry later"}, status_code=429,
+                              headers={"Retry-After": "1"})
+    except TimeoutError:
+        return ORJSONResponse({"error": f"no response within {REQUEST_TIMEOUT_MS:g} ms"}, status_code=504)
+    except Exception as e:
+        return ORJSONResponse({"error": str(e)}, status_code=error_status)
+
+
+async def home(request):
+    return PlainTextResponse("Fraud Detection Model API is running!")
+
+
+async def predict(request):
+    try:
+        body = await read_json(request)
+    except orjson.JSONDecodeError as e:
+        return ORJSONResponse({"error": str(e)})
+    # like the Flask route, errors are reported with a 200 status
+    return await offload(api.predict_payload, body, error_status=200)
+
+
+async def predict_batch(request):
+    try:
+        body = await read_json(request)
+    except orjson.JSONDecodeError as e:
+        return ORJSONResponse({"error": str(e)}, status_code=400)
+    return await offload(api.predict_batch_payload, body)
+
+
+async def explain(request):
+    try:
+        body = await read_json(request)
+        top_k = request.query_params.get("top_k")
+        top_k = int(top_k) if top_k is not None else None
+        fraud_only = request.query_params.get("fraud_only", "0") == "1"
+    except (orjson.JSONDecodeError, ValueError) as e:
+        return ORJSONResponse({"error": str(e)}, status_code=400)
+    return await offload(api.explain_payload, body, top_k, fraud_only)
+
+
+async def enrich(request):
+    try:
+        # O(1) feature store update, cheaper than a hop to the pool
+        return ORJSONResponse(api.enrich_payload(await read_json(request)))
+    except Exception as e:
+        return ORJSONResponse({"error": str(e)}, status_code=400)
+
+
+async def ingest(request):
+    try:
+        body = await read_json(request)
+    except orjson.JSONDecodeError as e:
+        return ORJSONResponse({"error": str(e)}, status_code=400)
+    return await offload(api.ingest_payload, body)
+
+
+async def model_info(request):
+    return await offload(api.model_info_payload)
+
+
+async def swap_model(request):
+    try:
+        body = await read_json(request)
+    except orjson.JSONDecodeError:
+        body = None
+    return await offload(api.swap_model_payload, body)
+
+
+async def batching_metrics(request):
+    return ORJSONResponse(api.batching_metrics_payload())
+
+
+async def pool_metrics(request):
+    return ORJSONResponse(pool.metrics())
+
+
+async def metrics(request):
+    return PlainTextResponse(instrumentation.REGISTRY.render(), media_type=instrumentation.CONTENT_TYPE)
+
+
+def cached_response(request, payload):
+    """JSON response carrying the aggregates' ETag / Last-Modified, 304 when unchanged."""
+    etag = f'"{api.aggregates.etag}"'
+    headers = {"ETag": etag, "Last-Modified": http_date(api.aggregates.last_modified)}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        not_modified = if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]
+    else:
+        since = parse_date(request.headers.get("if-modified-since"))
+        not_modified = since is not None and api.aggregates.last_modified <= since
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    return ORJSONResponse(payload, headers=headers)
+
+
+async def get_summary(request):
+    return cached_response(request, api.aggregates.summary())
+
+
+async def fraud_trends(request):
+    return cached_response(request, api.aggregates.fraud_trends())
+
+
+async def fraud_by_device_browser(request):
+    return cached_response(request, api.aggregates.fraud_by_device_browser())
+
+
+class RequestMetrics:
+    """ASGI middleware recording every HTTP request in the Flask app's request metrics."""
+
+    def __init__(self, app, routes):
+        self.app = app
+        self.paths = {route.path for route in routes}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # every route is a fixed path, anything else is grouped to bound the labels
+            route = scope["path"] if scope["path"] in self.paths else "unmatched"
+            api.record_request(scope["method"], route, status, time.perf_counter() - start)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    pool.shutdown(wait=False)
+
+
+app = Starlette(
+    routes=[
+        Route("/", home),
+        Route("/predict", predict, methods=["POST"]),
+        Route("/predict_batch", predict_batch, methods=["POST"]),
+        Route("/explain", explain, methods=["POST"]),
+        Route("/enrich", enrich, methods=["POST"]),
+        Route("/ingest", ingest, methods=["POST"]),
+        Route("/model", model_info, methods=["GET"]),
+        Route("/model/swap", swap_model, methods=["POST"]),
+        Route("/batching_metrics", batching_metrics, methods=["GET"]),
+        Route("/pool_metrics", pool_metrics, methods=["GET"]),
+        Route("/metrics", metrics, methods=["GET"]),
+        Route("/summary", get_summary, methods=["GET"]),
+        Route("/fraud_trends", fraud_trends, methods=["GET"]),
+        Route("/fraud_by_device_browser", fraud_by_device_browser, methods=["GET"]),
+    ],
+    lifespan=lifespan,
+)
+if instrumentation.METRICS_ENABLED:
+    app.add_middleware(RequestMetrics, routes=app.routes)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host="0.0.0.0", port=int(os.environ.get("PORT", "8000")))
@@ -0,0 +1,97 @@
+"""
+Multi-process serving of the ASGI fraud API with one shared copy of the model.
+
+The parent process imports the app, loads the active model version (its compiled
+forest is memory mapped from the registry) and binds the listening socket, then
+forks WEB_WORKERS uvicorn workers. The workers inherit the mappings, so the model
+arrays live once in the page cache however many workers run; a worker that dies
+is replaced.
+
+Each worker keeps its own online feature store and dashboard aggregates. A model
+swap made through one worker is published to the others, which load the new version
+in the background once a request notices it and switch when it is ready.
+
+Run from fraud_api/src:
+
+    WEB_WORKERS=4 python serve_workers.py
+"""
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+
+import uvicorn
+
+# app, model registry and shared state, loaded once in the parent
+import serve_model_asgi
+import serve_model as api
+
+WEB_WORKERS = int(os.environ.get("WEB_WORKERS", str(os.cpu_count() or 1)))
+HOST = os.environ.get("HOST", "0.0.0.0")
+PORT = int(os.environ.get("PORT", "8000"))
+
+
+def bind_socket(host, port):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(sock):
+    """Serve requests on the inherited socket until terminated; runs in a forked child."""
+    # threads do not survive fork
+    if api.MICRO_BATCHING:
+        api.batcher.start()
+    config = uvicorn.Config(serve_model_asgi.app, lifespan="on", log_level="warning")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def fork_worker(sock):
+    pid = os.fork()
+    if pid == 0:
+        try:
+            run_worker(sock)
+        finally:
+            os._exit(0)
+    return pid
+
+
+def main():
+    # published model version, followed by every worker
+    api.active_model.shared_version = multiprocessing.Array("c", 64)
+    version = api.active_model.current
+    logging.info("Serving %s %s with %d workers on %s:%d",
+                 version.name, version.version, WEB_WORKERS, HOST, PORT)
+    sock = bind_socket(HOST, PORT)
+    workers = {fork_worker(sock) for _ in range(WEB_WORKERS)}
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            os.kill(pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    while workers:
+        try:
+            pid, _ = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        workers.discard(pid)
+        if not stopping:
+            workers.add(fork_worker(sock))
+    sock.close()
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+from datetime import datetime, timezone
+import pandas as pd
+import logging
+import threading
+import uuid
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    filename='../logs/aggregate_store.log'
+)
+
+logging.info(
+    '****************************Logging started for Aggregate Store module****************************')
+
+
+class FraudAggregates:
+    """
+    In-memory rollups of labelled transactions for the dashboard endpoints.
+
+    The totals, fraud cases per purchase date, per device and per browser are computed
+    once from the full dataset and then updated from each appended batch only, so
+    serving them does not depend on the dataset size. Payloads are cached until the
+    next update, and every update bumps `version` / `last_modified` for HTTP caching.
+
+    Attributes:
+    ----------
+    top_devices : int
+        Number of devices reported by `fraud_by_device_browser`.
+    version : int
+        Incremented on every update.
+    last_modified : datetime
+        UTC time of the last update.
+    """
+
+    def __init__(self, data, top_devices=10):
+        self.top_devices = top_devices
+        self.total_transactions = 0
+        self.fraud_cases = 0
+        self.fraud_by_date = {}
+        self.fraud_by_device = {}
+        self.fraud_by_browser = {}
+        self._top_device_ids = []
+        self._store_id = uuid.uuid4().hex[:8]
+        self._lock = threading.Lock()
+        self._payloads = {}
+        self.version = 0
+        self.append(data)
+        logging.info('Aggregates built from %d transactions.', len(data))
+
+    @staticmethod
+    def _add_counts(counts, increments):
+        for key, value in increments.items():
+            counts[key] = counts.get(key, 0) + int(value)
+
+    def _device_rank(self, device_id):
+        # same order as groupby().sum().nlargest(): highest count first, ties by device id
+        return -self.fraud_by_device[device_id], device_id
+
+    def append(self, transactions):
+        """
+        Fold a batch of labelled transactions into the aggregates.
+
+        Parameters:
+        ----------
+        transactions : pd.DataFrame
+            Rows with at least `purchase_time` (datetime), `device_id`, `browser` and `class`.
+        """
+        try:
+            by_date = transactions.groupby(transactions['purchase_time'].dt.date)['class'].sum()
+            by_device = transactions.groupby('device_id', observed=True)['class'].sum()
+            by_browser = transactions.groupby('browser', observed=True)['class'].sum()
+            with self._lock:
+                self.total_transactions += len(transactions)
+                self.fraud_cases += int(transactions['class'].sum())
+                self._add_counts(self.fraud_by_date, by_date)
+                self._add_counts(self.fraud_by_browser, by_browser)
+                self._add_counts(self.fraud_by_device, by_device)
+                # counts never decrease, so only the current leaders and the devices
+                # touched by this batch can make up the new top list
+                candidates = set(self._top_device_ids).union(by_device.index)
+                self._top_device_ids = sorted(candidates, key=self._device_rank)[:self.top_devices]
+                self.version += 1
+                self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+                self._payloads.clear()
+            logging.info('Aggregates updated with %d transactions (version %d).',
+                         len(transactions), self.version)
+        except Exception as e:
+            logging.error(f'Error updating aggregates: {e}')
+            raise
+
+    @property
+    def etag(self):
+        """Entity tag identifying the current state of the aggregates."""
+        return f'{self._store_id}-{self.version}'
+
+    def _cached(self, name, build):
+        with self._lock:
+            if name not in self._payloads:
+                self._payloads[name] = build()
+            return self._payloads[name]
+
+    def summary(self):
+        """Total transactions, fraud cases and fraud percentage."""
+        def build():
+            percentage = self.fraud_cases / self.total_transactions * 100 if self.total_transactions else 0.0
+            return {
+                'total_transactions': self.total_transactions,
+                'fraud_cases': self.fraud_cases,
+                'fraud_percentage': round(percentage, 2)
+            }
+        return self._cached('summary', build)
+
+    def fraud_trends(self):
+        """Fraud cases per purchase date, ordered by date."""
+        return self._cached('fraud_trends', lambda: [
+            {'date': date, 'fraud_cases': cases} for date, cases in sorted(self.fraud_by_date.items())])
+
+    def fraud_by_device_browser(self):
+        """Fraud cases of the top devices and of every browser."""
+        return self._cached('fraud_by_device_browser', lambda: {
+            'fraud_by_device': {device: self.fraud_by_device[device] for device in self._top_device_ids},
+            'fraud_by_browser': dict(self.fraud_by_browser)
+        })
+
+
+def records_to_transactions(records):
+    """Build the DataFrame expected by `FraudAggregates.append` from JSON records."""
+    transactions = pd.DataFrame(records)
+    transactions['purchase_time'] = pd.to_datetime(transactions['purchase_time'])
+    transactions['class'] = transactions['class'].astype(int)
+    return transactions
@@ -0,0 +1,167 @@
+import pandas as pd
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+import logging
+import os
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    filename='../logs/columnar_data.log'
+)
+
+logging.info(
+    '****************************Logging started for Columnar Data module****************************')
+
+
+# Pinned dtypes of the project datasets. Datetime columns are parsed separately.
+SCHEMAS = {
+    'fraud': {
+        'dates': ['signup_time', 'purchase_time'],
+        'dtypes': {
+            'user_id': 'int32', 'purchase_value': 'float32', 'device_id': 'str',
+            'source': 'category', 'browser': 'category', 'sex': 'category', 'age': 'int8',
+            'ip_address': 'uint32', 'class': 'int8'
+        }
+    },
+    'cleaned': {
+        'dates': ['signup_time', 'purchase_time'],
+        'dtypes': {
+            'user_id': 'int32', 'transaction_frequency': 'int32', 'velocity_check': 'float32',
+            'purchase_hour': 'int8', 'purchase_weekday': 'int8', 'purchase_value': 'float32',
+            'device_id': 'str', 'source': 'category', 'browser': 'category', 'sex': 'category',
+            'age': 'int8', 'ip_address': 'uint32', 'country': 'category', 'class': 'int8'
+        }
+    },
+    'ip_ranges': {
+        'dates': [],
+        'dtypes': {
+            'lower_bound_ip_address': 'uint32', 'upper_bound_ip_address': 'uint32',
+            'country': 'category'
+        }
+    },
+    'credit_card': {
+        'dates': [],
+        'dtypes': {
+            'Time': 'float32', **{f'V{i}': 'float32' for i in range(1, 29)},
+            'Amount': 'float32', 'Class': 'int8'
+        }
+    }
+}
+
+FORMATS = {'feather': '.feather', 'parquet': '.parquet'}
+
+
+class ColumnarData:
+    """
+    Columnar (Feather or Parquet) copy of one of the project csv files.
+
+    The csv is converted once with the dataset's pinned compact dtypes (categoricals
+    for low-cardinality strings, 32 bit ids/IPs, float32 values) and later loads read
+    the columnar file instead, optionally only a subset of the columns and, for
+    Feather, memory mapped.
+
+    Attributes:
+    ----------
+    csv_path : str
+        Path of the source csv.
+    dataset : str
+        Key of the dataset in `SCHEMAS`.
+    fmt : str
+        'feather' or 'parquet'.
+    path : str
+        Path of the columnar file, next to the csv.
+    """
+
+    def __init__(self, csv_path, dataset, fmt='feather'):
+        if dataset not in SCHEMAS:
+            raise ValueError(f'unknown dataset {dataset}, expected one of {list(SCHEMAS)}')
+        if fmt not in FORMATS:
+            raise ValueError(f'unknown format {fmt}, expected one of {list(FORMATS)}')
+        self.csv_path = csv_path
+        self.dataset = dataset
+        self.fmt = fmt
+        self.path = os.path.splitext(csv_path)[0] + FORMATS[fmt]
+
+    def read_csv(self, columns=None):
+        """
+        Read the source csv and cast it to the pinned dtypes.
+
+        Parameters:
+        ----------
+        columns : list, optional
+            Columns to read, all columns by default.
+
+        Returns:
+        -------
+        pd.DataFrame
+            The csv content with compact dtypes.
+        """
+        schema = SCHEMAS[self.dataset]
+        dates = [c for c in schema['dates'] if columns is None or c in columns]
+        df = pd.read_csv(self.csv_path, usecols=columns, parse_dates=dates)
+        for column, dtype in schema['dtypes'].items():
+            if column in df.columns:
+                df[column] = df[column].astype(dtype)
+        return df
+
+    def is_stale(self):
+        """True when the columnar file is missing or older than the csv."""
+        return (not os.path.exists(self.path) or
+                os.path.getmtime(self.path) < os.path.getmtime(self.csv_path))
+
+    def convert(self):
+        """
+        Write the columnar copy of the csv.
+
+        Feather files are written uncompressed so they can be memory mapped.
+
+        Returns:
+        -------
+        str
+            Path of the written file.
+        """
+        try:
+            logging.info(f'Converting {self.csv_path} to {self.fmt}')
+            df = self.read_csv()
+            tmp_path = f'{self.path}.{os.getpid()}.tmp'
+            if self.fmt == 'feather':
+                df.to_feather(tmp_path, compression='uncompressed')
+            else:
+                df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, self.path)
+            logging.info(f'{len(df)} rows written to {self.path}')
+            return self.path
+        except Exception as e:
+            logging.error(f'Error converting {self.csv_path} to {self.fmt}: {e}')
+            raise
+
+    def load(self, columns=None, memory_map=False):
+        """
+        Load the dataset from its columnar copy, converting the csv first if needed.
+
+        Parameters:
+        ----------
+        columns : list, optional
+            Columns to load, all columns by default.
+        memory_map : bool, optional
+            Memory map the file instead of reading it into memory.
+
+        Returns:
+        -------
+        pd.DataFrame
+            The requested columns with their pinned dtypes.
+        """
+        try:
+            if self.is_stale():
+                self.convert()
+            if self.fmt == 'feather':
+                table = feather.read_table(self.path, columns=columns, memory_map=memory_map)
+            else:
+                table = pq.read_table(self.path, columns=columns, memory_map=memory_map)
+            df = table.to_pandas()
+            logging.info(f'Loaded {len(df)} rows and {df.shape[1]} columns from {self.path}')
+            return df
+        except Exception as e:
+            logging.error(f'Error loading {self.path}: {e}')
+            raise
@@ -0,0 +1,331 @@
+import numpy as np
+import joblib
+import json
+import logging
+import os
+
+from src.ip_geolocation import file_checksum
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    filename='../logs/compiled_forest.log'
+)
+
+logging.info(
+    '****************************Logging started for Compiled Forest module****************************')
+
+COMPILED_FORMAT_VERSION = 1
+
+# rows evaluated at once, bounds the (rows, trees) node index arrays
+EVAL_CHUNK_ROWS = 4096
+
+
+def _float32_threshold(threshold):
+    """
+    Largest float32 <= each float64 threshold: for float32 inputs, `x <= threshold`
+    gives the same result with either, at half the memory.
+    """
+    rounded = threshold.astype(np.float32)
+    return np.where(rounded > threshold, np.nextafter(rounded, np.float32(-np.inf)), rounded)
+
+
+def _sklearn_trees(model):
+    trees = model.estimators_ if hasattr(model, 'estimators_') else [model]
+    nodes = []
+    for estimator in trees:
+        tree = estimator.tree_
+        value = tree.value[:, 0, :]
+        # sklearn >= 1.4 stores class fractions, older versions raw counts
+        totals = value.sum(axis=1, keepdims=True)
+        totals[totals == 0.0] = 1.0
+        nodes.append({
+            'left': tree.children_left,
+            'right': tree.children_right,
+            'feature': tree.feature,
+            'threshold': _float32_threshold(tree.threshold),
+            'missing_left': getattr(tree, 'missing_go_to_left', np.zeros(tree.node_count, dtype=bool)),
+            'value': value / totals if not np.allclose(totals, 1.0) else value,
+        })
+    return nodes
+
+
+def _xgboost_trees(model):
+    booster = model.get_booster()
+    learner = json.loads(booster.save_raw('json'))['learner']
+    if learner['objective']['name'] != 'binary:logistic':
+        raise ValueError(f"only binary:logistic XGBoost models are supported, got {learner['objective']['name']}")
+    if learner['gradient_booster']['name'] != 'gbtree':
+        raise ValueError('only gbtree XGBoost models are supported')
+    trees = learner['gradient_booster']['model']['trees']
+    try:
+        # predictions of an early stopped model only use the trees up to the best iteration
+        trees = trees[:model.best_iteration + 1]
+    except AttributeError:
+        pass
+    nodes = []
+    for tree in trees:
+        if any(tree['split_type']):
+            raise ValueError('categorical XGBoost splits are not supported')
+        left = np.asarray(tree['left_children'], dtype=np.int32)
+        condition = np.asarray(tree['split_conditions'], dtype=np.float32)
+        # xgboost sends `x < condition` left; for float32 inputs that is
+        # `x <= largest float32 below condition`, the sklearn comparison
+        threshold = np.nextafter(condition, np.float32(-np.inf))
+        nodes.append({
+            'left': left,
+            'right': np.asarray(tree['right_children'], dtype=np.int32),
+            'feature': np.asarray(tree['split_indices'], dtype=np.int32),
+            'threshold': threshold,
+            'missing_left': np.asarray(tree['default_left'], dtype=bool),
+            # leaves keep their weight in split_conditions
+            'value': np.where(left == -1, condition, 0).astype(np.float32)[:, None],
+        })
+    base_score = float(learner['learner_model_param']['base_score'].strip('[]'))
+    base_margin = np.float32(-np.log(np.float32(1.0) / np.float32(base_score) - np.float32(1.0)))
+    return nodes, base_margin
+
+
+def _tree_depth(left, right):
+    depth, frontier = 0, np.array([0])
+    while True:
+        children = np.concatenate([left[frontier], right[frontier]])
+        frontier = children[children >= 0]
+        if not len(frontier):
+            return depth
+        depth += 1
+
+
+class CompiledForest:
+    """
+    Tree ensemble flattened into contiguous NumPy node arrays, with a batched evaluator.
+
+    Every tree of a fitted RandomForest / DecisionTree classifier or binary XGBoost
+    model is stored as rows of shared arrays (split feature, threshold, children,
+    missing value direction, leaf value), tree `t` starting at node `roots[t]`, leaves
+    pointing to themselves. Evaluation moves every (row, tree) pair one level down per
+    step with a handful of vectorized gathers, dropping the pairs that reached a leaf.
+    Thresholds are stored as float32 rounded down, which decides exactly like the
+    float64 thresholds for the float32 inputs the trees are evaluated on.
+
+    Probabilities match the source model: for sklearn forests the per-tree class
+    fractions are summed in tree order and divided by the number of trees, exactly as
+    `predict_proba` does with `n_jobs=1`; for XGBoost the leaf weights are summed in
+    float32 on top of the base margin and passed through the logistic function.
+
+    Attributes:
+    ----------
+    kind : str
+        'average' (sklearn) or 'logistic' (XGBoost).
+    classes_ : np.ndarray
+        Class labels, in `predict_proba` column order.
+    n_features : int
+        Number of input features.
+    max_depth : int
+        Depth of the deepest tree.
+    """
+
+    ARRAYS = ('roots', 'feature', 'threshold', 'left', 'right', 'missing_left', 'value')
+
+    def __init__(self, kind, classes, n_features, max_depth, base_margin=0.0, **arrays):
+        self.kind = kind
+        self.classes_ = np.asarray(classes)
+        self.n_features = n_features
+        self.max_depth = max_depth
+        self.base_margin = np.float32(base_margin)
+        for name in self.ARRAYS:
+            setattr(self, name, arrays[name])
+
+    @classmethod
+    def _from_nodes(cls, kind, classes, n_features, nodes, base_margin=0.0):
+        sizes = np.array([len(tree['left']) for tree in nodes])
+        roots = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int32)
+        feature, threshold, left, right = [], [], [], []
+        for root, tree in zip(roots, nodes):
+            ids = root + np.arange(len(tree['left']), dtype=np.int32)
+            is_leaf = tree['left'] == -1
+            # leaves loop on themselves and always take the (self) left branch
+            left.append(np.where(is_leaf, ids, root + tree['left']).astype(np.int32))
+            right.append(np.where(is_leaf, ids, root + tree['right']).astype(np.int32))
+            feature.append(np.where(is_leaf, 0, tree['feature']).astype(np.int32))
+            threshold.append(np.where(is_leaf, np.inf, tree['threshold']).astype(np.float32))
+        return cls(
+            kind, classes, n_features,
+            max_depth=max(_tree_depth(tree['left'], tree['right']) for tree in nodes),
+            base_margin=base_margin, roots=roots,
+            feature=np.concatenate(feature), threshold=np.concatenate(threshold),
+            left=np.concatenate(left), right=np.concatenate(right),
+            missing_left=np.concatenate([np.asarray(t['missing_left'], dtype=bool) for t in nodes]),
+            value=np.ascontiguousarray(np.concatenate([t['value'] for t in nodes])))
+
+    @classmethod
+    def from_model(cls, model):
+        """
+        Flatten a fitted RandomForestClassifier, DecisionTreeClassifier or XGBClassifier.
+
+        Returns:
+        -------
+        CompiledForest
+            The evaluator, independent of the source model.
+        """
+        try:
+            if hasattr(model, 'get_booster'):
+                nodes, base_margin = _xgboost_trees(model)
+                forest = cls._from_nodes('logistic', model.classes_, model.n_features_in_, nodes, base_margin)
+            elif hasattr(model, 'estimators_') or hasattr(model, 'tree_'):
+                if getattr(model, 'n_outputs_', 1) != 1:
+                    raise ValueError('multi-output forests are not supported')
+                forest = cls._from_nodes('average', model.classes_, model.n_features_in_, _sklearn_trees(model))
+            else:
+                raise ValueError(f'cannot compile a {type(model).__name__}')
+            logging.info(f'Compiled {type(model).__name__}: {len(forest.roots)} trees, '
+                         f'{len(forest.left)} nodes, max depth {forest.max_depth}')
+            return forest
+        except Exception as e:
+            logging.error(f'Error compiling model: {e}')
+            raise
+
+    def _leaves(self, x):
+        n_trees = len(self.roots)
+        # flat (row, tree) pairs; only the pairs not yet at a leaf are moved down
+        leaves = np.tile(self.roots, len(x))
+        offset = np.repeat(np.arange(len(x)) * x.shape[1], n_trees)
+        x_flat = x.ravel()
+        has_missing = np.isnan(x_flat).any()
+        active = np.arange(len(leaves))
+        current = leaves
+        while active.size:
+            values = x_flat[offset[active] + self.feature[current]]
+            go_left = values <= self.threshold[current]
+            if has_missing:
+                go_left = np.where(np.isnan(values), self.missing_left[current], go_left)
+            current = np.where(go_left, self.left[current], self.right[current])
+            at_leaf = self.left[current] == current
+            leaves[active[at_leaf]] = current[at_leaf]
+            active, current = active[~at_leaf], current[~at_leaf]
+        return leaves.reshape(len(x), n_trees)
+
+    def _proba(self, x):
+        leaves = self._leaves(x)
+        if self.kind == 'average':
+            proba = np.zeros((len(x), self.value.shape[1]), dtype=np.float64)
+            # tree by tree, the summation order of sklearn
+            for t in range(leaves.shape[1]):
+                proba += self.value[leaves[:, t]]
+            proba /= leaves.shape[1]
+            return proba
+        margin = np.full(len(x), self.base_margin, dtype=np.float32)
+        for t in range(leaves.shape[1]):
+            margin += self.value[leaves[:, t], 0]
+        fraud = np.float32(1.0) / (np.float32(1.0) + np.exp(-margin))
+        return np.column_stack([np.float32(1.0) - fraud, fraud])
+
+    def predict_proba(self, x):
+        """
+        Class probabilities of every row of `x`.
+
+        Parameters:
+        ----------
+        x : array-like
+            Feature matrix (rows, n_features), in the training column order.
+
+        Returns:
+        -------
+        np.ndarray
+            (rows, classes) probabilities, float64 for sklearn and float32 for XGBoost
+            models, like the source model.
+        """
+        x = np.asarray(x, dtype=np.float32)
+        if x.ndim != 2 or x.shape[1] != self.n_features:
+            raise ValueError(f'expected a 2D input with {self.n_features} features, got shape {x.shape}')
+        if len(x) <= EVAL_CHUNK_ROWS:
+            return self._proba(x)
+        return np.concatenate([self._proba(x[start:start + EVAL_CHUNK_ROWS])
+                               for start in range(0, len(x), EVAL_CHUNK_ROWS)])
+
+    def predict(self, x):
+        """Predicted class label of every row of `x`."""
+        proba = self.predict_proba(x)
+        if self.kind == 'logistic':
+            return self.classes_[(proba[:, 1] > 0.5).astype(int)]
+        return self.classes_.take(np.argmax(proba, axis=1))
+
+    def nbytes(self):
+        """Memory used by the node arrays."""
+        return sum(getattr(self, name).nbytes for name in self.ARRAYS)
+
+    def save(self, path, source_checksum=None):
+        """
+        Write the compiled model with joblib, uncompressed so it can be memory mapped.
+
+        Parameters:
+        ----------
+        path : str
+            Destination file, replaced atomically.
+        source_checksum : bytes, optional
+            Digest of the model file it was compiled from, checked by `from_model_file`.
+        """
+        try:
+            state = {name: getattr(self, name) for name in self.ARRAYS}
+            state.update(format_version=COMPILED_FORMAT_VERSION, kind=self.kind,
+                         classes=self.classes_, n_features=self.n_features,
+                         max_depth=self.max_depth, base_margin=float(self.base_margin),
+                         source_checksum=source_checksum)
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            joblib.dump(state, tmp_path)
+            os.replace(tmp_path, path)
+            logging.info(f'Compiled model written to {path} ({self.nbytes()} bytes of nodes)')
+        except Exception as e:
+            logging.error(f'Error saving compiled model to {path}: {e}')
+            raise
+
+    @classmethod
+    def load(cls, path, mmap_mode='r', source_checksum=None):
+        """
+        Load a compiled model written by `save`.
+
+        Parameters:
+        ----------
+        mmap_mode : str, optional
+            joblib memory map mode of the node arrays, None to read them into memory.
+        source_checksum : bytes, optional
+            Expected digest of the source model; a ValueError is raised on mismatch.
+        """
+        state = joblib.load(path, mmap_mode=mmap_mode)
+        if state.get('format_version') != COMPILED_FORMAT_VERSION:
+            raise ValueError(f'{path} has an unsupported format version')
+        if source_checksum is not None and state['source_checksum'] != source_checksum:
+            raise ValueError(f'{path} was compiled from another model')
+        return cls(state['kind'], state['classes'], state['n_features'], state['max_depth'],
+                   state['base_margin'], **{name: state[name] for name in cls.ARRAYS})
+
+    @classmethod
+    def from_model_file(cls, model_path, compiled_path=None, mmap_mode='r'):
+        """
+        Load the compiled form of a joblib model file, compiling it first if needed.
+
+        The compiled file next to the model (or at `compiled_path`) is used when it was
+        built from the same model file content; otherwise the model is unpickled,
+        compiled and written back.
+
+        Parameters:
+        ----------
+        model_path : str
+            Path of the joblib pickled model.
+        compiled_path : str, optional
+            Path of the compiled file, defaults to the model path with a `.forest` suffix.
+
+        Returns:
+        -------
+        CompiledForest
+            The evaluator, with memory mapped node arrays by default.
+        """
+        if compiled_path is None:
+            compiled_path = os.path.splitext(model_path)[0] + '.forest'
+        checksum = file_checksum(model_path)
+        try:
+            return cls.load(compiled_path, mmap_mode=mmap_mode, source_checksum=checksum)
+        except (OSError, ValueError, KeyError, EOFError) as e:
+            logging.info("Compiling %s: %s", model_path, str(e))
+        cls.from_model(joblib.load(model_path)).save(compiled_path, source_checksum=checksum)
+        return cls.load(compiled_path, mmap_mode=mmap_mode, source_checksum=checksum)
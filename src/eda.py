@@ -1,6 +1,11 @@
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.colors import LogNorm
+from matplotlib.figure import Figure
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import re
 import logging
 import os
 import sys
@@ -34,6 +39,8 @@ class EdaAnalysis:
             Returns a series indicating the number of missing values in each column.
         get_categorical_distribution():
             Returns a dictionary with the distribution of categorical features.
+        profile(chunksize, n_workers), profile_csv(path, chunksize, n_workers):
+            Single pass, chunked versions of the above, see StreamingProfile.
     """
     logging.info('EDA Analysis class created')
 
@@ -127,6 +134,426 @@ class EdaAnalysis:
         logging.info(f'Columns {columns} deleted')
         return self.data
 
+    def profile(self, chunksize=100000, n_workers=1, **profile_options):
+        """
+        Profile `self.data` in one pass over chunks of `chunksize` rows.
+
+        Parameters:
+        ----------
+        chunksize : int, optional
+            Rows per chunk.
+        n_workers : int, optional
+            Processes profiling the chunks.
+        **profile_options
+            `sketch_size`, `heavy_hitters` and `seed` of the StreamingProfile.
+
+        Returns:
+        -------
+        StreamingProfile
+            With describe(), correlation(), missing_values() and categorical_distribution().
+        """
+        logging.info(f'Profiling {len(self.data)} rows in chunks of {chunksize}')
+        try:
+            chunks = (self.data.iloc[start:start + chunksize] for start in range(0, len(self.data), chunksize))
+            return profile_chunks(chunks, n_workers=n_workers, **profile_options)
+        except Exception as e:
+            logging.error(f'Error in profiling data: {e}')
+            raise
+
+    @staticmethod
+    def profile_csv(path, chunksize=100000, n_workers=1, read_csv_kwargs=None, **profile_options):
+        """
+        Profile a csv file in one pass without loading it, e.g. a dataset larger than RAM.
+
+        Parameters:
+        ----------
+        path : str
+            Csv file.
+        chunksize : int, optional
+            Rows read per chunk.
+        n_workers : int, optional
+            Processes profiling the chunks while the next ones are read.
+        read_csv_kwargs : dict, optional
+            Extra `pd.read_csv` arguments, e.g. usecols or dtype.
+
+        The column roles are taken from the first chunk and pinned with a dtype map for
+        the whole file: numerical columns are read as float64, the others (including
+        columns all null in the first chunk) as object, so a later chunk cannot change a
+        column's role. A `dtype` given in `read_csv_kwargs` overrides the pinned ones.
+
+        Returns:
+        -------
+        StreamingProfile
+        """
+        logging.info(f'Profiling {path} in chunks of {chunksize}')
+        try:
+            read_csv_kwargs = dict(read_csv_kwargs or {})
+            dtype = read_csv_kwargs.get('dtype')
+            if dtype is None or isinstance(dtype, dict):
+                first = pd.read_csv(path, nrows=chunksize, **read_csv_kwargs)
+                read_csv_kwargs['dtype'] = {**_pinned_dtypes(first), **(dtype or {})}
+            with pd.read_csv(path, chunksize=chunksize, **read_csv_kwargs) as reader:
+                return profile_chunks(reader, n_workers=n_workers, **profile_options)
+        except Exception as e:
+            logging.error(f'Error in profiling {path}: {e}')
+            raise
+
+
+class QuantileSketch:
+    """
+    Mergeable approximate quantile sketch (a compactor hierarchy, as in KLL).
+
+    Values enter level 0; a level holding more than `k` items is sorted and every
+    other item, from a random offset, moves to the next level with twice the weight.
+    Quantiles are exact until the first compaction, afterwards their rank error is
+    about log2(n / k) / k.
+
+    Attributes:
+    ----------
+    k : int
+        Items kept per level.
+    """
+
+    def __init__(self, k=2048, seed=0):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self.k:
+                items = np.sort(items)
+                # an odd item out stays at this level
+                keep = items[:-1] if len(items) % 2 else items
+                self.levels[level] = items[-1:] if len(items) % 2 else np.empty(0)
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                promoted = keep[self._rng.integers(2)::2]
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        self.levels[0] = np.concatenate([self.levels[0], values[~np.isnan(values)]])
+        self._compress()
+
+    def merge(self, other):
+        for level, items in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self._compress()
+        return self
+
+    def quantile(self, q):
+        """Approximate `q` quantile(s), linear interpolation like pandas while exact."""
+        if len(self.levels) == 1:
+            return np.quantile(self.levels[0], q) if len(self.levels[0]) else np.full(np.shape(q), np.nan)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** level) for level, items in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items, weights = items[order], weights[order]
+        # every item stands for `weight` rows centred on its cumulative position
+        positions = np.cumsum(weights) - weights / 2
+        return np.interp(np.asarray(q) * weights.sum(), positions, items)
+
+
+class HeavyHitters:
+    """
+    Mergeable Misra-Gries summary of the most frequent values of a column.
+
+    Counts are exact while at most `capacity` distinct values have been seen; past
+    that, every count is decreased by the (capacity + 1)-th largest one at each
+    pruning, so values more frequent than n / capacity are always kept and their
+    counts are underestimated by at most n / capacity.
+    """
+
+    def __init__(self, capacity=10000):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype=np.int64)
+        self.exact = True
+
+    def _prune(self):
+        if len(self.counts) > self.capacity:
+            threshold = self.counts.nlargest(self.capacity + 1).iloc[-1]
+            self.counts = self.counts[self.counts > threshold] - threshold
+            self.exact = False
+
+    def update(self, values):
+        self.counts = self.counts.add(values.value_counts(), fill_value=0).astype(np.int64)
+        self._prune()
+
+    def merge(self, other):
+        self.counts = self.counts.add(other.counts, fill_value=0).astype(np.int64)
+        self.exact = self.exact and other.exact
+        self._prune()
+        return self
+
+
+class StreamingProfile:
+    """
+    Single-pass, mergeable profile of a dataset read in chunks.
+
+    For the numerical columns it keeps, for every pair of columns over the rows where
+    both are present, the count, means, second moments and co-moment (merged with
+    Chan's parallel update), which give the descriptive statistics and the Pearson
+    correlation matrix with pandas' pairwise handling of missing values; plus the
+    min / max and a `QuantileSketch` per column. Categorical columns keep a
+    `HeavyHitters` summary, and every column its null count. Profiles of separate
+    chunks combine with `merge`, in any order.
+
+    Attributes:
+    ----------
+    numerical : list
+        Numerical columns.
+    categorical : list
+        Object, string and category columns.
+    rows : int
+        Rows seen.
+    """
+
+    def __init__(self, columns, numerical, categorical, sketch_size=2048, heavy_hitters=10000, seed=0):
+        self.columns = list(columns)
+        self.numerical = list(numerical)
+        self.categorical = list(categorical)
+        self.options = {'sketch_size': sketch_size, 'heavy_hitters': heavy_hitters, 'seed': seed}
+        self.rows = 0
+        self.nulls = pd.Series(0, index=self.columns, dtype=np.int64)
+        p = len(self.numerical)
+        # [i, j] entries describe column i over the rows where column j is present too
+        self.n = np.zeros((p, p))
+        self.mean = np.zeros((p, p))
+        self.m2 = np.zeros((p, p))
+        self.comoment = np.zeros((p, p))
+        self.minimum = np.full(p, np.nan)
+        self.maximum = np.full(p, np.nan)
+        self.sketches = [QuantileSketch(sketch_size, seed + i) for i in range(p)]
+        self.heavy_hitters = {column: HeavyHitters(heavy_hitters) for column in self.categorical}
+
+    @classmethod
+    def for_frame(cls, data, **kwargs):
+        """Empty profile with the column roles of `data` (e.g. the first chunk)."""
+        numerical = data.select_dtypes(include='number').columns
+        categorical = data.select_dtypes(include=['object', 'string', 'category']).columns
+        return cls(data.columns, numerical, categorical, **kwargs)
+
+    def _merge_moments(self, n, mean, m2, comoment):
+        total = self.n + n
+        with np.errstate(divide='ignore', invalid='ignore'):
+            weight = np.where(total > 0, self.n * n / total, 0.0)
+            delta = mean - self.mean
+            self.comoment += comoment + delta * delta.T * weight
+            self.m2 += m2 + delta ** 2 * weight
+            self.mean += np.where(total > 0, delta * n / total, 0.0)
+        self.n = total
+
+    def update(self, chunk):
+        """Add the rows of a chunk."""
+        self.rows += len(chunk)
+        self.nulls = self.nulls.add(chunk[self.columns].isnull().sum(), fill_value=0).astype(np.int64)
+        if self.numerical:
+            x = chunk[self.numerical].to_numpy(dtype=np.float64, na_value=np.nan)
+            present = ~np.isnan(x)
+            weights = present.astype(np.float64)
+            # centred on the chunk means for accuracy, the moments do not depend on the shift;
+            # sum / count rather than nanmean, which warns on the columns all null in the chunk
+            shift = np.where(present, x, 0.0).sum(axis=0) / np.maximum(present.sum(axis=0), 1)
+            centred = np.where(present, x - shift, 0.0)
+            n = weights.T @ weights
+            sums = centred.T @ weights
+            with np.errstate(divide='ignore', invalid='ignore'):
+                mean = np.where(n > 0, sums / n, 0.0)
+                m2 = (centred ** 2).T @ weights - np.where(n > 0, sums ** 2 / n, 0.0)
+                comoment = centred.T @ centred - np.where(n > 0, sums * sums.T / n, 0.0)
+            self._merge_moments(n, np.where(n > 0, mean + shift[:, None], 0.0), m2, comoment)
+            with np.errstate(invalid='ignore'):
+                self.minimum = np.fmin(self.minimum, np.nanmin(np.where(present, x, np.inf), axis=0))
+                self.maximum = np.fmax(self.maximum, np.nanmax(np.where(present, x, -np.inf), axis=0))
+            for i, sketch in enumerate(self.sketches):
+                sketch.update(x[present[:, i], i])
+        for column, summary in self.heavy_hitters.items():
+            summary.update(chunk[column])
+        return self
+
+    def merge(self, other):
+        """Combine with the profile of other rows of the same columns."""
+        self.rows += other.rows
+        self.nulls = self.nulls.add(other.nulls, fill_value=0).astype(np.int64)
+        self._merge_moments(other.n, other.mean, other.m2, other.comoment)
+        self.minimum = np.fmin(self.minimum, other.minimum)
+        self.maximum = np.fmax(self.maximum, other.maximum)
+        for sketch, other_sketch in zip(self.sketches, other.sketches):
+            sketch.merge(other_sketch)
+        for column, summary in self.heavy_hitters.items():
+            summary.merge(other.heavy_hitters[column])
+        return self
+
+    def describe(self):
+        """Same layout as `DataFrame.describe()` of the numerical columns, quantiles approximate."""
+        count = np.diag(self.n)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = np.where(count > 0, np.diag(self.mean), np.nan)
+            std = np.sqrt(np.diag(self.m2) / (count - 1))
+        quantiles = np.array([sketch.quantile([0.25, 0.5, 0.75]) for sketch in self.sketches]).reshape(-1, 3)
+        return pd.DataFrame(
+            np.vstack([count, mean, np.where(count > 1, std, np.nan), np.where(count > 0, self.minimum, np.nan),
+                       quantiles.T, np.where(count > 0, self.maximum, np.nan)]),
+            index=['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max'], columns=self.numerical)
+
+    def correlation(self):
+        """Pearson correlation matrix of the numerical columns, pairwise complete rows."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            correlation = self.comoment / np.sqrt(self.m2 * self.m2.T)
+        correlation = np.where(self.n > 0, np.clip(correlation, -1, 1), np.nan)
+        return pd.DataFrame(correlation, index=self.numerical, columns=self.numerical)
+
+    def missing_values(self):
+        """Null counts of the columns having missing values."""
+        return self.nulls[self.nulls > 0]
+
+    def categorical_distribution(self):
+        """Value counts of the categorical columns, exact unless a column outgrew its summary."""
+        return {column: summary.counts.sort_values(ascending=False, kind='stable').rename('count')
+                for column, summary in self.heavy_hitters.items()}
+
+
+def _pinned_dtypes(first):
+    # a column all null in the first chunk is read as float64 there, but may hold strings later
+    numerical = first.select_dtypes(include='number').columns
+    categorical = first.select_dtypes(include=['object', 'string', 'category']).columns
+    dtypes = {}
+    for column in first.columns:
+        if column in categorical or first[column].isnull().all():
+            dtypes[column] = object
+        elif column in numerical:
+            dtypes[column] = np.float64
+    return dtypes
+
+
+def _profile_chunk(chunk, columns, numerical, categorical, options):
+    return StreamingProfile(columns, numerical, categorical, **options).update(chunk)
+
+
+def profile_chunks(chunks, n_workers=1, max_pending=None, **profile_options):
+    """
+    Profile an iterable of DataFrame chunks in one pass.
+
+    With `n_workers` > 1 the chunks are profiled in a process pool and merged as they
+    complete; at most `max_pending` chunks (2 per worker by default) are in flight, so
+    memory stays bounded whatever the size of the data.
+
+    Returns:
+    -------
+    StreamingProfile
+    """
+    chunks = iter(chunks)
+    first = next(chunks, None)
+    if first is None:
+        raise ValueError('no data to profile')
+    profile = StreamingProfile.for_frame(first, **profile_options).update(first)
+    if n_workers <= 1:
+        for chunk in chunks:
+            profile.update(chunk)
+        return profile
+    max_pending = max_pending or 2 * n_workers
+    roles = (profile.columns, profile.numerical, profile.categorical)
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        pending = set()
+        for number, chunk in enumerate(chunks, start=1):
+            # its own sketch seeds per chunk, so compactions are not correlated
+            options = {**profile.options, 'seed': profile.options['seed'] + number * len(profile.numerical)}
+            pending.add(pool.submit(_profile_chunk, chunk, *roles, options))
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    profile.merge(future.result())
+        for future in pending:
+            profile.merge(future.result())
+    return profile
+
+
+# Directory the headless renders are written to
+PLOT_DIR = '../plots'
+
+
+def histogram_counts(values, bins=30):
+    """Histogram counts and bin edges of the finite values (nulls and ±inf dropped), computed with NumPy."""
+    values = np.asarray(values, dtype=np.float64)
+    return np.histogram(values[np.isfinite(values)], bins=bins)
+
+
+def histogram2d_counts(x, y, bins=200):
+    """
+    2D histogram of the rows where both `x` and `y` are finite (nulls and ±inf dropped).
+
+    The bin of every point is computed arithmetically and counted with one bincount,
+    cheaper than np.histogram2d's searches on millions of rows.
+
+    Returns:
+    -------
+    tuple
+        Counts of shape (bins, bins) indexed [x bin, y bin], x edges and y edges.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    present = np.isfinite(x) & np.isfinite(y)
+    x, y = x[present], y[present]
+    edges, index = [], []
+    for values in (x, y):
+        low, high = (values.min(), values.max()) if len(values) else (0.0, 1.0)
+        high = high if high > low else low + 1
+        edges.append(np.linspace(low, high, bins + 1))
+        # the maximum falls in the last bin, like np.histogram
+        index.append(np.minimum(((values - low) * (bins / (high - low))).astype(np.int64), bins - 1))
+    counts = np.bincount(index[0] * bins + index[1], minlength=bins * bins).reshape(bins, bins)
+    return counts, edges[0], edges[1]
+
+
+def _plot_path(plot_dir, kind, *columns):
+    name = '_'.join(re.sub(r'[^\w.-]+', '_', str(column)) for column in columns)
+    return os.path.join(plot_dir, f'{kind}_{name}.png')
+
+
+def render_plot(task):
+    """
+    Draw one pre-aggregated plot with the Agg backend and save it; no pyplot state is
+    used, so tasks can run in any thread or process.
+
+    Parameters:
+    ----------
+    task : dict
+        kind ('histogram', 'bar' or 'density'), path, title, xlabel, ylabel and the
+        aggregates: counts / edges, labels / counts, or counts / xedges / yedges.
+
+    Returns:
+    -------
+    str
+        The path written.
+    """
+    fig = Figure(figsize=task.get('figsize', (10, 6)))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    if task['kind'] == 'histogram':
+        ax.stairs(task['counts'], task['edges'], fill=True, edgecolor='black')
+    elif task['kind'] == 'bar':
+        ax.bar(np.arange(len(task['counts'])), task['counts'])
+        ax.set_xticks(np.arange(len(task['counts'])), task['labels'], rotation=90)
+    elif task['kind'] == 'density':
+        counts = np.ma.masked_equal(task['counts'], 0)
+        mesh = ax.pcolormesh(task['xedges'], task['yedges'], counts.T,
+                             norm=LogNorm(vmin=1, vmax=max(counts.max(), 1)), cmap='viridis')
+        fig.colorbar(mesh, ax=ax, label='rows')
+    else:
+        raise ValueError(f"unknown plot kind {task['kind']}")
+    ax.set_title(task['title'])
+    ax.set_xlabel(task['xlabel'])
+    ax.set_ylabel(task['ylabel'])
+    fig.tight_layout()
+    fig.savefig(task['path'], dpi=task.get('dpi', 100))
+    return task['path']
+
 
 class EdaPlot(EdaAnalysis):
     """
@@ -145,6 +572,10 @@ class EdaPlot(EdaAnalysis):
             Plots the distribution of all numerical columns in the dataset.
         plot_categorical_distribution():
             Plots the distribution of all categorical columns in the dataset.
+        density_plot(x, y):
+            Saves a binned 2D histogram of two columns, for large datasets.
+        render_plots(numerical, categorical, pairs, n_workers):
+            Saves pre-aggregated distribution and density plots in a batch, headless.
         """
     logging.info('EDA Plot class created by inheriting EDAAnlysis class')
 
@@ -161,7 +592,7 @@ class EdaPlot(EdaAnalysis):
         plt.matshow(eda.get_correlation())
         plt.show()
 
-    def scatter_plot(self, x, y):
+    def scatter_plot(self, x, y, headless=False, bins=200):
         """
         Plots a scatter plot of two numerical columns in the dataset.
         This method creates a scatter plot of two numerical columns in the dataset
@@ -170,9 +601,14 @@ class EdaPlot(EdaAnalysis):
         Parameters:
         x (str): The name of the column to plot on the x-axis.
         y (str): The name of the column to plot on the y-axis.
+        headless (bool): Save a binned density plot to the plots directory instead of
+            showing every point, see density_plot.
+        bins (int): Bins per axis of the headless density plot.
         Returns:
-        None
+        None, or the saved file when headless
         """
+        if headless:
+            return self.density_plot(x, y, bins=bins)
         logging.info(f'Plotting scatter plot for columns {x} and {y}')
         plt.scatter(self.data[x], self.data[y])
         plt.xlabel(x)
@@ -191,7 +627,7 @@ class EdaPlot(EdaAnalysis):
         self.data.boxplot(column=column)
         plt.show()
 
-    def plot_numerical_distribution(self, column):
+    def plot_numerical_distribution(self, column, headless=False):
         """
         Plots the distribution of numerical features in the dataset.
         This method selects all numerical columns (int64 and float64) from the dataset
@@ -199,9 +635,12 @@ class EdaPlot(EdaAnalysis):
         is displayed with a title, x-axis label, and y-axis label.
         Parameters:
         column (str): The name of the column to plot the distribution for.
+        headless (bool): Save the histogram to the plots directory instead of showing it.
         Returns:
-        None
+        None, or the saved file when headless
         """
+        if headless:
+            return render_plot(self._histogram_task(column))
         logging.info(f'Plotting distribution of numerical column {column}')
         plt.figure(figsize=(10, 6))
         self.data[column].hist(bins=30, edgecolor='black')
@@ -210,16 +649,19 @@ class EdaPlot(EdaAnalysis):
         plt.ylabel('Frequency')
         plt.show()
 
-    def plot_categorical_distribution(self, column):
+    def plot_categorical_distribution(self, column, headless=False):
         """
         Plots the distribution of categorical features in the dataset.
         This method selects all columns of type 'object' or 'category' from the dataset
         and plots a bar chart for the distribution of each categorical feature.
         Parameters:
         column (str): The name of the column to plot the distribution for.
+        headless (bool): Save the bar chart to the plots directory instead of showing it.
         Returns:
-        None
+        None, or the saved file when headless
         """
+        if headless:
+            return render_plot(self._bar_task(column))
         logging.info(f'Plotting distribution of categorical column {column}')
         plt.figure(figsize=(10, 6))
         self.data[column].value_counts().plot(kind='bar')
@@ -227,3 +669,76 @@ class EdaPlot(EdaAnalysis):
         plt.xlabel(column)
         plt.ylabel('Frequency')
         plt.show()
+
+    def _histogram_task(self, column, bins=30):
+        counts, edges = histogram_counts(self.data[column], bins=bins)
+        return {'kind': 'histogram', 'counts': counts, 'edges': edges,
+                'path': _plot_path(self.plot_dir, 'distribution', column),
+                'title': f'Distribution of {column}', 'xlabel': column, 'ylabel': 'Frequency'}
+
+    def _bar_task(self, column, top=30):
+        counts = self.data[column].value_counts()
+        return {'kind': 'bar', 'counts': counts.to_numpy()[:top], 'labels': counts.index.astype(str)[:top].tolist(),
+                'path': _plot_path(self.plot_dir, 'distribution', column),
+                'title': f'Distribution of {column}' + (f' (top {top})' if len(counts) > top else ''),
+                'xlabel': column, 'ylabel': 'Frequency'}
+
+    def _density_task(self, x, y, bins=200):
+        counts, xedges, yedges = histogram2d_counts(self.data[x], self.data[y], bins=bins)
+        return {'kind': 'density', 'counts': counts, 'xedges': xedges, 'yedges': yedges,
+                'path': _plot_path(self.plot_dir, 'density', x, y),
+                'title': f'{y} vs {x}', 'xlabel': x, 'ylabel': y}
+
+    @property
+    def plot_dir(self):
+        """Directory of the headless renders, created on first use."""
+        os.makedirs(PLOT_DIR, exist_ok=True)
+        return PLOT_DIR
+
+    def density_plot(self, x, y, bins=200):
+        """
+        Saves a log-scaled 2D histogram of two numerical columns, the large data
+        replacement of scatter_plot: only the bins x bins counts reach matplotlib.
+        Parameters:
+        x (str): The name of the column to plot on the x-axis.
+        y (str): The name of the column to plot on the y-axis.
+        bins (int): Bins per axis.
+        Returns:
+        str: The saved file.
+        """
+        logging.info(f'Saving density plot for columns {x} and {y}')
+        return render_plot(self._density_task(x, y, bins=bins))
+
+    def render_plots(self, numerical=None, categorical=None, pairs=(), bins=30, density_bins=200,
+                     n_workers=1):
+        """
+        Batch, non-interactive rendering of the distribution and density plots to the
+        plots directory.
+        The counts are computed here with NumPy; only these aggregates are sent to the
+        renderers, which run in `n_workers` processes when more than one.
+        Parameters:
+        numerical (list): Columns plotted as histograms, every numerical column by default.
+        categorical (list): Columns plotted as bar charts, every categorical column by default.
+        pairs (list): (x, y) column pairs plotted as density plots.
+        bins (int): Histogram bins.
+        density_bins (int): Bins per axis of the density plots.
+        n_workers (int): Rendering processes.
+        Returns:
+        list: The saved files.
+        """
+        if numerical is None:
+            numerical = self.data.select_dtypes(include='number').columns
+        if categorical is None:
+            categorical = self.data.select_dtypes(include=['object', 'string', 'category']).columns
+        try:
+            tasks = ([self._histogram_task(column, bins=bins) for column in numerical] +
+                     [self._bar_task(column) for column in categorical] +
+                     [self._density_task(x, y, bins=density_bins) for x, y in pairs])
+            logging.info(f'Rendering {len(tasks)} plots with {n_workers} workers')
+            if n_workers > 1:
+                with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                    return list(pool.map(render_plot, tasks))
+            return [render_plot(task) for task in tasks]
+        except Exception as e:
+            logging.error(f'Error in rendering plots: {e}')
+            raise
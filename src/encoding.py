@@ -1,8 +1,11 @@
 import pandas as pd
 import numpy as np
+import joblib
 import logging
 from sklearn.preprocessing import LabelEncoder, StandardScaler
 
+from src.instrumentation import rows_of, timed
+
 logging.basicConfig(
     filename='../logs/encoding.logs',
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -30,12 +33,18 @@ class DataProcessing:
             Standardizes the numerical columns of the dataframe using StandardScaler.
                 dataframe (pd.DataFrame): The dataframe to be standardized.
                 pd.DataFrame: Standardized dataframe.
+        encode_data_compact(high_cardinality_method='codes', ...):
+            Encodes categorical columns from pandas category codes, without copying the frame.
+                pd.DataFrame: Encoded dataframe.
+        fit_preprocessor(target=None):
+            Fits the encoding and standardization once and returns a reusable FittedPreprocessor.
     """
 
     def __init__(self, data):
         self.data = data
         logging.info("DataProcessing instance created.")
 
+    @timed
     def encode_data(self):
         """_encodes catagorical coloumns into sum randomly assigned numbers for regression purpose_
 
@@ -57,6 +66,117 @@ class DataProcessing:
             logging.error(f'Error while trying to encode data:: {e}')
             raise
 
+    @timed
+    def encode_data_compact(self, high_cardinality_method='codes', high_cardinality_columns=None,
+                            cardinality_threshold=1000, target=None, n_buckets=2 ** 20, smoothing=10,
+                            n_folds=5, random_state=0):
+        """_memory friendly alternative to encode_data_
+
+        Low-cardinality object/category columns get the same codes as encode_data, taken
+        from `pd.factorize(sort=True)` instead of LabelEncoder: the values are still sorted
+        so the codes match, but no Python list of them is built. The frame is not
+        deep-copied: only the encoded columns are new, the others are shared with `self.data`.
+
+        High-cardinality keys (e.g. device_id, user_id) are encoded with
+        `high_cardinality_method`:
+            'codes'     - same label codes as the other columns (int32)
+            'hash'      - stable hash of the value modulo `n_buckets` (int32), stateless
+            'frequency' - share of the rows having the value (float32), nulls counted as one value
+            'target'    - out-of-fold mean of `target` for the value, smoothed towards the
+                          mean with `smoothing` pseudo rows (float32). The rows are split in
+                          `n_folds` random folds and each row is encoded from the other
+                          folds only, so its own label never leaks into its feature.
+
+        Args:
+            high_cardinality_method (str): _one of 'codes', 'hash', 'frequency', 'target'_
+            high_cardinality_columns (list, optional): _keys to encode with that method, by default
+                the categorical columns with more than `cardinality_threshold` distinct values_
+            cardinality_threshold (int): _distinct values above which a column is high-cardinality_
+            target (str, optional): _target column, required for target encoding_
+            n_buckets (int): _number of hash buckets_
+            smoothing (float): _weight of the global mean in target encoding_
+            n_folds (int): _number of folds of the out-of-fold target encoding, at least 2_
+            random_state (int): _seed of the fold assignment_
+
+        Returns:
+            _DataFrame_: _encoded_dataframe_
+        """
+        if high_cardinality_method not in ('codes', 'hash', 'frequency', 'target'):
+            raise ValueError(f'unknown high cardinality method {high_cardinality_method}')
+        if high_cardinality_method == 'target' and target is None:
+            raise ValueError('target encoding needs the target column')
+        if high_cardinality_method == 'target' and n_folds < 2:
+            raise ValueError('out-of-fold target encoding needs at least 2 folds')
+        logging.info("Starting compact encoding of categorical columns.")
+        try:
+            columns_label = self.data.select_dtypes(include=['object', 'string', 'category']).columns
+            if high_cardinality_columns is None:
+                high_cardinality_columns = [col for col in columns_label
+                                            if self.data[col].nunique() > cardinality_threshold]
+            df_lbl = self.data.copy(deep=False)
+            for col in columns_label.union(high_cardinality_columns, sort=False):
+                values = self.data[col]
+                if col not in high_cardinality_columns or high_cardinality_method == 'codes':
+                    df_lbl[col] = pd.factorize(values, sort=True)[0].astype(np.int32)
+                elif high_cardinality_method == 'hash':
+                    # hashed in slices, hashing strings allocates a few buffers per value
+                    raw = values.to_numpy()
+                    hashed = np.empty(len(raw), dtype=np.int32)
+                    for start in range(0, len(raw), 65536):
+                        hashed[start:start + 65536] = pd.util.hash_array(
+                            raw[start:start + 65536]) % np.uint64(n_buckets)
+                    df_lbl[col] = hashed
+                elif high_cardinality_method == 'frequency':
+                    # nulls are one more key, instead of the -1 code bincount rejects
+                    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+                    frequency = np.bincount(codes, minlength=len(uniques)) / len(values)
+                    df_lbl[col] = frequency[codes].astype(np.float32)
+                else:
+                    df_lbl[col] = self._out_of_fold_target_means(
+                        values, self.data[target].to_numpy(dtype=np.float64), smoothing, n_folds,
+                        random_state)
+            logging.info("Compact encoding completed.")
+            return df_lbl
+        except Exception as e:
+            logging.error(f'Error while trying to encode data compactly:: {e}')
+            raise
+
+    @staticmethod
+    def _out_of_fold_target_means(values, labels, smoothing, n_folds, random_state):
+        # per fold, the value's label sum and count over the whole frame minus the fold's own
+        # rows; nulls are encoded as one more value
+        codes, uniques = pd.factorize(values, use_na_sentinel=False)
+        folds = np.random.default_rng(random_state).permutation(len(codes)) % n_folds
+        counts = np.bincount(codes, minlength=len(uniques))
+        sums = np.bincount(codes, weights=labels, minlength=len(uniques))
+        encoded = np.empty(len(codes), dtype=np.float32)
+        for fold in range(n_folds):
+            rows = folds == fold
+            fold_counts = counts - np.bincount(codes[rows], minlength=len(uniques))
+            fold_sums = sums - np.bincount(codes[rows], weights=labels[rows], minlength=len(uniques))
+            prior = (labels.sum() - labels[rows].sum()) / max(len(codes) - rows.sum(), 1)
+            denominator = fold_counts[codes[rows]] + smoothing
+            # a value seen only in this fold falls back to the prior
+            with np.errstate(divide='ignore', invalid='ignore'):
+                means = (fold_sums[codes[rows]] + smoothing * prior) / denominator
+            encoded[rows] = np.where(denominator > 0, means, prior)
+        return encoded
+
+    @timed(rows=rows_of('data'))
+    def fit_preprocessor(self, target=None, unknown_value=-1):
+        """_fits encode_data + standardize_data once and keeps the result as a reusable artifact_
+
+        Args:
+            target (str, optional): _target column, excluded from the features_
+            unknown_value (int, optional): _code given to categories unseen at fit time_
+
+        Returns:
+            FittedPreprocessor: _fitted preprocessing artifact_
+        """
+        logging.info("Fitting preprocessing artifact.")
+        features = self.data.drop(columns=[target]) if target else self.data
+        return FittedPreprocessor.fit(features, unknown_value=unknown_value)
+
     def corr_with_target(self, target):
         logging.info(f"Calculating correlation with target: {target}")
         numericals = self.data.select_dtypes(include=['int64', 'float64'])
@@ -65,6 +185,7 @@ class DataProcessing:
         logging.info("Correlation calculation completed.")
         return corr_with_target
 
+    @timed
     def standardize_data(self, dataframe):
         """_standrardize the dataset columns_
 
@@ -80,13 +201,129 @@ class DataProcessing:
         df_standard = dataframe.copy()
         standard = StandardScaler()
         try:
-            for col in column_scaler:
-
-                df_standard[column_scaler] = standard.fit_transform(
-                    df_standard[column_scaler])
+            df_standard[column_scaler] = standard.fit_transform(
+                df_standard[column_scaler])
             logging.info("Standardization completed.")
             return df_standard
         except Exception as e:
             logging.error(
                 f'Error occured while standardizing data :: Erorr :- {e}')
             raise
+
+
+class FittedPreprocessor:
+    """
+    Fit-once, serializable version of `encode_data` followed by `standardize_data`.
+
+    Stores the category -> code dictionaries of the object columns (same codes as
+    LabelEncoder, i.e. sorted category order) and the StandardScaler means and scales,
+    so training and serving apply exactly the same transform without refitting.
+    Batches are transformed with vectorized categorical lookups, single records with
+    plain dictionary lookups.
+
+    Attributes:
+        feature_names (list): Feature columns, in model input order.
+        categories (dict): Category -> code mapping of every encoded column.
+        scaled (list): Columns standardized at fit time.
+        means (dict), scales (dict): StandardScaler statistics of the scaled columns.
+        unknown_value (int): Code used for categories unseen at fit time.
+    """
+
+    def __init__(self, feature_names, categories, means, scales, unknown_value=-1):
+        self.feature_names = list(feature_names)
+        self.categories = categories
+        self.scaled = list(means)
+        self.means = means
+        self.scales = scales
+        self.unknown_value = unknown_value
+        self._build_arrays()
+
+    def _build_arrays(self):
+        # per feature offset/scale vectors, identity for columns that are not scaled
+        self._mean = np.array([self.means.get(c, 0.0) for c in self.feature_names])
+        self._scale = np.array([self.scales.get(c, 1.0) for c in self.feature_names])
+        # category lookup index and codes of every encoded column
+        self._category_index = {c: (pd.Index(list(m)), np.fromiter(m.values(), dtype=np.float64, count=len(m)))
+                                for c, m in self.categories.items()}
+        self._steps = [(c, self.categories.get(c), self.means.get(c, 0.0), self.scales.get(c, 1.0))
+                       for c in self.feature_names]
+
+    @classmethod
+    def fit(cls, data, unknown_value=-1):
+        """_fits the category codes and scaler statistics on the feature dataframe_
+
+        Args:
+            data (pd.DataFrame): _feature columns, as passed to encode_data_
+
+        Returns:
+            FittedPreprocessor: _fitted preprocessing artifact_
+        """
+        try:
+            categories = {}
+            encoded = data.copy()
+            for col in data.select_dtypes(include=['object', 'string']).columns:
+                label = LabelEncoder()
+                label.fit(list(data[col].values))
+                categories[col] = {value: code for code, value in enumerate(label.classes_.tolist())}
+                encoded[col] = label.transform(list(data[col].values))
+            scaled = encoded.select_dtypes(include=['object', 'float64', 'int64']).columns
+            scaler = StandardScaler().fit(encoded[scaled])
+            logging.info("Preprocessing artifact fitted on %d rows.", len(data))
+            return cls(data.columns, categories,
+                       dict(zip(scaled, scaler.mean_.tolist())),
+                       dict(zip(scaled, scaler.scale_.tolist())),
+                       unknown_value=unknown_value)
+        except Exception as e:
+            logging.error(f'Error while fitting preprocessing artifact:: {e}')
+            raise
+
+    @timed
+    def transform(self, dataframe):
+        """_encodes and standardizes a batch with the fitted codes and statistics_
+
+        Args:
+            dataframe (pd.DataFrame): _raw feature columns_
+
+        Returns:
+            pd.DataFrame: _model ready dataframe, columns in feature_names order_
+        """
+        try:
+            values = np.empty((len(dataframe), len(self.feature_names)))
+            for i, col in enumerate(self.feature_names):
+                if col in self.categories:
+                    index, codes = self._category_index[col]
+                    # -1 for categories unseen at fit time
+                    positions = index.get_indexer(dataframe[col])
+                    values[:, i] = np.where(positions < 0, self.unknown_value, codes[positions])
+                else:
+                    values[:, i] = dataframe[col].to_numpy(dtype=np.float64)
+            values = (values - self._mean) / self._scale
+            return pd.DataFrame(values, columns=self.feature_names, index=dataframe.index)
+        except Exception as e:
+            logging.error(f'Error while transforming data:: {e}')
+            raise
+
+    def transform_one(self, record):
+        """_encodes and standardizes a single record without building a dataframe_
+
+        Args:
+            record (dict): _raw feature values keyed by column name_
+
+        Returns:
+            list: _model ready feature values in feature_names order_
+        """
+        return [((codes.get(record[col], self.unknown_value) if codes is not None else float(record[col]))
+                 - mean) / scale
+                for col, codes, mean, scale in self._steps]
+
+    def save(self, path):
+        """_saves the artifact with joblib, e.g. next to the model it was trained with_"""
+        joblib.dump({'feature_names': self.feature_names, 'categories': self.categories,
+                     'means': self.means, 'scales': self.scales,
+                     'unknown_value': self.unknown_value}, path)
+        logging.info(f"Preprocessing artifact saved to {path}.")
+
+    @classmethod
+    def load(cls, path):
+        """_loads an artifact written by save_"""
+        return cls(**joblib.load(path))
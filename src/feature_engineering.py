@@ -6,6 +6,8 @@ import sys
 import os
 sys.path.append(os.path.abspath('..'))
 
+from src.instrumentation import timed  # noqa: E402
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -38,6 +40,7 @@ class FeatureEngineering:
         logging.info(f'Column {new_column_name} inserted successfully')
         return self.data
 
+    @timed
     def get_purchase_weekday(self):
         """
         Create a new column 'purchase_weekday' based on the 'purchase_time' column.
@@ -56,6 +59,7 @@ class FeatureEngineering:
             logging.error("Error creating purchase_weekday column: %s", str(e))
             raise
 
+    @timed
     def get_purchase_hour(self):
         try:
             logging.info(f'creating purchase hour based on purchase time')
@@ -66,18 +70,28 @@ class FeatureEngineering:
             logging.error(
                 f'canot extract hout of the day from purchase-time  :: {e}')
 
-    def transaction_frequency(self):
+    @timed
+    def transaction_frequency(self, point_in_time=False):
         """
         Create a new column 'transaction_frequency' based on the number of transactions per user.
         This method creates a new column 'transaction_frequency' based on the number of transactions per user.
         The 'transaction_frequency' column contains the number of transactions made by each user.
+        Args:
+            point_in_time (bool): count only the user's transactions up to and including this one
+                (by purchase_time), the value the OnlineFeatureStore serves at request time,
+                instead of the user's transactions over the whole history.
         Returns:
             pandas.DataFrame: A DataFrame with the new 'transaction_frequency' column.
         """
         try:
             logging.info('Creating transaction_frequency column')
-            transaction_freq = self.data.groupby(
-                'user_id')['user_id'].transform('count')
+            if point_in_time:
+                # ties keep the row order, as a replay in that order would
+                ordered = self.data.sort_values('purchase_time', kind='stable')
+                transaction_freq = ordered.groupby('user_id').cumcount() + 1
+            else:
+                transaction_freq = self.data.groupby(
+                    'user_id')['user_id'].transform('count')
             self.perform_insertion(
                 'user_id', 'transaction_frequency', transaction_freq)
             return self.data
@@ -86,6 +100,7 @@ class FeatureEngineering:
                 "Error creating transaction_frequency column: %s", str(e))
             raise
 
+    @timed
     def velocity_check(self):
         """
         Create a new column 'velocity_check' based on the time difference between signup and purchase.
@@ -103,3 +118,135 @@ class FeatureEngineering:
         except Exception as e:
             logging.error("Error creating velocity_check column: %s", str(e))
             raise
+
+
+class StreamingFeatureEngineering:
+    """
+    Chunked, streaming version of the FeatureEngineering pipeline for files larger than RAM.
+
+    The input csv is read in chunks through a chain of generators, each chunk going
+    through the same `FeatureEngineering` steps as the in-memory path, so the output
+    has the same columns in the same order. `transaction_frequency` needs the number
+    of transactions of each user over the whole file, so it is computed in two passes:
+    the first pass only counts `user_id`s, the second maps the counts onto each chunk.
+    Memory use is bounded by the chunk size plus one counter per user. Rows without a
+    `user_id` get no frequency, like the null keys dropped by the in-memory groupby.
+
+    Attributes:
+    ----------
+    csv_path : str
+        Path of the merged transactions csv (the output of IP geolocation).
+    chunk_size : int
+        Number of rows per chunk.
+    """
+
+    # chunk counts kept before they are summed into one Series
+    COUNT_BATCH = 32
+
+    def __init__(self, csv_path, chunk_size=100000):
+        self.csv_path = csv_path
+        self.chunk_size = chunk_size
+        self.user_counts = None
+
+    def read_chunks(self, columns=None):
+        """Yield the csv chunk by chunk, with the time columns parsed like the notebooks do."""
+        for chunk in pd.read_csv(self.csv_path, chunksize=self.chunk_size, usecols=columns):
+            for column in ['signup_time', 'purchase_time']:
+                if column in chunk.columns:
+                    chunk[column] = pd.to_datetime(chunk[column], errors='coerce')
+            yield chunk
+
+    def count_transactions(self):
+        """
+        First pass: count the transactions of every user over the whole file.
+
+        Returns:
+        -------
+        pd.Series
+            Number of transactions indexed by user_id, null ids are not counted.
+        """
+        try:
+            logging.info('Counting transactions per user in chunks')
+            # per chunk counts summed in batches, instead of realigning one growing
+            # float Series on every chunk
+            partial = [pd.Series(dtype='int64')]
+            for chunk in self.read_chunks(columns=['user_id']):
+                partial.append(chunk['user_id'].value_counts(dropna=True))
+                if len(partial) >= self.COUNT_BATCH:
+                    partial = [pd.concat(partial).groupby(level=0).sum()]
+            self.user_counts = pd.concat(partial).groupby(level=0).sum().astype('int64')
+            logging.info(f'Transactions counted for {len(self.user_counts)} users')
+            return self.user_counts
+        except Exception as e:
+            logging.error("Error counting transactions per user: %s", str(e))
+            raise
+
+    def add_time_features(self, chunks):
+        """Add purchase_weekday and purchase_hour to every chunk."""
+        for chunk in chunks:
+            fe = FeatureEngineering(chunk)
+            fe.get_purchase_weekday()
+            fe.get_purchase_hour()
+            yield chunk
+
+    def add_transaction_frequency(self, chunks):
+        """Add transaction_frequency to every chunk from the first pass counts."""
+        if self.user_counts is None:
+            self.count_transactions()
+        for chunk in chunks:
+            frequency = chunk['user_id'].map(self.user_counts)
+            # a chunk with null user_ids keeps them missing instead of failing the cast
+            frequency = frequency.astype('int64') if frequency.notna().all() else frequency.astype('Int64')
+            FeatureEngineering(chunk).perform_insertion(
+                'user_id', 'transaction_frequency', frequency)
+            yield chunk
+
+    def add_velocity(self, chunks):
+        """Add velocity_check to every chunk."""
+        for chunk in chunks:
+            FeatureEngineering(chunk).velocity_check()
+            yield chunk
+
+    def transform(self):
+        """
+        Run the whole pipeline lazily.
+
+        Yields:
+        ------
+        pd.DataFrame
+            Chunks with the same columns as the in-memory FeatureEngineering output.
+        """
+        logging.info(f'Streaming feature engineering over {self.csv_path}')
+        chunks = self.read_chunks()
+        chunks = self.add_time_features(chunks)
+        chunks = self.add_transaction_frequency(chunks)
+        return self.add_velocity(chunks)
+
+    def to_csv(self, output_path, dropna=True):
+        """
+        Stream the engineered features to a csv file, chunk by chunk.
+
+        Parameters:
+        ----------
+        output_path : str
+            Destination csv.
+        dropna : bool, optional
+            Drop rows with missing values, as done before saving cleaned_data.csv.
+
+        Returns:
+        -------
+        int
+            Number of rows written.
+        """
+        try:
+            rows = 0
+            for i, chunk in enumerate(self.transform()):
+                if dropna:
+                    chunk = chunk.dropna(axis=0)
+                chunk.to_csv(output_path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+                rows += len(chunk)
+            logging.info(f'{rows} rows written to {output_path}')
+            return rows
+        except Exception as e:
+            logging.error("Error streaming features to csv: %s", str(e))
+            raise
@@ -0,0 +1,173 @@
+from collections import OrderedDict
+import heapq
+import itertools
+import pandas as pd
+import logging
+import numbers
+import threading
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    filename='../logs/feature_store.log'
+)
+
+logging.info(
+    '****************************Logging started for Feature Store module****************************')
+
+# Entities the store keeps running state for
+ENTITY_KEYS = ('user_id', 'device_id', 'ip_address')
+
+
+def to_seconds(value):
+    """Convert a timestamp (datetime, pandas Timestamp, string or epoch seconds) to epoch seconds."""
+    if isinstance(value, numbers.Number):
+        return float(value)
+    return pd.Timestamp(value).value / 1e9
+
+
+class OnlineFeatureStore:
+    """
+    In-process store of per-entity transaction state for real-time feature enrichment.
+
+    For every `user_id`, `device_id` and `ip_address` seen, the store keeps the number of
+    transactions and the time of the last purchase. An update is a dictionary lookup, a
+    move to the end of an insertion-ordered table and, when the entity's last event time
+    advances, a push on a heap of expiry times. Entities whose latest event is more than
+    `ttl` seconds older than the latest event seen are evicted through that heap, so
+    events arriving out of order expire too; `max_entities` caps each table as a hard
+    memory bound, dropping the least recently updated entities.
+
+    Features are point-in-time: `transaction_frequency` counts the user's transactions
+    recorded so far, this one included. Offline, the matching definition is
+    `FeatureEngineering.transaction_frequency(point_in_time=True)`; both agree when the
+    events are recorded in purchase_time order. The default offline feature counts the
+    user's whole history, which the store only reaches after the last transaction.
+    `velocity_check` is the signup to purchase delay in seconds, as offline.
+
+    Attributes:
+    ----------
+    ttl : float
+        Seconds of inactivity after which an entity is forgotten.
+    max_entities : int
+        Maximum number of entities kept per key, None for no cap.
+    """
+
+    def __init__(self, ttl=90 * 86400, max_entities=None):
+        self.ttl = ttl
+        self.max_entities = max_entities
+        # entity value -> [transaction count, last purchase time, last update time]
+        self.tables = {key: OrderedDict() for key in ENTITY_KEYS}
+        # per key, heap of (last update time, sequence, entity value); entries whose time
+        # is no longer the entity's are skipped when they reach the top
+        self.expiry = {key: [] for key in ENTITY_KEYS}
+        self._sequence = itertools.count()
+        self.latest_event = float('-inf')
+        self.evicted = 0
+        self._lock = threading.Lock()
+
+    def _evict(self, key):
+        table, heap = self.tables[key], self.expiry[key]
+        horizon = self.latest_event - self.ttl
+        while heap and heap[0][0] < horizon:
+            updated, _, value = heapq.heappop(heap)
+            state = table.get(value)
+            if state is not None and state[2] == updated:
+                del table[value]
+                self.evicted += 1
+        while self.max_entities is not None and len(table) > self.max_entities:
+            table.popitem(last=False)
+            self.evicted += 1
+        if len(heap) > 2 * len(table) + 1024:
+            # drop the stale entries, e.g. when nothing ever expires
+            heap[:] = [(state[2], next(self._sequence), value) for value, state in table.items()]
+            heapq.heapify(heap)
+
+    def _record(self, key, value, state, purchase):
+        table = self.tables[key]
+        if state is None:
+            state = table[value] = [0, None, purchase]
+            heapq.heappush(self.expiry[key], (purchase, next(self._sequence), value))
+        else:
+            table.move_to_end(value)
+            if purchase > state[2]:
+                state[2] = purchase
+                heapq.heappush(self.expiry[key], (purchase, next(self._sequence), value))
+        state[0] += 1
+        # the latest purchase is kept when a late event arrives
+        state[1] = purchase if state[1] is None else max(state[1], purchase)
+        self._evict(key)
+
+    def update(self, transaction, record=True):
+        """
+        Record a transaction and return its real-time features.
+
+        Parameters:
+        ----------
+        transaction : dict
+            Raw transaction with `purchase_time`, `signup_time` and the entity keys
+            (`user_id`, `device_id`, `ip_address`); missing entity keys are skipped.
+        record : bool, optional
+            Add the transaction to the store. When False the features are computed as
+            if it had been recorded, but the store is left unchanged, e.g. to score a
+            transaction that may be retried.
+
+        Returns:
+        -------
+        dict
+            transaction_frequency, velocity_check, purchase_hour, purchase_weekday,
+            time_since_last_purchase and the per-entity `<key>_count` /
+            `<key>_time_since_last` values, counts including this transaction. The time
+            since the last purchase is None for an entity's first transaction and for a
+            late event, older than the entity's latest recorded purchase.
+        """
+        purchase_time = pd.Timestamp(transaction['purchase_time'])
+        purchase = purchase_time.value / 1e9
+        features = {
+            'velocity_check': purchase - to_seconds(transaction['signup_time']),
+            'purchase_hour': purchase_time.hour,
+            'purchase_weekday': purchase_time.dayofweek,
+        }
+        with self._lock:
+            if record:
+                self.latest_event = max(self.latest_event, purchase)
+            for key in ENTITY_KEYS:
+                value = transaction.get(key)
+                if value is None:
+                    continue
+                state = self.tables[key].get(value)
+                count, previous = (0, None) if state is None else (state[0], state[1])
+                features[f'{key}_count'] = count + 1
+                features[f'{key}_time_since_last'] = (
+                    None if previous is None or purchase < previous else purchase - previous)
+                if record:
+                    self._record(key, value, state, purchase)
+        features['transaction_frequency'] = features.get('user_id_count', 1)
+        features['time_since_last_purchase'] = features.get('user_id_time_since_last')
+        return features
+
+    def update_many(self, transactions):
+        """
+        Record every row of a DataFrame, e.g. to warm the store from history.
+
+        Returns:
+        -------
+        list
+            The features returned by `update` for each row, in order.
+        """
+        try:
+            return [self.update(row) for row in transactions.to_dict(orient='records')]
+        except Exception as e:
+            logging.error(f'Error replaying transactions into the feature store: {e}')
+            raise
+
+    def count(self, key, value):
+        """Number of transactions recorded for one entity, 0 if unknown or evicted."""
+        state = self.tables[key].get(value)
+        return 0 if state is None else state[0]
+
+    def stats(self):
+        """Number of entities per key and number of evicted entities."""
+        with self._lock:
+            return {**{key: len(table) for key, table in self.tables.items()},
+                    'evicted': self.evicted}
@@ -0,0 +1,103 @@
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import logging
+import threading
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    filename='../logs/inference_pool.log'
+)
+
+logging.info(
+    '****************************Logging started for Inference Pool module****************************')
+
+
+class PoolSaturated(Exception):
+    """Raised when the pool already holds as many calls as it accepts."""
+
+
+class InferencePool:
+    """
+    Bounded thread pool running blocking model calls for an asyncio server.
+
+    At most `max_workers` calls run at once and at most `max_queue` more wait for a
+    thread; beyond that `run` fails fast with `PoolSaturated`, so an overloaded server
+    sheds load instead of growing an unbounded backlog. A call that exceeds its
+    timeout is cancelled if it has not started yet; a running call keeps its slot
+    until it finishes, so the bound also holds for timed out work.
+
+    Attributes:
+    ----------
+    max_workers : int
+        Number of threads running calls.
+    max_queue : int
+        Number of calls allowed to wait for a thread.
+    """
+
+    def __init__(self, max_workers=4, max_queue=64):
+        if max_workers < 1 or max_queue < 0:
+            raise ValueError('max_workers must be at least 1 and max_queue not negative')
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='inference')
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._timed_out = 0
+
+    def _release(self, future):
+        with self._lock:
+            self._pending -= 1
+            self._completed += 1
+
+    async def run(self, fn, *args, timeout=None):
+        """
+        Run `fn(*args)` on a pool thread and return its result.
+
+        Parameters:
+        ----------
+        fn : callable
+            Blocking function to run.
+        timeout : float, optional
+            Seconds to wait for the result, no limit by default.
+
+        Raises:
+        ------
+        PoolSaturated
+            When `max_workers + max_queue` calls are already pending.
+        TimeoutError
+            When the result is not available within `timeout` seconds.
+        """
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise PoolSaturated(f'{self._pending} calls pending')
+            self._pending += 1
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(self._release)
+        try:
+            # cancelling the wrapper cancels the call if it is still queued
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._timed_out += 1
+            raise TimeoutError(f'no result within {timeout}s')
+
+    def metrics(self):
+        """Pool bounds, calls pending, completed, rejected and timed out."""
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'pending': self._pending,
+                'completed': self._completed,
+                'rejected': self._rejected,
+                'timed_out': self._timed_out,
+            }
+
+    def shutdown(self, wait=True):
+        """Stop the threads, after the pending calls when `wait` is set."""
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+        logging.info('Inference pool stopped: %s', self.metrics())
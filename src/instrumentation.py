@@ -0,0 +1,266 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+import os
+import threading
+import time
+
+# Collection switch, read once at import. When off, `timed` returns the function
+# unchanged and `timer` yields without measuring, so instrumented code runs as before.
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') != '0'
+
+# Latency buckets in seconds, from sub-millisecond requests to minutes long training
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1, 2.5, 5, 10, 30, 60, 300)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """
+    Monotonic count per label combination.
+
+    Attributes:
+    ----------
+    name : str
+        Metric name, by convention ending in `_total`.
+    documentation : str
+        HELP text.
+    labelnames : tuple
+        Label names, their values are passed to `inc` as keyword arguments.
+    """
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(labels[name] for name in self.labelnames), 0)
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for key, value in values.items():
+            yield f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}'
+
+
+class Histogram:
+    """
+    Distribution of observed values (e.g. durations in seconds) per label combination.
+
+    Observations are counted in fixed upper-bound buckets; the exposition reports
+    cumulative bucket counts, their sum and their count.
+
+    Attributes:
+    ----------
+    name : str
+        Metric name.
+    documentation : str
+        HELP text.
+    labelnames : tuple
+        Label names, their values are passed to `observe` as keyword arguments.
+    buckets : tuple
+        Sorted bucket upper bounds, `+Inf` is implied.
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label combination: [bucket counts..., +Inf count], sum
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def count(self, **labels):
+        state = self._values.get(tuple(labels[name] for name in self.labelnames))
+        return sum(state[0]) if state else 0
+
+    def samples(self):
+        with self._lock:
+            values = {key: (list(counts), total) for key, (counts, total) in self._values.items()}
+        for key, (counts, total) in values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, [('le', _format_value(float(bound)))])
+                yield f'{self.name}_bucket{labels} {cumulative}'
+            labels = _format_labels(self.labelnames, key)
+            yield f'{self.name}_sum{labels} {_format_value(total)}'
+            yield f'{self.name}_count{labels} {cumulative}'
+
+
+class MetricsRegistry:
+    """
+    Named counters and histograms of one process, rendered in the Prometheus text format.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, documentation, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f'metric {name} already registered with another type or labels')
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        """Counter `name`, created on first request."""
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """Histogram `name`, created on first request."""
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self):
+        """
+        Every metric in the Prometheus text exposition format (version 0.0.4).
+
+        Returns:
+        -------
+        str
+            The exposition, served with `CONTENT_TYPE`.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {_escape(metric.documentation)}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+# Process wide registry, exposed by the API's /metrics endpoint
+REGISTRY = MetricsRegistry()
+
+STAGE_DURATION = REGISTRY.histogram(
+    'fraud_stage_duration_seconds', 'Duration of instrumented pipeline stages.', ['stage'])
+STAGE_ROWS = REGISTRY.counter(
+    'fraud_stage_rows_total', 'Rows processed by instrumented pipeline stages.', ['stage'])
+STAGE_ERRORS = REGISTRY.counter(
+    'fraud_stage_errors_total', 'Instrumented pipeline stage calls that raised.', ['stage'])
+
+
+def rows_of(attribute):
+    """`rows` callable for `timed` counting the rows of `self.<attribute>`."""
+    return lambda self, *args, **kwargs: len(getattr(self, attribute))
+
+
+def _result_rows(result):
+    # frames, series and arrays; models, dicts and None are not counted
+    shape = getattr(result, 'shape', None)
+    return shape[0] if shape else None
+
+
+class _Timing:
+    rows = None
+
+
+@contextmanager
+def timer(stage):
+    """
+    Time the enclosed block as `stage`; set `.rows` on the yielded object to count rows.
+
+        with timer('load_ranges') as t:
+            ranges = pd.read_csv(path)
+            t.rows = len(ranges)
+    """
+    timing = _Timing()
+    if not METRICS_ENABLED:
+        yield timing
+        return
+    start = time.perf_counter()
+    try:
+        yield timing
+    except BaseException:
+        STAGE_ERRORS.inc(stage=stage)
+        raise
+    finally:
+        STAGE_DURATION.observe(time.perf_counter() - start, stage=stage)
+    if timing.rows is not None:
+        STAGE_ROWS.inc(timing.rows, stage=stage)
+
+
+def timed(func=None, *, stage=None, rows=None):
+    """
+    Decorator recording the duration and row count of every call of a function.
+
+    Parameters:
+    ----------
+    stage : str, optional
+        Stage label, the function's qualified name (e.g. 'TrainData.random_forest') by default.
+    rows : callable, optional
+        Called with the call's arguments, returns the number of rows processed. By
+        default the length of a returned frame, series or array is counted.
+
+    Returns:
+    -------
+    callable
+        The wrapped function, or the function itself when metrics are disabled.
+    """
+    def decorate(func):
+        if not METRICS_ENABLED:
+            return func
+        name = stage or func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except BaseException:
+                STAGE_ERRORS.inc(stage=name)
+                raise
+            finally:
+                STAGE_DURATION.observe(time.perf_counter() - start, stage=name)
+            count = rows(*args, **kwargs) if rows is not None else _result_rows(result)
+            if count is not None:
+                STAGE_ROWS.inc(count, stage=name)
+            return result
+        return wrapper
+
+    return decorate(func) if func is not None else decorate
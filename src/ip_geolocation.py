@@ -1,9 +1,16 @@
 import pandas as pd
+import numpy as np
 from intervaltree import IntervalTree
+from functools import lru_cache
+import hashlib
+import ipaddress
 import logging
+import struct
 import sys
 import os
 
+from src.instrumentation import timed  # noqa: E402
+
 # Add the src directory to the path
 sys.path.append(os.path.abspath('..'))
 
@@ -17,20 +24,137 @@ logging.info(
     '****************************Logging started for IP Geolocation module****************************')
 
 
-class IPGeolocation:
-    def __init__(self, df_ranges):
+OUTPUT_COLUMNS = ['user_id', 'signup_time', 'purchase_time', 'purchase_value', 'device_id',
+                  'source', 'browser', 'sex', 'age', 'ip_address', 'country', 'class']
+
+# IPv4 addresses are stored as unsigned 32 bit integers in the range tables
+IP_MIN, IP_MAX = 0, 0xFFFFFFFF
+
+# number of recent IPs remembered by the scalar `lookup` path
+LOOKUP_CACHE_SIZE = 65536
+
+# On-disk index layout: fixed size header, lower bounds (uint32), upper bounds (uint32),
+# country codes (uint16), newline separated country table (utf-8).
+# header = magic, format version, sha256 of the source csv, number of ranges, country table size
+INDEX_MAGIC = b'IPGX'
+INDEX_VERSION = 1
+INDEX_HEADER = struct.Struct('<4sI32sQQ')
+INDEX_HEADER_SIZE = 64
+
+
+def file_checksum(path, chunk_size=1 << 20):
+    """
+    Compute the sha256 digest of a file, reading it in chunks.
+
+    Parameters:
+    ----------
+    path : str
+        Path of the file to hash.
+
+    Returns:
+    -------
+    bytes
+        The 32 byte sha256 digest.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def _map_array(path, dtype, offset, length):
+    """Memory map `length` items of `dtype` starting at `offset` bytes into `path`."""
+    if not length:
+        # mmap refuses zero length mappings
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(length,))
+
+
+def ip_to_int(ip):
+    """
+    Convert a raw IP address to its integer form.
+
+    Accepts the numeric IPs of `Fraud_Data.csv` (ints, floats or their string form,
+    truncated like `astype(int)`) as well as dotted-quad strings.
+    """
+    if isinstance(ip, str):
+        try:
+            return int(float(ip))
+        except ValueError:
+            return int(ipaddress.IPv4Address(ip))
+    return int(ip)
+
+
+class _CachedLookup:
+    """
+    Per-request `lookup` of single raw IPs through a bounded LRU cache, shared by the
+    lookup engines; they implement `resolve_one`.
+    """
+
+    def init_cache(self, cache_size=LOOKUP_CACHE_SIZE):
+        """
+        (Re)create the bounded LRU cache used by `lookup`.
+
+        Parameters:
+        ----------
+        cache_size : int
+            Maximum number of IPs kept in the cache, None for an unbounded cache.
+        """
+        self._cached_lookup = lru_cache(maxsize=cache_size)(self._lookup_uncached)
+
+    def _lookup_uncached(self, ip):
+        return self.resolve_one(ip_to_int(ip))
+
+    def resolve_one(self, ip_int):
+        """Return the country of a single integer IP, None if it is not in any range."""
+        raise NotImplementedError
+
+    def lookup(self, ip):
+        """
+        Resolve a single raw IP address to its country.
+
+        This is the per-request path used by the API: it does not build any DataFrame
+        and answers repeated IPs from a bounded LRU cache.
+
+        Parameters:
+        ----------
+        ip : int, float or str
+            The IP address, see `ip_to_int` for the accepted forms.
+
+        Returns:
+        -------
+        str or None
+            The country name, None if the IP is not covered by any range.
+        """
+        return self._cached_lookup(ip)
+
+    def cache_info(self):
+        """Return the hits, misses, maxsize and currsize of the `lookup` cache."""
+        return self._cached_lookup.cache_info()
+
+
+class IPGeolocation(_CachedLookup):
+    def __init__(self, df_ranges, cache_size=LOOKUP_CACHE_SIZE):
         try:
             logging.info("Initializing IPGeolocation with IP ranges.")
             self.tree = IntervalTree()
             for _, row in df_ranges.iterrows():
                 self.tree[row['lower_bound_ip_address']
                     :row['upper_bound_ip_address'] + 1] = row['country']
+            self.init_cache(cache_size)
             logging.info(
                 "Interval tree built successfully with %d ranges.", len(df_ranges))
         except Exception as e:
             logging.error("Error initializing IPGeolocation: %s", str(e))
             raise
 
+    def resolve_one(self, ip_int):
+        """Return the country of a single integer IP, None if it is not in any range."""
+        matches = self.tree[ip_int]
+        return next(iter(matches)).data if matches else None
+
+    @timed
     def map_ips_to_countries(self, df_ips):
         try:
             logging.info(
@@ -41,7 +165,229 @@ class IPGeolocation:
             matched_count = df_ips['country'].notnull().sum()
             logging.info(
                 "Successfully matched %d IPs to countries.", matched_count)
-            return df_ips[['user_id', 'signup_time', 'purchase_time', 'purchase_value', 'device_id', 'source', 'browser', 'sex', 'age', 'ip_address', 'country', 'class']]
+            return df_ips[OUTPUT_COLUMNS]
+        except Exception as e:
+            logging.error("Error mapping IPs to countries: %s", str(e))
+            raise
+
+
+class SortedIPGeolocation(_CachedLookup):
+    """
+    IP to country lookup engine backed by sorted NumPy arrays.
+
+    The ranges are stored as two sorted uint32 arrays of lower/upper bounds and an
+    array of country codes pointing into a small country table. A batch of IPs is
+    resolved with a single `np.searchsorted` call followed by a bounds check that
+    rejects IPs falling into gaps between ranges. Output is identical to
+    `IPGeolocation.map_ips_to_countries`. Ranges without a country are dropped, the
+    IPs they cover resolve to None like any uncovered IP.
+
+    Attributes:
+    ----------
+    lower : np.ndarray
+        Sorted lower bounds of the IP ranges (inclusive).
+    upper : np.ndarray
+        Upper bounds of the IP ranges (inclusive), aligned with `lower`.
+    codes : np.ndarray
+        Index into `countries` for every range, aligned with `lower`.
+    countries : np.ndarray
+        Object array of the distinct country names.
+    """
+
+    def __init__(self, df_ranges, cache_size=LOOKUP_CACHE_SIZE):
+        try:
+            logging.info("Initializing SortedIPGeolocation with IP ranges.")
+            missing = df_ranges['country'].isnull()
+            if missing.any():
+                # factorize would code them -1, i.e. 65535 once stored as uint16
+                logging.warning("Dropping %d IP ranges without a country.", missing.sum())
+                df_ranges = df_ranges[~missing]
+            lower = df_ranges['lower_bound_ip_address'].to_numpy().astype(np.int64)
+            upper = df_ranges['upper_bound_ip_address'].to_numpy().astype(np.int64)
+            codes, countries = pd.factorize(df_ranges['country'], sort=True)
+            if len(countries) > np.iinfo(np.uint16).max:
+                raise ValueError(f'{len(countries)} countries do not fit the uint16 country codes')
+            order = np.argsort(lower, kind='stable')
+            self.lower = lower[order].astype(np.uint32)
+            self.upper = upper[order].astype(np.uint32)
+            self.codes = codes[order].astype(np.uint16)
+            self.countries = np.asarray(countries, dtype=object)
+            self.init_cache(cache_size)
+            logging.info(
+                "Sorted range arrays built successfully with %d ranges.", len(df_ranges))
+        except Exception as e:
+            logging.error("Error initializing SortedIPGeolocation: %s", str(e))
+            raise
+
+    @timed
+    def resolve(self, ips):
+        """
+        Resolve an array of integer IPs to country names in one vectorized pass.
+
+        Parameters:
+        ----------
+        ips : array-like
+            Integer IP addresses.
+
+        Returns:
+        -------
+        np.ndarray
+            Object array of country names, None where the IP is not covered by any range.
+        """
+        ips = np.asarray(ips, dtype=np.int64)
+        result = np.full(len(ips), None, dtype=object)
+        if not len(self.lower):
+            return result
+        query = ips.clip(IP_MIN, IP_MAX).astype(np.uint32)
+        idx = np.searchsorted(self.lower, query, side='right') - 1
+        found = (idx >= 0) & (query == ips)
+        idx[~found] = 0
+        # an IP past the lower bound of a range may still sit in the gap after it
+        found &= query <= self.upper[idx]
+        result[found] = self.countries[self.codes[idx[found]]]
+        return result
+
+    def resolve_one(self, ip_int):
+        """Return the country of a single integer IP, None if it is not in any range."""
+        if not IP_MIN <= ip_int <= IP_MAX:
+            return None
+        # keep the query uint32 so searchsorted does not upcast (copy) the bound array
+        idx = int(np.searchsorted(self.lower, np.uint32(ip_int), side='right')) - 1
+        if idx < 0 or ip_int > self.upper[idx]:
+            return None
+        return self.countries[self.codes[idx]]
+
+    def save_index(self, path, checksum=bytes(32)):
+        """
+        Write the range arrays and country table to a compact binary index file.
+
+        The file is written to a temporary path first and then renamed, so processes
+        opening the index never see a partially written file.
+
+        Parameters:
+        ----------
+        path : str
+            Destination of the index file.
+        checksum : bytes, optional
+            sha256 digest of the source csv, used to detect stale indexes.
+        """
+        try:
+            logging.info("Writing IP range index to %s.", path)
+            table = '\n'.join(str(c) for c in self.countries).encode('utf-8')
+            header = INDEX_HEADER.pack(
+                INDEX_MAGIC, INDEX_VERSION, checksum, len(self.lower), len(table))
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(header.ljust(INDEX_HEADER_SIZE, b'\0'))
+                f.write(np.ascontiguousarray(self.lower, dtype=np.uint32).tobytes())
+                f.write(np.ascontiguousarray(self.upper, dtype=np.uint32).tobytes())
+                f.write(np.ascontiguousarray(self.codes, dtype=np.uint16).tobytes())
+                f.write(table)
+            os.replace(tmp_path, path)
+            logging.info("IP range index written with %d ranges.", len(self.lower))
+        except Exception as e:
+            logging.error("Error writing IP range index: %s", str(e))
+            raise
+
+    @classmethod
+    def from_index(cls, path, checksum=None, cache_size=LOOKUP_CACHE_SIZE):
+        """
+        Open an index written by `save_index` without copying the range arrays.
+
+        The bound and code arrays are `np.memmap` views of the file, so every worker
+        process opening the same index shares the same pages.
+
+        Parameters:
+        ----------
+        path : str
+            Path of the index file.
+        checksum : bytes, optional
+            Expected sha256 digest of the source csv. When given, an index built from
+            a different csv is rejected.
+        cache_size : int, optional
+            Size of the `lookup` LRU cache.
+
+        Returns:
+        -------
+        SortedIPGeolocation
+            An engine backed by the memory mapped index.
+
+        Raises:
+        ------
+        ValueError
+            If the file is not an index, has another format version or is stale.
+        """
+        with open(path, 'rb') as f:
+            header = f.read(INDEX_HEADER_SIZE)
+            if len(header) < INDEX_HEADER_SIZE:
+                raise ValueError(f'{path} is not an IP range index')
+            magic, version, source_checksum, n_ranges, table_size = INDEX_HEADER.unpack_from(header)
+            if magic != INDEX_MAGIC:
+                raise ValueError(f'{path} is not an IP range index')
+            if version != INDEX_VERSION:
+                raise ValueError(f'IP range index version {version} is not supported')
+            if checksum is not None and source_checksum != checksum:
+                raise ValueError(f'IP range index {path} is stale')
+            f.seek(INDEX_HEADER_SIZE + n_ranges * 10)
+            table = f.read(table_size).decode('utf-8')
+
+        engine = cls.__new__(cls)
+        offset = INDEX_HEADER_SIZE
+        engine.lower = _map_array(path, np.uint32, offset, n_ranges)
+        offset += engine.lower.nbytes
+        engine.upper = _map_array(path, np.uint32, offset, n_ranges)
+        offset += engine.upper.nbytes
+        engine.codes = _map_array(path, np.uint16, offset, n_ranges)
+        engine.countries = np.asarray(table.split('\n') if table_size else [], dtype=object)
+        engine.init_cache(cache_size)
+        logging.info("Opened IP range index %s with %d ranges.", path, n_ranges)
+        return engine
+
+    @classmethod
+    def from_csv(cls, csv_path, index_path=None, cache_size=LOOKUP_CACHE_SIZE):
+        """
+        Load the engine for an `IpAddress_to_Country` csv, reusing a prebuilt index.
+
+        The index next to the csv (or at `index_path`) is opened if it was built from
+        the same csv content. A missing, corrupt or stale index is rebuilt from the
+        csv and written back before being opened.
+
+        Parameters:
+        ----------
+        csv_path : str
+            Path of the IP ranges csv.
+        index_path : str, optional
+            Path of the index file, defaults to the csv path with an `.idx` suffix.
+        cache_size : int, optional
+            Size of the `lookup` LRU cache.
+
+        Returns:
+        -------
+        SortedIPGeolocation
+            An engine backed by the memory mapped index.
+        """
+        if index_path is None:
+            index_path = os.path.splitext(csv_path)[0] + '.idx'
+        checksum = file_checksum(csv_path)
+        try:
+            return cls.from_index(index_path, checksum=checksum, cache_size=cache_size)
+        except (OSError, ValueError) as e:
+            logging.info("Rebuilding IP range index %s: %s", index_path, str(e))
+        cls(pd.read_csv(csv_path)).save_index(index_path, checksum=checksum)
+        return cls.from_index(index_path, checksum=checksum, cache_size=cache_size)
+
+    @timed
+    def map_ips_to_countries(self, df_ips):
+        try:
+            logging.info(
+                "Mapping IPs to countries for %d IP addresses.", len(df_ips))
+            df_ips['ip_int'] = df_ips['ip_address'].astype(int)
+            df_ips['country'] = pd.Series(
+                self.resolve(df_ips['ip_int'].to_numpy()), index=df_ips.index)
+            matched_count = df_ips['country'].notnull().sum()
+            logging.info(
+                "Successfully matched %d IPs to countries.", matched_count)
+            return df_ips[OUTPUT_COLUMNS]
         except Exception as e:
             logging.error("Error mapping IPs to countries: %s", str(e))
             raise
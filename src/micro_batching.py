@@ -0,0 +1,210 @@
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from collections import deque
+import numpy as np
+import logging
+import queue
+import threading
+import time
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    filename='../logs/micro_batching.log'
+)
+
+logging.info(
+    '****************************Logging started for Micro Batching module****************************')
+
+# Seconds between checks that the worker is alive while a request waits
+WORKER_CHECK_INTERVAL = 0.5
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-row prediction requests into batched model calls.
+
+    Requests are queued by `submit`; a background worker takes the first waiting
+    request, keeps collecting until either `max_batch_size` rows are queued or
+    `max_wait` seconds have passed since that first request arrived, scores them
+    with one `predict_fn` call and hands each caller its own result. If the batch
+    call fails, its rows are scored one at a time so one malformed row only fails
+    its own request.
+
+    Attributes:
+    ----------
+    predict_fn : callable
+        Takes a 2D array of rows (and their key, for rows submitted with one) and
+        returns one result per row.
+    max_batch_size : int
+        Maximum number of rows scored in one call.
+    max_wait : float
+        Maximum time in seconds a request waits for the batch to fill up.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=64, max_wait=0.002, history=1024):
+        if max_batch_size < 1:
+            raise ValueError('max_batch_size must be at least 1')
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        # (batch size, oldest request wait, model call latency) of the recent batches
+        self._batches = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self._total_batches = 0
+        self._total_rows = 0
+        self._worker = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        """Start the background worker thread, if it is not running yet."""
+        if self._worker is None or not self._worker.is_alive():
+            self._stopped.clear()
+            self._worker = threading.Thread(
+                target=self._run, name='micro-batcher', daemon=True)
+            self._worker.start()
+            logging.info('Micro batcher started with max_batch_size=%d, max_wait=%.4fs',
+                         self.max_batch_size, self.max_wait)
+        return self
+
+    def stop(self, timeout=None):
+        """Stop the worker once the requests already queued have been scored."""
+        self._stopped.set()
+        self._queue.put(None)
+        if self._worker is not None:
+            self._worker.join(timeout)
+        logging.info('Micro batcher stopped')
+
+    def submit(self, row, timeout=None, key=None):
+        """
+        Queue one row and block until its prediction is available.
+
+        Parameters:
+        ----------
+        row : sequence
+            Feature values of a single record.
+        timeout : float, optional
+            Seconds to wait for the result before raising TimeoutError.
+        key : hashable, optional
+            Rows are only batched with rows of the same key, which is passed to
+            `predict_fn(rows, key)`, e.g. the model version the row was built for.
+
+        Returns:
+        -------
+        object
+            The prediction for `row`.
+        """
+        if self._worker is None or self._stopped.is_set():
+            raise RuntimeError('micro batcher is not running')
+        future = Future()
+        self._queue.put((row, future, time.perf_counter(), key))
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            # wait in slices so a dead worker is noticed even without a timeout
+            remaining = None if deadline is None else deadline - time.monotonic()
+            try:
+                return future.result(WORKER_CHECK_INTERVAL if remaining is None
+                                     else max(0.0, min(remaining, WORKER_CHECK_INTERVAL)))
+            except FutureTimeoutError:
+                if not self._worker.is_alive():
+                    raise RuntimeError('micro batcher worker is not running')
+                if remaining is not None and remaining <= WORKER_CHECK_INTERVAL:
+                    raise TimeoutError(f'no prediction within {timeout}s')
+
+    def _collect(self, first):
+        batch = [first]
+        deadline = first[2] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # stop sentinel, put it back so the run loop exits after this batch
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                if self._stopped.is_set():
+                    return
+                continue
+            groups = {}
+            for item in self._collect(first):
+                groups.setdefault(item[3], []).append(item)
+            for key, batch in groups.items():
+                self._score(batch, key)
+
+    def _predict(self, batch, key):
+        rows = np.asarray([row for row, _, _, _ in batch])
+        results = self.predict_fn(rows) if key is None else self.predict_fn(rows, key)
+        if len(results) != len(batch):
+            raise ValueError(f'predict_fn returned {len(results)} results for {len(batch)} rows')
+        return results
+
+    def _score(self, batch, key):
+        start = time.perf_counter()
+        try:
+            try:
+                results = self._predict(batch, key)
+            except Exception as e:
+                if len(batch) == 1:
+                    raise
+                # e.g. a malformed row that cannot be stacked: scored one at a time, so
+                # only its own caller gets the error
+                logging.warning(f'Micro batch of {len(batch)} rows failed ({e}), scoring its rows one by one')
+                for item in batch:
+                    try:
+                        item[1].set_result(self._predict([item], key)[0])
+                    except Exception as row_error:
+                        item[1].set_exception(row_error)
+            else:
+                for (_, future, _, _), result in zip(batch, results):
+                    future.set_result(result)
+        except BaseException as e:
+            # every caller of the batch gets the error, none is left waiting
+            logging.error(f'Error scoring micro batch of {len(batch)} rows: {e}')
+            for _, future, _, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+        latency = time.perf_counter() - start
+        with self._lock:
+            self._batches.append((len(batch), start - batch[0][2], latency))
+            self._total_batches += 1
+            self._total_rows += len(batch)
+
+    def metrics(self):
+        """
+        Summarize the batches scored so far.
+
+        Percentiles are computed over the most recent batches only (see `history`).
+
+        Returns:
+        -------
+        dict
+            Knob values, totals and batch size / wait / latency statistics in ms.
+        """
+        with self._lock:
+            recent = np.array(self._batches, dtype=np.float64).reshape(-1, 3)
+            totals = {'batches': self._total_batches, 'rows': self._total_rows}
+        summary = {'max_batch_size': self.max_batch_size,
+                   'max_wait_ms': self.max_wait * 1000, **totals,
+                   'queued': self._queue.qsize()}
+        if len(recent):
+            sizes, waits, latencies = recent.T
+            summary.update({
+                'batch_size_mean': float(sizes.mean()),
+                'batch_size_max': int(sizes.max()),
+                'queue_wait_ms_p50': float(np.percentile(waits, 50) * 1000),
+                'queue_wait_ms_p99': float(np.percentile(waits, 99) * 1000),
+                'batch_latency_ms_p50': float(np.percentile(latencies, 50) * 1000),
+                'batch_latency_ms_p99': float(np.percentile(latencies, 99) * 1000),
+            })
+        return summary
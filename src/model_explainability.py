@@ -2,8 +2,15 @@ import shap
 import lime
 import lime.lime_tabular
 import numpy as np
+import pandas as pd
 import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import joblib
 import logging
+import os
+
+from src.instrumentation import rows_of, timed
 
 logging.basicConfig(
     filename='../logs/model-explainability.log',
@@ -11,6 +18,72 @@ logging.basicConfig(
     level=logging.INFO
 )
 
+# Cached SHAP value arrays, one .npy file per model / data / background combination
+SHAP_CACHE_DIR = '../cache/shap'
+
+# explainer and rows shared by the chunks of a worker process, set once by `_init_worker`
+_shared = {}
+
+
+def _fraud_output(model):
+    """Index of the fraud class among the model's outputs."""
+    classes = list(getattr(model, 'classes_', []))
+    return classes.index(1) if 1 in classes else -1
+
+
+def _init_worker(model, background, x_test):
+    _shared.update(explainer=shap.Explainer(model, background), x_test=x_test,
+                   output=_fraud_output(model))
+
+
+def _shap_chunk(path, start, stop):
+    """SHAP values of rows `start:stop` of the test set, written into the array at `path`."""
+    values = _shared['explainer'](_shared['x_test'][start:stop], check_additivity=False).values
+    if values.ndim == 3:
+        values = values[:, :, _shared['output']]
+    out = np.load(path, mmap_mode='r+')
+    out[start:stop] = values
+    out.flush()
+    return stop - start
+
+
+def _predict_frame(predict, columns, rows):
+    # LIME perturbs bare arrays, the model was fitted on a named frame
+    return predict(pd.DataFrame(rows, columns=columns))
+
+
+def _init_lime_worker(model, training_data, feature_names, random_state):
+    # classification mode on the fraud probabilities, one explainer per process
+    classes = list(getattr(model, 'classes_', [0, 1]))
+    predict = model.predict_proba
+    fitted_names = getattr(model, 'feature_names_in_', None)
+    if fitted_names is not None:
+        predict = partial(_predict_frame, predict, list(fitted_names))
+    _shared.update(
+        lime_explainer=lime.lime_tabular.LimeTabularExplainer(
+            training_data=training_data, feature_names=feature_names, mode='classification',
+            class_names=['Fraud' if c == 1 else 'Not Fraud' for c in classes], random_state=random_state),
+        lime_predict=predict, lime_label=_fraud_output(model) % len(classes),
+        lime_seed=random_state)
+
+
+def _lime_instance(index, row, num_features, num_samples):
+    """LIME explanation of one test row as a list of result records, one per feature."""
+    explainer, label = _shared['lime_explainer'], _shared['lime_label']
+    # seeded per instance, so results do not depend on which worker explains it
+    explainer.random_state = np.random.RandomState(_shared['lime_seed'] + index)
+    if explainer.discretizer is not None:
+        explainer.discretizer.random_state = explainer.random_state
+    exp = explainer.explain_instance(row, _shared['lime_predict'], labels=(label,),
+                                     num_features=num_features, num_samples=num_samples)
+    common = {'instance_index': index, 'fraud_probability': float(exp.predict_proba[label]),
+              'local_prediction': float(exp.local_pred[0]), 'intercept': float(exp.intercept[label]),
+              'score': float(exp.score)}
+    return [{**common, 'rank': rank, 'feature': explainer.feature_names[feature], 'condition': condition,
+             'weight': weight}
+            for rank, ((feature, weight), (condition, _)) in enumerate(
+                zip(exp.as_map()[label], exp.as_list(label=label)), start=1)]
+
 
 class ModelExplainability:
     """
@@ -37,14 +110,130 @@ class ModelExplainability:
         self.x_test = x_test
         self.feature_names = feature_names
 
-    def explain_with_shap(self):
+    def shap_background(self, size=100, method='sample', random_state=42):
+        """
+        Small background set summarizing `x_train` for the SHAP explainers.
+
+        Parameters:
+        ----------
+        size : int, optional
+            Number of background rows.
+        method : str, optional
+            'sample' for a random sample of the training rows, 'kmeans' for k-means
+            centroids of the training data (`shap.kmeans`, its cluster weights are not
+            used by the tree explainers).
+        random_state : int, optional
+            Seed of the sample.
+
+        Returns:
+        -------
+        pd.DataFrame
+            Background rows with the training columns.
+        """
+        if method == 'sample':
+            return shap.utils.sample(self.x_train, min(size, len(self.x_train)), random_state=random_state)
+        if method == 'kmeans':
+            centroids = shap.kmeans(self.x_train, min(size, len(self.x_train))).data
+            columns = getattr(self.x_train, 'columns', None)
+            return pd.DataFrame(centroids, columns=columns) if columns is not None else centroids
+        raise ValueError(f'unknown background method {method}, expected sample or kmeans')
+
+    def shap_cache_key(self, background_size, background_method, random_state):
+        """Hash of the model, the data and the background settings naming the cached values."""
+        return joblib.hash((self.model, self.x_train, self.x_test,
+                            background_size, background_method, random_state))
+
+    @timed(rows=rows_of('x_test'))
+    def compute_shap_values(self, background_size=100, background_method='sample', chunk_size=1000,
+                            n_workers=1, cache_dir=SHAP_CACHE_DIR, random_state=42):
+        """
+        SHAP values of the fraud output for every row of `x_test`, computed in chunks
+        against a summarized background and cached on disk.
+
+        The chunks are scored in a pool of `n_workers` processes, each building the
+        explainer once, and written straight into a .npy file, so the values are never
+        all held in memory. The file is named after a hash of the model, the training
+        and test data and the background settings; a later call with the same inputs
+        opens it instead of recomputing.
+
+        Parameters:
+        ----------
+        background_size : int, optional
+            Rows of background data, see `shap_background`.
+        background_method : str, optional
+            'sample' or 'kmeans'.
+        chunk_size : int, optional
+            Test rows explained per task.
+        n_workers : int, optional
+            Worker processes, the chunks are run in this process when 1.
+        cache_dir : str, optional
+            Directory of the cached arrays.
+        random_state : int, optional
+            Seed of the background sample.
+
+        Returns:
+        -------
+        np.ndarray
+            Read-only memory mapped array of shape (rows of x_test, features).
+        """
+        try:
+            key = self.shap_cache_key(background_size, background_method, random_state)
+            path = os.path.join(cache_dir, f'shap_{key}.npy')
+            if os.path.exists(path):
+                logging.info(f'Using cached SHAP values {path}')
+                return np.load(path, mmap_mode='r')
+
+            os.makedirs(cache_dir, exist_ok=True)
+            background = self.shap_background(background_size, background_method, random_state)
+            tmp_path = os.path.join(cache_dir, f'.shap_{key}.{os.getpid()}.npy')
+            np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float64,
+                                      shape=(len(self.x_test), self.x_test.shape[1])).flush()
+            chunks = [(start, min(start + chunk_size, len(self.x_test)))
+                      for start in range(0, len(self.x_test), chunk_size)]
+            logging.info(f'Computing SHAP values of {len(self.x_test)} rows in {len(chunks)} chunks '
+                         f'with {n_workers} workers, {len(background)} background rows')
+            try:
+                if n_workers > 1:
+                    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                             initargs=(self.model, background, self.x_test)) as pool:
+                        for _ in pool.map(_shap_chunk, [tmp_path] * len(chunks), *zip(*chunks)):
+                            pass
+                else:
+                    _init_worker(self.model, background, self.x_test)
+                    for start, stop in chunks:
+                        _shap_chunk(tmp_path, start, stop)
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+            finally:
+                _shared.clear()
+            os.replace(tmp_path, path)
+            logging.info(f'SHAP values cached to {path}')
+            return np.load(path, mmap_mode='r')
+        except Exception as e:
+            logging.error(f"Error computing SHAP values: {e}")
+            raise
+
+    @timed(rows=rows_of('x_test'))
+    def explain_with_shap(self, fast=False, **shap_options):
         """
         Explain the model using SHAP values and generate plots.
+
+        Parameters:
+        ----------
+        fast : bool, optional
+            Use the chunked, parallel and cached `compute_shap_values` (with a summarized
+            background) instead of explaining `x_test` against the whole training set.
+        **shap_options
+            Arguments of `compute_shap_values` when `fast` is set.
         """
         try:
-            logging.info('Initializing SHAP explainer...')
-            explainer = shap.Explainer(self.model, self.x_train)
-            shap_values = explainer(self.x_test, check_additivity=False)
+            if fast:
+                shap_values = np.asarray(self.compute_shap_values(**shap_options))
+            else:
+                logging.info('Initializing SHAP explainer...')
+                explainer = shap.Explainer(self.model, self.x_train)
+                shap_values = explainer(self.x_test, check_additivity=False)
 
             logging.info('Generating SHAP plots...')
             plt.figure()
@@ -66,6 +255,7 @@ class ModelExplainability:
             logging.error(f"Error generating SHAP explanations: {e}")
             raise
 
+    @timed(rows=lambda self, *args, **kwargs: 1)
     def explain_with_lime(self, instance_index=0):
         """
         Explain an individual prediction using LIME.
@@ -99,3 +289,62 @@ class ModelExplainability:
         except Exception as e:
             logging.error(f"Error generating LIME explanations: {e}")
             raise
+
+    @timed(rows=lambda self, instance_indices, *args, **kwargs: len(instance_indices))
+    def explain_instances_with_lime(self, instance_indices, num_features=10, num_samples=5000, n_workers=1,
+                                    output_path='../plots/lime_explanations.csv', random_state=42):
+        """
+        Explain a batch of test instances with LIME, e.g. a queue of flagged transactions.
+
+        The explainer is built once per process in classification mode and explains the
+        fraud probability from `predict_proba`. Instances are spread over `n_workers`
+        processes and every instance is explained with its own seed, so the results
+        do not depend on the number of workers.
+
+        Parameters:
+        ----------
+        instance_indices : list
+            Positions in `x_test` of the instances to explain.
+        num_features : int, optional
+            Features kept per explanation.
+        num_samples : int, optional
+            Perturbed samples drawn per explanation, fewer is faster and noisier.
+        n_workers : int, optional
+            Worker processes, the instances are explained in this process when 1.
+        output_path : str, optional
+            File the explanations are written to (.csv, or .parquet), not written when None.
+        random_state : int, optional
+            Base seed of the perturbations.
+
+        Returns:
+        -------
+        pd.DataFrame
+            One row per (instance, feature): instance_index, fraud_probability,
+            local_prediction, intercept, score, rank, feature, condition and weight.
+        """
+        try:
+            x_test = np.asarray(self.x_test)
+            initargs = (self.model, np.asarray(self.x_train), list(self.feature_names), random_state)
+            tasks = [(int(i), x_test[i], num_features, num_samples) for i in instance_indices]
+            logging.info(f'Generating LIME explanations for {len(tasks)} instances with {n_workers} workers...')
+            if n_workers > 1:
+                with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_lime_worker,
+                                         initargs=initargs) as pool:
+                    results = list(pool.map(_lime_instance, *zip(*tasks),
+                                            chunksize=max(1, len(tasks) // (4 * n_workers))))
+            else:
+                _init_lime_worker(*initargs)
+                results = [_lime_instance(*task) for task in tasks]
+            explanations = pd.DataFrame([record for records in results for record in records])
+
+            if output_path is not None:
+                os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+                if output_path.endswith('.parquet'):
+                    explanations.to_parquet(output_path, index=False)
+                else:
+                    explanations.to_csv(output_path, index=False)
+                logging.info(f'LIME explanations of {len(tasks)} instances saved to {output_path}.')
+            return explanations
+        except Exception as e:
+            logging.error(f"Error generating LIME explanations: {e}")
+            raise
@@ -0,0 +1,339 @@
+from datetime import datetime, timezone
+import joblib
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+
+from src.compiled_forest import CompiledForest
+from src.encoding import FittedPreprocessor
+from src.model_training import EvaluateModel
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    filename='../logs/model_registry.log'
+)
+
+logging.info(
+    '****************************Logging started for Model Registry module****************************')
+
+# Files of a version directory
+MODEL_FILE = 'model.pkl'
+COMPILED_FILE = 'model.forest'
+PREPROCESSOR_FILE = 'preprocessor.pkl'
+FEATURES_FILE = 'features.json'
+METRICS_FILE = 'metrics.json'
+
+METRIC_NAMES = ('accuracy', 'precision', 'recall', 'f1', 'roc_auc')
+
+VERSION_PATTERN = re.compile(r'^v(\d+)$')
+
+
+class ModelVersion:
+    """
+    One registered model version, its artifacts loaded on first use.
+
+    The compiled forest (used for predictions) and the joblib model are opened with
+    their numpy arrays memory mapped, so several processes serving the same version
+    share the pages.
+
+    Attributes:
+    ----------
+    name : str
+        Registered model name.
+    version : str
+        Version directory name, e.g. 'v3'.
+    path : str
+        Version directory.
+    loaded_at : datetime
+        UTC time the prediction artifacts were loaded, None until then.
+    load_seconds : float
+        Time spent loading them.
+    """
+
+    def __init__(self, name, version, path, mmap_mode='r'):
+        self.name = name
+        self.version = version
+        self.path = path
+        self.mmap_mode = mmap_mode
+        self.loaded_at = None
+        self.load_seconds = None
+        self._artifacts = {}
+        self._lock = threading.Lock()
+
+    def _artifact(self, key, load):
+        artifact = self._artifacts.get(key)
+        if artifact is None:
+            with self._lock:
+                if key not in self._artifacts:
+                    self._artifacts[key] = load()
+                artifact = self._artifacts[key]
+        return artifact
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _read_json(self, name):
+        with open(self._file(name)) as f:
+            return json.load(f)
+
+    @property
+    def forest(self):
+        """Compiled evaluator of the model, built from the pickle if missing."""
+        return self._artifact('forest', lambda: CompiledForest.from_model_file(
+            self._file(MODEL_FILE), self._file(COMPILED_FILE), mmap_mode=self.mmap_mode))
+
+    @property
+    def model(self):
+        """The fitted model object, e.g. for SHAP."""
+        return self._artifact('model', lambda: joblib.load(self._file(MODEL_FILE), mmap_mode=self.mmap_mode))
+
+    @property
+    def preprocessor(self):
+        """Fitted preprocessing artifact, None if the version has none."""
+        def load():
+            path = self._file(PREPROCESSOR_FILE)
+            return FittedPreprocessor.load(path) if os.path.exists(path) else False
+        return self._artifact('preprocessor', load) or None
+
+    @property
+    def feature_names(self):
+        """Model input columns, in training order."""
+        return self._artifact('feature_names', lambda: self._read_json(FEATURES_FILE))
+
+    @property
+    def metrics(self):
+        """Evaluation metrics recorded at registration, empty if none."""
+        return self._artifact('metrics', lambda: self._read_json(METRICS_FILE)
+                              if os.path.exists(self._file(METRICS_FILE)) else {})
+
+    def load(self):
+        """Load everything needed to serve predictions and record the load time."""
+        try:
+            start = time.perf_counter()
+            for artifact in ('forest', 'model', 'preprocessor', 'feature_names', 'metrics'):
+                getattr(self, artifact)
+            self.load_seconds = time.perf_counter() - start
+            self.loaded_at = datetime.now(timezone.utc)
+            logging.info(f'{self.name} {self.version} loaded in {self.load_seconds:.3f}s')
+            return self
+        except Exception as e:
+            logging.error(f'Error loading {self.name} {self.version} from {self.path}: {e}')
+            raise
+
+    def info(self):
+        """Name, version, path, feature names, load time and metrics, JSON serializable."""
+        return {
+            'name': self.name,
+            'version': self.version,
+            'path': self.path,
+            'feature_names': self.feature_names,
+            'loaded_at': self.loaded_at.isoformat() if self.loaded_at else None,
+            'load_seconds': self.load_seconds,
+            'metrics': self.metrics,
+        }
+
+
+class ModelRegistry:
+    """
+    Local on-disk registry of versioned models.
+
+    Each model name has a directory of versions `v1`, `v2`, ... holding the joblib
+    model, its compiled forest, the preprocessing artifact, the feature list and the
+    evaluation metrics. A version is written to a temporary directory and renamed into
+    place, so readers never see a partial version.
+
+    Attributes:
+    ----------
+    root : str
+        Registry directory.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def versions(self, name):
+        """Registered versions of `name`, oldest first."""
+        model_dir = os.path.join(self.root, name)
+        if not os.path.isdir(model_dir):
+            return []
+        numbers = [int(m.group(1)) for m in map(VERSION_PATTERN.match, os.listdir(model_dir)) if m]
+        return [f'v{n}' for n in sorted(numbers)]
+
+    def latest(self, name):
+        """Most recent version of `name`."""
+        versions = self.versions(name)
+        if not versions:
+            raise ValueError(f'no registered version of {name} in {self.root}')
+        return versions[-1]
+
+    def register(self, name, model, feature_names, preprocessor=None, metrics=None, x_test=None, y_test=None):
+        """
+        Store a trained model as the next version of `name`.
+
+        Parameters:
+        ----------
+        name : str
+            Model name, e.g. 'RF'.
+        model : object
+            Fitted model.
+        feature_names : list
+            Model input columns, in training order.
+        preprocessor : FittedPreprocessor, optional
+            Encoding / scaling fitted with the model.
+        metrics : dict, optional
+            Metrics to record; computed with `EvaluateModel` when `x_test` / `y_test` are given.
+
+        Returns:
+        -------
+        str
+            The new version.
+        """
+        try:
+            if metrics is None and x_test is not None:
+                scores = EvaluateModel().evaluate_model(model, x_test, y_test)[:len(METRIC_NAMES)]
+                metrics = {metric: float(score) for metric, score in zip(METRIC_NAMES, scores)}
+            model_dir = os.path.join(self.root, name)
+            os.makedirs(model_dir, exist_ok=True)
+            tmp_dir = os.path.join(model_dir, f'.tmp-{os.getpid()}-{threading.get_ident()}')
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            os.makedirs(tmp_dir)
+            # uncompressed so the arrays can be memory mapped on load
+            joblib.dump(model, os.path.join(tmp_dir, MODEL_FILE))
+            if preprocessor is not None:
+                preprocessor.save(os.path.join(tmp_dir, PREPROCESSOR_FILE))
+            with open(os.path.join(tmp_dir, FEATURES_FILE), 'w') as f:
+                json.dump(list(feature_names), f)
+            with open(os.path.join(tmp_dir, METRICS_FILE), 'w') as f:
+                json.dump({**(metrics or {}), 'registered_at': datetime.now(timezone.utc).isoformat()}, f)
+            CompiledForest.from_model_file(os.path.join(tmp_dir, MODEL_FILE), os.path.join(tmp_dir, COMPILED_FILE))
+            while True:
+                versions = self.versions(name)
+                version = f'v{int(versions[-1][1:]) + 1}' if versions else 'v1'
+                try:
+                    # fails if a concurrent registration took the same version
+                    os.rename(tmp_dir, os.path.join(model_dir, version))
+                    break
+                except OSError:
+                    if not os.path.isdir(os.path.join(model_dir, version)):
+                        raise
+            logging.info(f'Registered {name} {version}')
+            return version
+        except Exception as e:
+            logging.error(f'Error registering {name}: {e}')
+            raise
+
+    def get(self, name, version=None, mmap_mode='r'):
+        """
+        Version `version` (latest by default) of `name`, not loaded yet.
+
+        Returns:
+        -------
+        ModelVersion
+        """
+        version = version or self.latest(name)
+        path = os.path.join(self.root, name, version)
+        if not os.path.isdir(path):
+            raise ValueError(f'{name} has no version {version} in {self.root}')
+        return ModelVersion(name, version, path, mmap_mode=mmap_mode)
+
+
+class ActiveModel:
+    """
+    The model version currently served, loaded lazily and swapped atomically.
+
+    `current` loads the pinned (or latest) version on first use. `swap` fully loads
+    the new version before replacing the reference, so requests never wait for a
+    load after startup; requests that already hold the previous version finish with it.
+
+    Worker processes forked from one parent can share a `shared_version`
+    (`multiprocessing.Array('c', size)`): a swap in one worker publishes the version
+    there. The first request of another worker that notices it starts loading that
+    version in a background thread and, like the requests after it, keeps being served
+    the previous version until the load is done; the new version is then swapped in.
+
+    `on_load(version)`, if given, runs on every newly loaded version before it is
+    served, e.g. to build caches derived from the model.
+    """
+
+    def __init__(self, registry, name, version=None, shared_version=None, on_load=None):
+        self.registry = registry
+        self.name = name
+        self.version = version
+        self.shared_version = shared_version
+        self.on_load = on_load
+        self._current = None
+        self._lock = threading.Lock()
+        # version being loaded in the background after another worker published it
+        self._following = None
+        self._following_lock = threading.Lock()
+
+    def _load(self, version):
+        loaded = self.registry.get(self.name, version).load()
+        if self.on_load is not None:
+            self.on_load(loaded)
+        return loaded
+
+    def _published(self):
+        return self.shared_version.value.decode() if self.shared_version is not None else ''
+
+    def _publish(self, version):
+        if self.shared_version is not None:
+            self.shared_version.value = version.encode()
+
+    def _follow(self, version):
+        # runs in a background thread, requests are served the current version meanwhile
+        try:
+            loaded = self._load(version)
+        except Exception as e:
+            logging.error(f'Error loading {self.name} {version} published by another worker: {e}')
+            loaded = None
+        with self._lock:
+            # a swap of this worker, or a newer publish, may have happened during the load
+            if loaded is not None and self._published() == version:
+                self._current = loaded
+                self.version = version
+                logging.info(f'{self.name} followed the swap to {version}')
+        with self._following_lock:
+            self._following = None
+
+    @property
+    def current(self):
+        """The served ModelVersion, loaded on first access."""
+        current = self._current
+        if current is None:
+            with self._lock:
+                if self._current is None:
+                    self._current = self._load(self._published() or self.version)
+                    self.version = self._current.version
+                    self._publish(self.version)
+                return self._current
+        published = self._published()
+        if published and published != current.version:
+            with self._following_lock:
+                if self._following is None:
+                    self._following = published
+                    threading.Thread(target=self._follow, args=(published,), daemon=True,
+                                     name=f'follow-{self.name}-{published}').start()
+        return current
+
+    def swap(self, version=None):
+        """
+        Load `version` (latest by default) and make it the served version.
+
+        Returns:
+        -------
+        ModelVersion
+            The newly active version.
+        """
+        with self._lock:
+            new = self._load(version)
+            self._current = new
+            self.version = new.version
+            self._publish(new.version)
+        logging.info(f'{self.name} swapped to {new.version}')
+        return new
@@ -1,9 +1,17 @@
 from sklearn.tree import DecisionTreeClassifier
 from sklearn.ensemble import RandomForestClassifier
 from xgboost import XGBClassifier
+import xgboost as xgb
 from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+import joblib
 import logging
+import os
+import time
+
+from src.instrumentation import rows_of, timed
 
 
 logging.basicConfig(
@@ -15,6 +23,9 @@ logging.basicConfig(
 logging.info(
     '****************************Logging started for Model Training module****************************')
 
+# np.trapezoid is NumPy 2 only, np.trapz its name before
+_trapezoid = getattr(np, 'trapezoid', None) or np.trapz
+
 
 class SplitData:
     """
@@ -50,6 +61,34 @@ class SplitData:
             logging.error(f"Error splitting data: {e}")
             raise
 
+    def split_data_with_validation(self, validation_size=0.2):
+        """
+        Splits the data into training, validation and testing sets.
+
+        The testing set is the same 20% as `split_data`; the validation set is carved
+        out of the remaining training data, stratified on the target so the rare fraud
+        class is present in it (needed for early stopping on AUC / PR-AUC).
+
+        Parameters:
+        ----------
+        validation_size : float, optional
+            Share of the training data held out for validation (default 0.2).
+
+        Returns:
+        -------
+        tuple
+            x_train, x_val, x_test, y_train, y_val, y_test.
+        """
+        try:
+            x_train, x_test, y_train, y_test = self.split_data()
+            x_train, x_val, y_train, y_val = train_test_split(
+                x_train, y_train, test_size=validation_size, random_state=42, stratify=y_train)
+            logging.info(f"Validation set of {len(x_val)} rows held out from the training data.")
+            return x_train, x_val, x_test, y_train, y_val, y_test
+        except Exception as e:
+            logging.error(f"Error splitting validation data: {e}")
+            raise
+
 
 class TrainData:
     """
@@ -67,6 +106,7 @@ class TrainData:
         self.x_train = x_train
         self.y_train = y_train
 
+    @timed(rows=rows_of('x_train'))
     def decision_tree_Classifier(self):
         """
         Initializes the Decision Tree Regressor model and fits it to the training data.
@@ -88,19 +128,25 @@ class TrainData:
             logging.error(f"Error training Decision Tree Regressor model: {e}")
             raise
 
-    def random_forest(self):
+    @timed(rows=rows_of('x_train'))
+    def random_forest(self, n_jobs=-1):
         """
         Initializes the Random Forest model and fits it to the training data.
 
+        Parameters:
+        ----------
+        n_jobs : int, optional
+            Number of threads used to build the trees (default -1, all CPUs).
+
         Returns:
         -------
         RandomForestRegressor
             A Random Forest model fitted on the training data.
         """
         try:
-            logging.info('initializing random forest with all CPUs')
+            logging.info(f'initializing random forest with n_jobs={n_jobs}')
             random_forest_model = RandomForestClassifier(
-                n_estimators=100, n_jobs=-1, class_weight="balanced")
+                n_estimators=100, n_jobs=n_jobs, class_weight="balanced")
             logging.info(
                 'fitting train set to --- [RandomForest Classifier] ---')
             random_forest_model.fit(self.x_train, self.y_train)
@@ -110,10 +156,16 @@ class TrainData:
             logging.error(f"Error training Random Forest model: {e}")
             raise
 
-    def xgboost_classifier(self):
+    @timed(rows=rows_of('x_train'))
+    def xgboost_classifier(self, n_jobs=None):
         """
         Initializes the XGBoost model and fits it to the training data.
 
+        Parameters:
+        ----------
+        n_jobs : int, optional
+            Number of threads used by XGBoost (default None, XGBoost's own default).
+
         Returns:
         -------
         XGBRegressor
@@ -121,7 +173,7 @@ class TrainData:
         """
         try:
             # Adjust scale_pos_weight based on imbalance
-            xg_model = XGBClassifier(random_state=42, scale_pos_weight=49)
+            xg_model = XGBClassifier(random_state=42, scale_pos_weight=49, n_jobs=n_jobs)
             logging.info(
                 'fitting train set to --- [XGBRegressor Classifier] ---')
             xg_model.fit(self.x_train, self.y_train)
@@ -131,21 +183,171 @@ class TrainData:
             logging.error(f"Error training XGBoost model: {e}")
             raise
 
+    @timed(rows=rows_of('x_train'))
+    def xgboost_hist_classifier(self, x_val, y_val, eval_metric='aucpr', early_stopping_rounds=50,
+                                n_estimators=1000, n_jobs=None, max_bin=256, **params):
+        """
+        Trains XGBoost with the histogram tree method and early stopping on a validation set.
+
+        Trees are added until `eval_metric` on the validation set has not improved for
+        `early_stopping_rounds` rounds, so the model only keeps as many trees as needed.
+
+        Parameters:
+        ----------
+        x_val, y_val : pd.DataFrame, pd.Series
+            Validation set, e.g. from `SplitData.split_data_with_validation`.
+        eval_metric : str, optional
+            'aucpr' (default) or 'auc'.
+        early_stopping_rounds : int, optional
+            Rounds without improvement before training stops.
+        n_estimators : int, optional
+            Upper bound on the number of trees.
+        n_jobs : int, optional
+            Number of threads used by XGBoost.
+        max_bin : int, optional
+            Number of histogram bins per feature.
+        **params :
+            Extra XGBClassifier parameters.
+
+        Returns:
+        -------
+        XGBClassifier
+            The fitted model, `best_iteration` holds the selected number of trees - 1.
+        """
+        try:
+            xg_model = XGBClassifier(
+                tree_method='hist', max_bin=max_bin, n_estimators=n_estimators, n_jobs=n_jobs,
+                eval_metric=eval_metric, early_stopping_rounds=early_stopping_rounds,
+                random_state=42, **{'scale_pos_weight': 49, **params})
+            logging.info(
+                'fitting train set to --- [XGBoost hist Classifier, early stopping] ---')
+            xg_model.fit(self.x_train, self.y_train, eval_set=[(x_val, y_val)], verbose=False)
+            logging.info(f"XGBoost hist model trained with {xg_model.best_iteration + 1} trees.")
+            return xg_model
+        except Exception as e:
+            logging.error(f"Error training XGBoost hist model: {e}")
+            raise
+
+
+class XGBoostTrials:
+    """
+    Runs several XGBoost hyperparameter trials on the same quantized training data.
+
+    The training and validation sets are binned once into `xgb.QuantileDMatrix` objects
+    (the validation matrix reuses the training bin edges) and every trial trains on
+    them directly, instead of re-quantizing the data for each set of parameters.
+
+    Attributes:
+    ----------
+    dtrain, dval : xgb.QuantileDMatrix
+        Quantized training and validation data.
+    results : list
+        Parameters, best iteration and best validation score of every trial.
+    """
+
+    def __init__(self, x_train, y_train, x_val, y_val, max_bin=256, n_jobs=None):
+        self.max_bin = max_bin
+        self.n_jobs = n_jobs
+        self.dtrain = xgb.QuantileDMatrix(x_train, y_train, max_bin=max_bin, nthread=n_jobs)
+        self.dval = xgb.QuantileDMatrix(x_val, y_val, ref=self.dtrain, nthread=n_jobs)
+        self.results = []
+        logging.info(f"Quantized {self.dtrain.num_row()} training rows into {max_bin} bins.")
+
+    def train(self, eval_metric='aucpr', early_stopping_rounds=50, n_estimators=1000, **params):
+        """
+        Trains one trial with early stopping on the validation set.
+
+        Parameters:
+        ----------
+        eval_metric : str, optional
+            'aucpr' (default) or 'auc'.
+        early_stopping_rounds : int, optional
+            Rounds without improvement before training stops.
+        n_estimators : int, optional
+            Upper bound on the number of boosting rounds.
+        **params :
+            XGBoost training parameters of the trial (max_depth, eta, ...).
+
+        Returns:
+        -------
+        XGBClassifier
+            The trial's model, usable with `EvaluateModel`.
+        """
+        try:
+            booster_params = {'objective': 'binary:logistic', 'tree_method': 'hist',
+                              'max_bin': self.max_bin, 'eval_metric': eval_metric,
+                              'scale_pos_weight': 49, 'seed': 42, **params}
+            if self.n_jobs is not None:
+                booster_params['nthread'] = self.n_jobs
+            booster = xgb.train(booster_params, self.dtrain, num_boost_round=n_estimators,
+                                evals=[(self.dval, 'validation')],
+                                early_stopping_rounds=early_stopping_rounds, verbose_eval=False)
+            self.results.append({**params, 'best_iteration': booster.best_iteration,
+                                 f'best_{eval_metric}': booster.best_score})
+            logging.info(f"XGBoost trial {params} stopped at {booster.best_iteration + 1} trees, "
+                         f"validation {eval_metric}={booster.best_score:.4f}")
+            xg_model = XGBClassifier()
+            xg_model.load_model(bytearray(booster.save_raw()))
+            return xg_model
+        except Exception as e:
+            logging.error(f"Error in XGBoost trial: {e}")
+            raise
+
+
+def _fraud_scores(model, x):
+    """Fraud class probabilities and predicted labels of `model` on `x` from one scoring call."""
+    if not hasattr(model, 'predict_proba'):
+        y_pred = np.asarray(model.predict(x))
+        return y_pred.astype(np.float64), y_pred
+    proba = model.predict_proba(x)
+    classes = np.asarray(getattr(model, 'classes_', np.arange(proba.shape[1])))
+    return proba[:, list(classes).index(1)], classes[proba.argmax(axis=1)]
+
+
+def _label_metrics(y_true, y_pred):
+    """Accuracy, precision, recall and F1 of the fraud class, zero when undefined like sklearn."""
+    y_true, predicted = np.asarray(y_true) == 1, np.asarray(y_pred) == 1
+    tp = np.count_nonzero(y_true & predicted)
+    fp = np.count_nonzero(~y_true & predicted)
+    fn = np.count_nonzero(y_true & ~predicted)
+    return (np.count_nonzero(y_true == predicted) / len(y_true),
+            tp / (tp + fp) if tp + fp else 0.0,
+            tp / (tp + fn) if tp + fn else 0.0,
+            2 * tp / (2 * tp + fp + fn) if tp + fp + fn else 0.0)
+
+
+def _per_row(cost, n):
+    return np.broadcast_to(np.asarray(cost, dtype=np.float64), (n,))
+
 
 class EvaluateModel:
     """
     A class for evaluating the accuracy of a given model.
 
+    Models are scored once with `predict_proba`; the scores are sorted once and every
+    threshold dependent quantity (confusion counts, ROC / PR curves, F1, expected
+    cost) is read from cumulative sums over that order, so sweeping all thresholds
+    costs about as much as evaluating one.
+
     Methods:
     -------
     evaluate_model(model, x_test, y_test)
         Evaluates the errors of the model using accuracy metrics.
+    threshold_curve(y_true, scores, cost_fp, cost_fn)
+        Confusion counts, precision, recall, F1 and expected cost at every threshold.
+    bootstrap_ci(y_true, scores, threshold, n_boot, alpha)
+        Bootstrap confidence intervals of the ranking and thresholded metrics.
+    evaluate_models(models, x_test, y_test, ...)
+        Evaluates several models concurrently and picks their cost optimal thresholds.
     """
 
     def evaluate_model(self, model, x_test, y_test):
         """
         Evaluates the errors of the model using accuracy metrics.
 
+        The label metrics use the model's predicted classes, ROC AUC its fraud
+        probabilities (the predicted labels for models without `predict_proba`).
+
         Parameters:
         ----------
         model : object
@@ -161,14 +363,370 @@ class EvaluateModel:
             A tuple containing the Accuracy, precision, recall, f1, roc_auc and predicted values.
         """
         try:
-            y_pred = model.predict(x_test)
-            accuracy = accuracy_score(y_test, y_pred)
-            precision = precision_score(y_test, y_pred)
-            recall = recall_score(y_test, y_pred)
-            f1 = f1_score(y_test, y_pred)
-            roc_auc = roc_auc_score(y_test, y_pred)
+            scores, y_pred = _fraud_scores(model, x_test)
+            accuracy, precision, recall, f1 = _label_metrics(y_test, y_pred)
+            roc_auc = self.roc_auc(self.threshold_curve(y_test, scores))
             logging.info("Model evaluated successfully.")
             return accuracy, precision, recall, f1, roc_auc, y_pred
         except Exception as e:
             logging.error(f"Error evaluating model: {e}")
             raise
+
+    def threshold_curve(self, y_true, scores, cost_fp=1.0, cost_fn=1.0):
+        """
+        Metrics of the rule `score >= threshold` at every distinct score, in one pass.
+
+        Parameters:
+        ----------
+        y_true : array-like
+            True labels, 1 for fraud.
+        scores : array-like
+            Fraud scores, e.g. probabilities.
+        cost_fp : float or array-like, optional
+            Cost of flagging a legitimate transaction, per row if an array.
+        cost_fn : float or array-like, optional
+            Cost of missing a fraud, per row if an array (e.g. the purchase value).
+
+        Returns:
+        -------
+        pd.DataFrame
+            One row per threshold, highest first, starting with `inf` (nothing flagged):
+            threshold, tp, fp, fn, tn, precision, recall, fpr, f1 and expected_cost
+            (total cost of the errors divided by the number of rows).
+        """
+        y = np.asarray(y_true) == 1
+        scores = np.asarray(scores, dtype=np.float64)
+        order = np.argsort(-scores, kind='mergesort')
+        scores, y = scores[order], y[order]
+        cost_fp = _per_row(cost_fp, len(y))[order]
+        cost_fn = _per_row(cost_fn, len(y))[order]
+
+        # last row of every run of equal scores: the rows flagged at that threshold
+        last = np.r_[np.flatnonzero(np.diff(scores)), len(scores) - 1]
+        tp = np.r_[0, np.cumsum(y)[last]]
+        fp = np.r_[0, last + 1 - tp[1:]]
+        positives, negatives = tp[-1], fp[-1]
+        fn, tn = positives - tp, negatives - fp
+        false_alarm_cost = np.r_[0.0, np.cumsum(np.where(y, 0.0, cost_fp))[last]]
+        missed_cost = np.where(y, cost_fn, 0.0).sum() - np.r_[0.0, np.cumsum(np.where(y, cost_fn, 0.0))[last]]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return pd.DataFrame({
+                'threshold': np.r_[np.inf, scores[last]],
+                'tp': tp, 'fp': fp, 'fn': fn, 'tn': tn,
+                # 1 when nothing is flagged, the PR curve convention
+                'precision': np.where(tp + fp > 0, tp / (tp + fp), 1.0),
+                'recall': tp / positives if positives else np.zeros(len(tp)),
+                'fpr': fp / negatives if negatives else np.zeros(len(fp)),
+                'f1': np.where(tp > 0, 2 * tp / (2 * tp + fp + fn), 0.0),
+                'expected_cost': (false_alarm_cost + missed_cost) / len(y),
+            })
+
+    def roc_auc(self, curve):
+        """Area under the ROC curve of a `threshold_curve`."""
+        return float(_trapezoid(curve['recall'], curve['fpr']))
+
+    def average_precision(self, curve):
+        """Average precision (area under the PR curve, step interpolated) of a `threshold_curve`."""
+        return float((np.diff(curve['recall']) * curve['precision'].to_numpy()[1:]).sum())
+
+    def best_threshold(self, curve, metric='expected_cost'):
+        """
+        Row of a `threshold_curve` with the lowest expected cost, or the highest `metric`.
+
+        Returns:
+        -------
+        dict
+            The threshold and its metrics.
+        """
+        values = curve[metric]
+        row = values.idxmin() if metric == 'expected_cost' else values.idxmax()
+        return curve.loc[row].to_dict()
+
+    def bootstrap_ci(self, y_true, scores, threshold=0.5, n_boot=1000, alpha=0.05, random_state=42,
+                     max_cells=2 ** 22):
+        """
+        Percentile bootstrap confidence intervals of ROC AUC, average precision and the
+        precision, recall and F1 at `threshold`.
+
+        The rows are sorted once; each resample is a vector of row counts, and blocks
+        of resamples are evaluated together with cumulative sums over the sorted order.
+
+        Parameters:
+        ----------
+        y_true : array-like
+            True labels, 1 for fraud.
+        scores : array-like
+            Fraud scores.
+        threshold : float, optional
+            Decision threshold of the thresholded metrics.
+        n_boot : int, optional
+            Number of resamples.
+        alpha : float, optional
+            One minus the confidence level.
+        max_cells : int, optional
+            Upper bound on resamples x rows evaluated at once, bounds the memory used.
+
+        Returns:
+        -------
+        pd.DataFrame
+            Indexed by metric, with the estimate on the full data and the lower / upper bounds.
+        """
+        try:
+            y = np.asarray(y_true) == 1
+            scores = np.asarray(scores, dtype=np.float64)
+            order = np.argsort(-scores, kind='mergesort')
+            scores, y = scores[order], y[order].astype(np.float64)
+            n = len(y)
+            last = np.r_[np.flatnonzero(np.diff(scores)), n - 1]
+            # rows flagged at `threshold` are the first `flagged` of the sorted order
+            flagged = np.searchsorted(-scores, -threshold, side='right')
+
+            def metrics(weights):
+                # weights: (resamples, n) row counts in sorted order
+                tp_all = np.cumsum(weights * y, axis=1)
+                fp_all = np.cumsum(weights, axis=1) - tp_all
+                tp, fp = tp_all[:, last], fp_all[:, last]
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    tpr = tp / tp[:, -1:]
+                    fpr = fp / fp[:, -1:]
+                    zero = np.zeros((len(weights), 1))
+                    roc_auc = _trapezoid(np.hstack([zero, tpr]), np.hstack([zero, fpr]), axis=1)
+                    # thresholds with no resampled row add no recall, their precision is irrelevant
+                    precision = np.where(tp + fp > 0, tp / (tp + fp), 1.0)
+                    average_precision = (np.diff(np.hstack([zero, tpr]), axis=1) * precision).sum(axis=1)
+                    if flagged:
+                        tp_t, fp_t = tp_all[:, flagged - 1], fp_all[:, flagged - 1]
+                    else:
+                        tp_t = fp_t = np.zeros(len(weights))
+                    fn_t = tp_all[:, -1] - tp_t
+                    return {
+                        'roc_auc': roc_auc,
+                        'average_precision': average_precision,
+                        'precision': np.where(tp_t + fp_t > 0, tp_t / (tp_t + fp_t), 0.0),
+                        'recall': tp_t / (tp_t + fn_t),
+                        'f1': np.where(tp_t > 0, 2 * tp_t / (2 * tp_t + fp_t + fn_t), 0.0),
+                    }
+
+            estimate = {name: values[0] for name, values in metrics(np.ones((1, n))).items()}
+            rng = np.random.default_rng(random_state)
+            block = max(1, min(n_boot, max_cells // n))
+            samples = {name: [] for name in estimate}
+            for start in range(0, n_boot, block):
+                size = min(block, n_boot - start)
+                rows = rng.integers(0, n, size=(size, n)) + n * np.arange(size)[:, None]
+                weights = np.bincount(rows.ravel(), minlength=size * n).reshape(size, n)
+                for name, values in metrics(weights).items():
+                    samples[name].append(values)
+            lower, upper = 100 * alpha / 2, 100 * (1 - alpha / 2)
+            return pd.DataFrame([
+                {'metric': name, 'estimate': estimate[name],
+                 'lower': np.nanpercentile(np.concatenate(samples[name]), lower),
+                 'upper': np.nanpercentile(np.concatenate(samples[name]), upper)}
+                for name in estimate]).set_index('metric')
+        except Exception as e:
+            logging.error(f"Error computing bootstrap confidence intervals: {e}")
+            raise
+
+    def _evaluate_one(self, model, x_test, y_test, cost_fp, cost_fn):
+        scores, y_pred = _fraud_scores(model, x_test)
+        curve = self.threshold_curve(y_test, scores, cost_fp=cost_fp, cost_fn=cost_fn)
+        best = self.best_threshold(curve)
+        row = {
+            **dict(zip(('accuracy', 'precision', 'recall', 'f1'), _label_metrics(y_test, y_pred))),
+            'roc_auc': self.roc_auc(curve),
+            'average_precision': self.average_precision(curve),
+            'best_threshold': best['threshold'],
+            'best_expected_cost': best['expected_cost'],
+            'best_precision': best['precision'],
+            'best_recall': best['recall'],
+        }
+        return row, curve
+
+    def evaluate_models(self, models, x_test, y_test, cost_fp=1.0, cost_fn=1.0, n_jobs=None):
+        """
+        Evaluate several models on the same test set concurrently.
+
+        Models are scored on threads: the tree ensembles release the GIL while
+        predicting and nothing has to be copied to worker processes.
+
+        Parameters:
+        ----------
+        models : dict
+            Model name -> fitted model.
+        x_test : pd.DataFrame
+            The feature columns of the testing dataset.
+        y_test : pd.Series
+            The target column of the testing dataset.
+        cost_fp, cost_fn : float or array-like, optional
+            Error costs, see `threshold_curve`.
+        n_jobs : int, optional
+            Models evaluated at once, all of them by default.
+
+        Returns:
+        -------
+        tuple
+            A DataFrame with one row of metrics per model (label metrics, ROC AUC,
+            average precision and the lowest cost threshold with its cost, precision
+            and recall) and a dict of their threshold curves.
+        """
+        try:
+            with ThreadPoolExecutor(max_workers=n_jobs or max(1, len(models))) as pool:
+                futures = {name: pool.submit(self._evaluate_one, model, x_test, y_test, cost_fp, cost_fn)
+                           for name, model in models.items()}
+                results = {name: future.result() for name, future in futures.items()}
+            logging.info(f"Evaluated {len(models)} models.")
+            summary = pd.DataFrame([{'model': name, **row} for name, (row, _) in results.items()])
+            return summary, {name: curve for name, (_, curve) in results.items()}
+        except Exception as e:
+            logging.error(f"Error evaluating models: {e}")
+            raise
+
+
+# TrainData method behind each model name, and whether it accepts a thread count
+MODEL_TRAINERS = {
+    'decision_tree': ('decision_tree_Classifier', False),
+    'random_forest': ('random_forest', True),
+    'xgboost': ('xgboost_classifier', True),
+}
+
+
+def _rss_mb(field):
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(field):
+                return int(line.split()[1]) / 1024
+    raise OSError(f'{field} not found')
+
+
+def _peak_memory_mb(baseline):
+    """Peak memory of the job in MB, None where it cannot be measured (e.g. Windows)."""
+    if baseline is not None:
+        try:
+            return _rss_mb('VmHWM:') - baseline
+        except (OSError, ValueError):
+            pass
+    try:
+        # Unix only; ru_maxrss is in KB on Linux and bytes on macOS, this fallback is approximate
+        import resource
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _train_job(dataset_name, model_name, split, n_jobs, model_dir):
+    """Train and evaluate one model in a worker process and return its report row."""
+    x_train, x_test, y_train, y_test = split
+    method, threaded = MODEL_TRAINERS[model_name]
+    try:
+        # reset the peak RSS so only this job is measured (Linux)
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        baseline = _rss_mb('VmRSS:')
+    except (OSError, ValueError):
+        baseline = None
+
+    start = time.perf_counter()
+    trainer = getattr(TrainData(x_train, y_train), method)
+    model = trainer(n_jobs=n_jobs) if threaded else trainer()
+    fit_time = time.perf_counter() - start
+
+    peak_memory = _peak_memory_mb(baseline)
+
+    accuracy, precision, recall, f1, roc_auc, _ = EvaluateModel().evaluate_model(model, x_test, y_test)
+    row = {
+        'dataset': dataset_name, 'model': model_name, 'n_jobs': n_jobs,
+        'fit_time_s': fit_time, 'peak_memory_mb': peak_memory,
+        'accuracy': accuracy, 'precision': precision, 'recall': recall, 'f1': f1, 'roc_auc': roc_auc,
+    }
+    if model_dir is not None:
+        row['model_path'] = os.path.join(model_dir, f'{dataset_name}_{model_name}.pkl')
+        joblib.dump(model, row['model_path'], compress=3)
+    return row
+
+
+class TrainingOrchestrator:
+    """
+    Trains several models on several datasets concurrently under a global CPU budget.
+
+    Every (dataset, model) pair is a job run in its own worker process. Multi-threaded
+    models get `threads_per_job` threads, and at most `cpu_budget // threads_per_job`
+    jobs run at the same time, so the total number of busy cores never exceeds the
+    budget. Each job records its fit time, peak memory and the `EvaluateModel` metrics.
+
+    Attributes:
+    ----------
+    datasets : dict
+        Dataset name -> (x_train, x_test, y_train, y_test), e.g. from `SplitData.split_data`.
+    models : list
+        Model names, keys of `MODEL_TRAINERS`.
+    cpu_budget : int
+        Total number of cores the orchestrator may use.
+    threads_per_job : int
+        Threads given to each multi-threaded model.
+
+    Example:
+    -------
+    >>> splits = {'ecommerce': SplitData(x, y).split_data(),
+    ...           'credit_card': SplitData(x_cc, y_cc).split_data()}
+    >>> report = TrainingOrchestrator(splits, cpu_budget=8, threads_per_job=2).run()
+    """
+
+    def __init__(self, datasets, models=tuple(MODEL_TRAINERS), cpu_budget=None, threads_per_job=1):
+        unknown = set(models) - set(MODEL_TRAINERS)
+        if unknown:
+            raise ValueError(f'unknown models {sorted(unknown)}, expected {list(MODEL_TRAINERS)}')
+        self.datasets = datasets
+        self.models = list(models)
+        self.cpu_budget = cpu_budget or os.cpu_count()
+        self.threads_per_job = max(1, min(threads_per_job, self.cpu_budget))
+        self.report = None
+
+    def run(self, model_dir=None):
+        """
+        Train every model on every dataset.
+
+        Parameters:
+        ----------
+        model_dir : str, optional
+            Directory the fitted models are saved to, models are not kept when None.
+
+        Returns:
+        -------
+        pd.DataFrame
+            One row per (dataset, model) with fit time, peak memory and metrics.
+        """
+        jobs = [(dataset, model) for dataset in self.datasets for model in self.models]
+        workers = max(1, min(len(jobs), self.cpu_budget // self.threads_per_job))
+        logging.info(f'Training {len(jobs)} models with {workers} workers x '
+                     f'{self.threads_per_job} threads (budget {self.cpu_budget} cores)')
+        if model_dir is not None:
+            os.makedirs(model_dir, exist_ok=True)
+        rows = []
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(_train_job, dataset, model, self.datasets[dataset],
+                                       self.threads_per_job, model_dir): (dataset, model)
+                           for dataset, model in jobs}
+                for future in as_completed(futures):
+                    row = future.result()
+                    logging.info(f"{row['dataset']} / {row['model']} trained in {row['fit_time_s']:.2f}s")
+                    rows.append(row)
+        except Exception as e:
+            logging.error(f'Error in training orchestrator: {e}')
+            raise
+        self.report = pd.DataFrame(rows).sort_values(['dataset', 'model']).reset_index(drop=True)
+        return self.report
+
+    def write_report(self, path):
+        """
+        Write the comparison report of the last run as csv.
+
+        Parameters:
+        ----------
+        path : str
+            Destination file.
+        """
+        if self.report is None:
+            raise ValueError('run() has not been called yet')
+        self.report.to_csv(path, index=False)
+        logging.info(f'Training report written to {path}')
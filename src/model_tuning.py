@@ -0,0 +1,268 @@
+from sklearn.tree import DecisionTreeClassifier
+from sklearn.ensemble import RandomForestClassifier
+from xgboost import XGBClassifier
+from sklearn.model_selection import ParameterSampler, StratifiedKFold
+from sklearn.metrics import average_precision_score
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+import joblib
+import json
+import logging
+import math
+import os
+
+logging.basicConfig(
+    filename='../logs/model-tuning.logs',
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+
+logging.info(
+    '****************************Logging started for Model Tuning module****************************')
+
+
+SEARCH_SPACES = {
+    'decision_tree': {
+        'max_depth': [4, 6, 8, 12, 16, None],
+        'min_samples_leaf': [1, 5, 20, 50],
+        'class_weight': [None, 'balanced'],
+    },
+    'random_forest': {
+        'n_estimators': [50, 100, 200],
+        'max_depth': [8, 12, 16, None],
+        'min_samples_leaf': [1, 5, 20],
+        'max_features': ['sqrt', 0.5],
+        'class_weight': [None, 'balanced', 'balanced_subsample'],
+    },
+    'xgboost': {
+        'n_estimators': [100, 200, 400],
+        'max_depth': [3, 4, 6, 8],
+        'learning_rate': [0.03, 0.1, 0.3],
+        'subsample': [0.7, 1.0],
+        'colsample_bytree': [0.7, 1.0],
+        'scale_pos_weight': [1, 10, 49],
+    },
+}
+
+# arrays shared by the trials of a worker process, set once by `_init_worker`
+_shared = {}
+
+
+def build_model(family, params, n_jobs=1):
+    """Unfitted estimator of a model family with the given hyperparameters."""
+    if family == 'decision_tree':
+        return DecisionTreeClassifier(random_state=42, **params)
+    if family == 'random_forest':
+        return RandomForestClassifier(random_state=42, n_jobs=n_jobs, **params)
+    if family == 'xgboost':
+        return XGBClassifier(random_state=42, tree_method='hist', n_jobs=n_jobs, **params)
+    raise ValueError(f'unknown model family {family}, expected one of {list(SEARCH_SPACES)}')
+
+
+def _stratified_order(y, seed):
+    """Row order whose every prefix keeps (about) the class proportions of `y`."""
+    rng = np.random.default_rng(seed)
+    rows, positions = [], []
+    for label in np.unique(y):
+        idx = rng.permutation(np.flatnonzero(y == label))
+        rows.append(idx)
+        positions.append((np.arange(len(idx)) + 0.5) / len(idx))
+    rows, positions = np.concatenate(rows), np.concatenate(positions)
+    return rows[np.argsort(positions, kind='stable')]
+
+
+def _init_worker(x, y, folds, n_jobs):
+    _shared.update(x=x, y=y, folds=folds, n_jobs=n_jobs)
+
+
+def _evaluate_trial(family, params, rung, n_rows):
+    """Mean PR-AUC of one configuration over the cached folds, on `n_rows` training rows per fold."""
+    x, y = _shared['x'], _shared['y']
+    scores = []
+    for train_order, valid_idx in _shared['folds']:
+        train_idx = train_order[:n_rows]
+        model = build_model(family, params, n_jobs=_shared['n_jobs'])
+        model.fit(x[train_idx], y[train_idx])
+        scores.append(average_precision_score(y[valid_idx], model.predict_proba(x[valid_idx])[:, 1]))
+    return {'family': family, 'params': params, 'rung': rung, 'n_rows': int(n_rows),
+            'score': float(np.mean(scores))}
+
+
+def _params_key(params):
+    return json.dumps(params, sort_keys=True)
+
+
+class SuccessiveHalvingSearch:
+    """
+    Successive-halving hyperparameter search over the DecisionTree, RandomForest and
+    XGBoost families.
+
+    For each family, `n_candidates` configurations are sampled from its search space
+    and scored (mean PR-AUC over stratified folds) on a small share of the training
+    rows. Only the best 1/`eta` of them move on to the next rung, which uses `eta` times
+    more rows, until the last rung trains on the full folds. The data is converted to
+    a float32 array and the folds (plus a stratified subsampling order) are computed
+    once; worker processes receive them once and run the trials of a rung in parallel.
+
+    Every finished trial is appended to `results_path` (JSON lines) with a fingerprint
+    of the data and the search settings. Rerunning a search with the same data and
+    settings skips the trials already in that file, so an interrupted search resumes
+    where it stopped; trials recorded for other data or settings are ignored.
+
+    Attributes:
+    ----------
+    x : np.ndarray
+        Preprocessed features, float32.
+    y : np.ndarray
+        Target.
+    folds : list
+        (training rows in stratified subsampling order, validation rows) per fold.
+    fingerprint : str
+        Hash of x, y, eta, n_splits and random_state, stored with every trial.
+    results : list
+        Every finished trial of this fingerprint: family, params, rung, n_rows and score.
+    """
+
+    def __init__(self, x, y, results_path, n_candidates=27, eta=3, n_splits=3,
+                 n_workers=1, n_jobs_per_trial=1, random_state=42):
+        self.x = np.ascontiguousarray(np.asarray(x, dtype=np.float32))
+        self.y = np.asarray(y).astype(int)
+        self.results_path = results_path
+        self.n_candidates = n_candidates
+        self.eta = eta
+        self.n_workers = n_workers
+        self.n_jobs_per_trial = n_jobs_per_trial
+        self.random_state = random_state
+        order = _stratified_order(self.y, random_state)
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order))
+        splitter = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+        self.folds = [(train_idx[np.argsort(rank[train_idx])], valid_idx)
+                      for train_idx, valid_idx in splitter.split(self.x, self.y)]
+        self.fingerprint = joblib.hash((self.x, self.y, eta, n_splits, random_state))
+        self.results = self._load_results()
+        logging.info(f'Search prepared with {n_splits} folds, {len(self.results)} trials already done.')
+
+    def _load_results(self):
+        if not os.path.exists(self.results_path):
+            return []
+        with open(self.results_path) as f:
+            results = [json.loads(line) for line in f if line.strip()]
+        matching = [r for r in results if r.get('fingerprint') == self.fingerprint]
+        if len(matching) < len(results):
+            logging.warning(f'{len(results) - len(matching)} trials in {self.results_path} were run on '
+                            f'other data or settings and are ignored')
+        return matching
+
+    def _save_result(self, result):
+        result = {**result, 'fingerprint': self.fingerprint}
+        with open(self.results_path, 'a') as f:
+            f.write(json.dumps(result) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self.results.append(result)
+
+    def _rung_rows(self, rung, n_rungs):
+        full = min(len(train_order) for train_order, _ in self.folds)
+        return max(2 * self.eta, int(full / self.eta ** (n_rungs - 1 - rung)))
+
+    def _run_rung(self, family, candidates, rung, n_rows, pool):
+        done = {(r['family'], _params_key(r['params']), r['rung'], r['n_rows']): r for r in self.results}
+        scores = {}
+        pending = []
+        for params in candidates:
+            key = (family, _params_key(params), rung, n_rows)
+            if key in done:
+                scores[key[1]] = done[key]['score']
+            else:
+                pending.append(params)
+        if pool is None:
+            outcomes = (_evaluate_trial(family, params, rung, n_rows) for params in pending)
+        else:
+            outcomes = (future.result() for future in as_completed(
+                [pool.submit(_evaluate_trial, family, params, rung, n_rows) for params in pending]))
+        for result in outcomes:
+            self._save_result(result)
+            scores[_params_key(result['params'])] = result['score']
+        logging.info(f'{family} rung {rung}: {len(candidates)} candidates on {n_rows} rows, '
+                     f'{len(pending)} trained')
+        return scores
+
+    def search(self, family, pool=None):
+        """
+        Run successive halving for one model family.
+
+        Returns:
+        -------
+        dict
+            The best configuration of the last rung.
+        """
+        candidates = [dict(sorted(p.items())) for p in ParameterSampler(
+            SEARCH_SPACES[family], n_iter=self.n_candidates, random_state=self.random_state)]
+        n_rungs = max(1, math.ceil(math.log(len(candidates), self.eta)) + 1)
+        for rung in range(n_rungs):
+            n_rows = self._rung_rows(rung, n_rungs)
+            scores = self._run_rung(family, candidates, rung, n_rows, pool)
+            candidates.sort(key=lambda p: scores[_params_key(p)], reverse=True)
+            if rung < n_rungs - 1:
+                candidates = candidates[:max(1, math.ceil(len(candidates) / self.eta))]
+        return candidates[0]
+
+    def run(self, families=tuple(SEARCH_SPACES)):
+        """
+        Search every family, sharing one worker pool.
+
+        Returns:
+        -------
+        pd.DataFrame
+            Best configuration, its score and the number of trials per family.
+        """
+        try:
+            pool = None
+            if self.n_workers > 1:
+                pool = ProcessPoolExecutor(
+                    max_workers=self.n_workers, initializer=_init_worker,
+                    initargs=(self.x, self.y, self.folds, self.n_jobs_per_trial))
+            _init_worker(self.x, self.y, self.folds, self.n_jobs_per_trial)
+            rows = []
+            try:
+                for family in families:
+                    best = self.search(family, pool)
+                    family_results = [r for r in self.results if r['family'] == family]
+                    last_rung = max(r['rung'] for r in family_results)
+                    best_score = next(r['score'] for r in family_results
+                                      if r['rung'] == last_rung and r['params'] == best)
+                    rows.append({'family': family, 'best_params': best, 'score': best_score,
+                                 'trials': len(family_results)})
+            finally:
+                if pool is not None:
+                    pool.shutdown()
+            return pd.DataFrame(rows)
+        except Exception as e:
+            logging.error(f'Error in hyperparameter search: {e}')
+            raise
+
+    def fit_best(self, family, x=None, y=None, n_jobs=-1):
+        """
+        Fit the best configuration found for `family` on the full training data.
+
+        Parameters:
+        ----------
+        family : str
+            Model family, key of `SEARCH_SPACES`.
+        x, y : array-like, optional
+            Training data, the search data by default.
+
+        Returns:
+        -------
+        object
+            The fitted estimator.
+        """
+        family_results = [r for r in self.results if r['family'] == family]
+        if not family_results:
+            raise ValueError(f'no trials for {family}, run the search first')
+        last_rung = max(r['rung'] for r in family_results)
+        best = max((r for r in family_results if r['rung'] == last_rung), key=lambda r: r['score'])
+        model = build_model(family, best['params'], n_jobs=n_jobs)
+        return model.fit(self.x if x is None else x, self.y if y is None else y)
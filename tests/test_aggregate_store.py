@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+from src.aggregate_store import FraudAggregates, records_to_transactions
+
+
+def make_transactions(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'purchase_time': pd.Timestamp('2015-01-01') + pd.to_timedelta(rng.integers(0, 90 * 86400, n_rows), 's'),
+        'device_id': rng.choice([f'DEV{i:03d}' for i in range(40)], n_rows),
+        'browser': rng.choice(['Chrome', 'Safari', 'IE', 'FireFox', 'Opera'], n_rows),
+        'class': (rng.random(n_rows) < 0.2).astype(int),
+    })
+
+
+def expected_payloads(data):
+    """The rollups as the API computed them with full pandas passes."""
+    trends = data.groupby(data['purchase_time'].dt.date)['class'].sum().reset_index()
+    trends.columns = ['date', 'fraud_cases']
+    return (
+        {
+            'total_transactions': len(data),
+            'fraud_cases': int(data['class'].sum()),
+            'fraud_percentage': round((data['class'].sum() / len(data)) * 100, 2),
+        },
+        trends.to_dict(orient='records'),
+        {
+            'fraud_by_device': data.groupby('device_id')['class'].sum().nlargest(10).to_dict(),
+            'fraud_by_browser': data.groupby('browser')['class'].sum().to_dict(),
+        },
+    )
+
+
+def assert_matches(aggregates, data):
+    summary, trends, by_device_browser = expected_payloads(data)
+    assert aggregates.summary() == summary
+    assert aggregates.fraud_trends() == trends
+    result = aggregates.fraud_by_device_browser()
+    assert result == by_device_browser
+    assert list(result['fraud_by_device']) == list(by_device_browser['fraud_by_device'])
+
+
+def test_incremental_updates_match_full_recompute():
+    data = make_transactions(2000)
+    aggregates = FraudAggregates(data)
+    assert_matches(aggregates, data)
+
+    etag = aggregates.etag
+    for seed in range(1, 4):
+        batch = make_transactions(300, seed=seed)
+        aggregates.append(batch)
+        data = pd.concat([data, batch], ignore_index=True)
+        assert_matches(aggregates, data)
+    assert aggregates.etag != etag
+
+
+def test_records_to_transactions():
+    records = [{'purchase_time': '2015-02-24 22:55:49', 'device_id': 'QVPSPJUOCKZAR',
+                'browser': 'Chrome', 'class': '1'}]
+
+    aggregates = FraudAggregates(make_transactions(100))
+    before = aggregates.summary()
+    aggregates.append(records_to_transactions(records))
+
+    assert aggregates.summary()['total_transactions'] == before['total_transactions'] + 1
+    assert aggregates.summary()['fraud_cases'] == before['fraud_cases'] + 1
@@ -0,0 +1,227 @@
+import importlib
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from starlette.testclient import TestClient
+
+from src.encoding import DataProcessing
+from src.model_registry import ModelRegistry
+from tests.test_ip_geolocation import make_ranges
+
+API_DIR = Path(__file__).resolve().parents[1] / 'fraud_api' / 'src'
+FEATURES = ['user_id', 'transaction_frequency', 'signup_time', 'purchase_time', 'velocity_check',
+            'purchase_hour', 'purchase_weekday', 'purchase_value', 'device_id', 'source', 'browser',
+            'sex', 'age', 'ip_address', 'country']
+
+
+def make_raw_transactions(ranges, n_rows=400, seed=0):
+    """cleaned_data.csv like rows, every ip inside one of `ranges`."""
+    rng = np.random.default_rng(seed)
+    picked = ranges.iloc[rng.integers(0, len(ranges), n_rows)]
+    signup = pd.Timestamp('2015-01-01') + pd.to_timedelta(rng.integers(0, 10 ** 7, n_rows), 's')
+    purchase = signup + pd.to_timedelta(rng.integers(1, 10 ** 6, n_rows), 's')
+    return pd.DataFrame({
+        'user_id': np.arange(n_rows),
+        'transaction_frequency': 1,
+        'signup_time': signup.astype(str),
+        'purchase_time': purchase.astype(str),
+        'velocity_check': (purchase - signup).total_seconds(),
+        'purchase_hour': purchase.hour,
+        'purchase_weekday': purchase.dayofweek,
+        'purchase_value': rng.integers(9, 100, n_rows),
+        'device_id': rng.choice(['AAA', 'BBB', 'CCC'], n_rows).astype(object),
+        'source': rng.choice(['SEO', 'Ads'], n_rows).astype(object),
+        'browser': rng.choice(['Chrome', 'IE'], n_rows).astype(object),
+        'sex': rng.choice(['M', 'F'], n_rows).astype(object),
+        'age': rng.integers(18, 70, n_rows),
+        'ip_address': picked['lower_bound_ip_address'].to_numpy() + 1,
+        'country': picked['country'].to_numpy().astype(object),
+        'class': rng.integers(0, 2, n_rows),
+    })
+
+
+@pytest.fixture(scope='module')
+def api(tmp_path_factory):
+    """serve_model and serve_model_asgi imported against a tmp data directory and registry."""
+    root = tmp_path_factory.mktemp('api')
+    data_dir = root / 'data'
+    data_dir.mkdir()
+    ranges = make_ranges(200)
+    ranges.to_csv(data_dir / 'IpAddress_to_Country.csv', index=False)
+    raw = make_raw_transactions(ranges)
+    raw.to_csv(data_dir / 'cleaned_data.csv', index=False)
+    preprocessor = DataProcessing(raw[FEATURES].copy()).fit_preprocessor()
+    standard = preprocessor.transform(raw[FEATURES])
+    standard.to_csv(data_dir / 'standard_data.csv', index=False)
+    registry = ModelRegistry(str(root / 'registry'))
+    for seed in (0, 1):
+        model = RandomForestClassifier(n_estimators=20, max_depth=6, random_state=seed)
+        registry.register('RF', model.fit(standard, raw['class']), FEATURES, preprocessor=preprocessor)
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv('DATA_DIR', str(data_dir))
+        mp.setenv('MODEL_REGISTRY', str(root / 'registry'))
+        mp.setenv('MODEL_NAME', 'RF')
+        mp.setenv('MODEL_VERSION', 'v1')
+        mp.setenv('COMPILED_FOREST_MAX_ROWS', '5')
+        mp.syspath_prepend(str(API_DIR))
+        serve_model = importlib.import_module('serve_model')
+        serve_model_asgi = importlib.import_module('serve_model_asgi')
+        yield {'flask': serve_model, 'asgi': serve_model_asgi, 'raw': raw, 'standard': standard}
+    serve_model.batcher.stop(5)
+    serve_model_asgi.pool.shutdown(wait=False)
+    for module in ('serve_model', 'serve_model_asgi'):
+        sys.modules.pop(module, None)
+
+
+@pytest.fixture(params=['flask', 'asgi'])
+def client(request, api):
+    # the ASGI client is not entered, its lifespan would shut the shared inference pool down
+    return api['flask'].app.test_client() if request.param == 'flask' else TestClient(api['asgi'].app)
+
+
+def payload(response):
+    return response.get_json() if hasattr(response, 'get_json') else response.json()
+
+
+def test_predict_with_features_ip_address_and_transaction(client, api):
+    serve_model, raw, standard = api['flask'], api['raw'], api['standard']
+    row = standard.iloc[0].tolist()
+    expected = int(serve_model.active_model.current.model.predict(standard.iloc[[0]])[0])
+
+    result = payload(client.post('/predict', json={'features': row}))
+    assert result == {'prediction': expected, 'model_version': 'v1'}
+
+    # the country feature is derived from the raw ip
+    without_country = row[:FEATURES.index('country')] + row[FEATURES.index('country') + 1:]
+    result = payload(client.post('/predict', json={'features': without_country,
+                                                   'ip_address': float(raw['ip_address'][0])}))
+    assert result['country'] == raw['country'][0] and result['prediction'] == expected
+
+    # one user per client, the apps share the feature store
+    user_id = 2 * 10 ** 6 if isinstance(client, TestClient) else 10 ** 6
+    transaction = {**raw.iloc[1][['signup_time', 'purchase_time', 'purchase_value', 'device_id', 'source',
+                                  'browser', 'sex', 'age', 'ip_address']].to_dict(), 'user_id': user_id}
+    transaction['age'] = int(transaction['age'])
+    transaction['purchase_value'] = int(transaction['purchase_value'])
+    for _ in range(2):
+        result = payload(client.post('/predict', json={'transaction': transaction}))
+        assert result['country'] == raw['country'][1] and result['prediction'] in (0, 1)
+    # scoring alone leaves the feature store unchanged, recording is opt-in
+    assert serve_model.feature_store.count('user_id', user_id) == 0
+    payload(client.post('/predict', json={'transaction': transaction, 'record': True}))
+    assert serve_model.feature_store.count('user_id', user_id) == 1
+
+    assert 'error' in payload(client.post('/predict', json={'features': [1, 2, 3]}))
+
+
+def test_micro_batched_predict_rejects_only_the_malformed_row(client, api, monkeypatch):
+    serve_model, standard = api['flask'], api['standard']
+    monkeypatch.setattr(serve_model, 'MICRO_BATCHING', True)
+    serve_model.batcher.start()
+    try:
+        result = payload(client.post('/predict', json={'features': standard.iloc[2].tolist()}))
+        bad = payload(client.post('/predict', json={'features': [1.0, 'x', 3.0]}))
+    finally:
+        serve_model.batcher.stop(5)
+    assert result['model_version'] == 'v1' and result['prediction'] in (0, 1)
+    assert 'numeric features' in bad['error']
+
+
+def test_predict_batch_layouts_and_fitted_model_above_the_cutoff(client, api):
+    standard = api['standard']
+    model = api['flask'].active_model.current.model
+    small, large = standard.iloc[:3], standard.iloc[:12]
+
+    as_lists = payload(client.post('/predict_batch', json=small.to_numpy().tolist()))
+    as_records = payload(client.post('/predict_batch', json=small.to_dict(orient='records')))
+    as_columns = payload(client.post('/predict_batch', json={'columns': small.to_dict(orient='list')}))
+    expected = model.predict_proba(small)[:, 1]
+    for result in (as_lists, as_records, as_columns):
+        np.testing.assert_allclose(result['probabilities'], expected, rtol=1e-5)
+        assert result['model_version'] == 'v1'
+
+    # above COMPILED_FOREST_MAX_ROWS the fitted model scores the batch
+    result = payload(client.post('/predict_batch', json=large.to_numpy().tolist()))
+    np.testing.assert_allclose(result['probabilities'], model.predict_proba(large)[:, 1], rtol=1e-5)
+    assert result['predictions'] == model.predict(large).astype(int).tolist()
+
+    response = client.post('/predict_batch', json=[[1.0, 2.0]])
+    assert response.status_code == 400 and 'error' in payload(response)
+
+
+def test_explain_layouts(client, api):
+    records = api['standard'].iloc[:2].to_dict(orient='records')
+
+    all_classes = np.array(payload(client.post('/explain', json=records))['shap_values'])
+    fraud_only = np.array(payload(client.post('/explain?fraud_only=1', json=records))['shap_values'])
+    top = payload(client.post('/explain?top_k=3', json=records[0]))['top_features']
+
+    assert all_classes.shape == (2, len(FEATURES), 2)
+    np.testing.assert_allclose(fraud_only, all_classes[:, :, 1])
+    assert len(top) == 1 and len(top[0]) == 3
+    assert {entry['feature'] for entry in top[0]} <= set(FEATURES)
+    assert abs(top[0][0]['shap_value']) >= abs(top[0][-1]['shap_value'])
+
+
+def test_ingest_invalidates_the_cached_rollups(client, api):
+    first = client.get('/summary')
+    etag = first.headers['ETag']
+    assert client.get('/summary', headers={'If-None-Match': etag}).status_code == 304
+
+    records = [{'purchase_time': '2015-02-01 10:00:00', 'device_id': 'AAA', 'browser': 'IE', 'class': 1}]
+    result = payload(client.post('/ingest', json=records))
+    assert result['ingested'] == 1
+
+    after = client.get('/summary', headers={'If-None-Match': etag})
+    assert after.status_code == 200 and after.headers['ETag'] != etag
+    assert payload(after)['total_transactions'] == payload(first)['total_transactions'] + 1
+    assert payload(after)['fraud_cases'] == payload(first)['fraud_cases'] + 1
+
+
+def test_model_swap_and_info(client, api):
+    features = api['standard'].iloc[0].tolist()
+    try:
+        swapped = payload(client.post('/model/swap', json={'version': 'v2'}))
+        assert swapped['version'] == 'v2'
+        assert payload(client.post('/predict', json={'features': features}))['model_version'] == 'v2'
+        info = payload(client.get('/model'))
+        assert info['version'] == 'v2' and info['available_versions'] == ['v1', 'v2']
+        assert client.post('/model/swap', json={'version': 'v9'}).status_code == 400
+    finally:
+        payload(client.post('/model/swap', json={'version': 'v1'}))
+    assert payload(client.get('/model'))['version'] == 'v1'
+
+
+def test_metrics_are_exposed(client, api):
+    if not api['flask'].instrumentation.METRICS_ENABLED:
+        pytest.skip('metrics disabled through METRICS_ENABLED=0')
+    client.get('/')
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.headers['Content-Type'].startswith('text/plain')
+    text = response.get_data(as_text=True) if hasattr(response, 'get_data') else response.text
+    assert 'fraud_api_requests_total{method="GET",route="/",status="200"}' in text
+
+
+def test_explainers_of_the_old_and_new_version_are_both_kept(client, api):
+    serve_model = api['flask']
+    records = api['standard'].iloc[:1].to_dict(orient='records')
+    old = serve_model.active_model.current
+    try:
+        new = serve_model.active_model.swap('v2')
+        with serve_model.explainer_lock:
+            # a request that captured the old version before the swap
+            old_explainer = serve_model.version_explainer(old)
+        payload(client.post('/explain', json=records))
+        with serve_model.explainer_lock:
+            assert serve_model.version_explainer(old) is old_explainer
+        assert set(serve_model.explainers) == {old.path, new.path}
+    finally:
+        serve_model.active_model.swap('v1')
+    # swapping back reuses the cached explainer, at most EXPLAINER_CACHE_SIZE are kept
+    assert len(serve_model.explainers) == serve_model.EXPLAINER_CACHE_SIZE
@@ -0,0 +1,56 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.columnar_data import ColumnarData
+
+
+def write_fraud_csv(path, n_rows=500, seed=0):
+    rng = np.random.default_rng(seed)
+    pd.DataFrame({
+        'user_id': rng.integers(1, 400000, n_rows),
+        'signup_time': pd.Timestamp('2015-01-01') + pd.to_timedelta(rng.integers(0, 10 ** 7, n_rows), 's'),
+        'purchase_time': pd.Timestamp('2015-05-01') + pd.to_timedelta(rng.integers(0, 10 ** 7, n_rows), 's'),
+        'purchase_value': rng.integers(9, 150, n_rows),
+        'device_id': rng.choice(['QVPSPJUOCKZAR', 'EOGFQPIZPYXFZ', 'YSSKYOSJHPPLJ'], n_rows),
+        'source': rng.choice(['SEO', 'Ads', 'Direct'], n_rows),
+        'browser': rng.choice(['Chrome', 'Safari', 'IE'], n_rows),
+        'sex': rng.choice(['M', 'F'], n_rows),
+        'age': rng.integers(18, 76, n_rows),
+        'ip_address': rng.uniform(0, 2 ** 32 - 1, n_rows),
+        'class': rng.integers(0, 2, n_rows),
+    }).to_csv(path, index=False)
+
+
+@pytest.mark.parametrize('fmt', ['feather', 'parquet'])
+def test_columnar_load_matches_csv(tmp_path, fmt):
+    csv_path = str(tmp_path / 'Fraud_Data.csv')
+    write_fraud_csv(csv_path)
+    store = ColumnarData(csv_path, 'fraud', fmt=fmt)
+
+    expected = store.read_csv()
+    result = store.load(memory_map=True)
+
+    assert os.path.exists(store.path)
+    pd.testing.assert_frame_equal(result, expected)
+    assert result['browser'].dtype == 'category'
+    assert result['ip_address'].dtype == np.uint32
+    assert result['purchase_value'].dtype == np.float32
+
+    projected = store.load(columns=['purchase_time', 'class'])
+    assert list(projected.columns) == ['purchase_time', 'class']
+    pd.testing.assert_frame_equal(projected, expected[['purchase_time', 'class']])
+
+
+def test_columnar_copy_is_rebuilt_when_csv_changes(tmp_path):
+    csv_path = str(tmp_path / 'Fraud_Data.csv')
+    write_fraud_csv(csv_path, n_rows=100)
+    store = ColumnarData(csv_path, 'fraud')
+    assert len(store.load()) == 100
+
+    write_fraud_csv(csv_path, n_rows=50, seed=1)
+    os.utime(store.path, (0, 0))
+    assert store.is_stale()
+    assert len(store.load()) == 50
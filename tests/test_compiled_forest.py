@@ -0,0 +1,47 @@
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.tree import DecisionTreeClassifier
+from xgboost import XGBClassifier
+
+from src.compiled_forest import CompiledForest
+from tests.test_model_training import make_dataset
+
+
+def test_forest_probabilities_match_sklearn_bit_for_bit():
+    x, y = make_dataset(n_rows=2000)
+    x_new, _ = make_dataset(n_rows=5000, seed=1)
+    x_new.iloc[::7, 2] = np.nan
+    for model in [RandomForestClassifier(n_estimators=30, random_state=0, n_jobs=1).fit(x, y),
+                  DecisionTreeClassifier(random_state=0).fit(x, y)]:
+        forest = CompiledForest.from_model(model)
+        expected = model.predict_proba(x_new)
+
+        assert forest.predict_proba(x_new).dtype == expected.dtype
+        assert np.array_equal(forest.predict_proba(x_new), expected)
+        assert np.array_equal(forest.predict_proba(x_new.to_numpy()[:1]), expected[:1])
+        assert np.array_equal(forest.predict(x_new), model.predict(x_new))
+
+
+def test_xgboost_probabilities_match():
+    x, y = make_dataset(n_rows=2000)
+    x_new, _ = make_dataset(n_rows=3000, seed=1)
+    x_new.iloc[::5, 1] = np.nan
+    model = XGBClassifier(n_estimators=40, max_depth=4, random_state=0).fit(x, y)
+    forest = CompiledForest.from_model(model)
+
+    np.testing.assert_allclose(forest.predict_proba(x_new), model.predict_proba(x_new), rtol=1e-6, atol=1e-7)
+    assert np.array_equal(forest.predict(x_new), model.predict(x_new))
+
+
+def test_compiled_file_is_reused_until_the_model_changes(tmp_path):
+    x, y = make_dataset()
+    model_path = str(tmp_path / 'RF.pkl')
+    joblib.dump(RandomForestClassifier(n_estimators=5, random_state=0).fit(x, y), model_path)
+
+    forest = CompiledForest.from_model_file(model_path)
+    assert isinstance(forest.threshold, np.memmap)
+    assert (tmp_path / 'RF.forest').exists()
+
+    joblib.dump(DecisionTreeClassifier(random_state=0).fit(x, y), model_path)
+    assert len(CompiledForest.from_model_file(model_path).roots) == 1
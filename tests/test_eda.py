@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import eda
+from src.eda import EdaAnalysis, EdaPlot, QuantileSketch, histogram2d_counts, histogram_counts
+
+
+def make_frame(n_rows=20000, seed=0):
+    rng = np.random.default_rng(seed)
+    data = pd.DataFrame({
+        'purchase_value': rng.gamma(2.0, 20.0, n_rows).round(),
+        'age': rng.integers(18, 80, n_rows).astype(np.float64),
+        'velocity': rng.exponential(1e6, n_rows) + 1e9,
+        'browser': rng.choice(['Chrome', 'Safari', 'IE', 'Opera'], n_rows, p=[0.5, 0.3, 0.15, 0.05]),
+        'source': rng.choice(['SEO', 'Ads', None], n_rows).astype(object),
+    })
+    data['score'] = data['purchase_value'] * 0.1 + rng.normal(size=n_rows)
+    data.loc[rng.random(n_rows) < 0.1, 'age'] = np.nan
+    data.loc[rng.random(n_rows) < 0.05, 'score'] = np.nan
+    return data
+
+
+def test_streaming_profile_matches_the_full_passes(tmp_path):
+    data = make_frame()
+    eda = EdaAnalysis(data)
+    path = tmp_path / 'data.csv'
+    data.to_csv(path, index=False)
+
+    for profile in (eda.profile(chunksize=3000, sketch_size=512),
+                    EdaAnalysis.profile_csv(str(path), chunksize=3000, n_workers=2, sketch_size=512)):
+        expected = eda.get_descriptive_statistics()
+        described = profile.describe()[expected.columns]
+        exact = ['count', 'mean', 'std', 'min', 'max']
+        assert np.allclose(described.loc[exact], expected.loc[exact], rtol=1e-9)
+        # approximate quantiles: within 2% of the rows
+        for column in expected.columns:
+            values = data[column].dropna()
+            for q in ('25%', '50%', '75%'):
+                rank = (values < described.loc[q, column]).mean()
+                assert abs(rank - float(q[:-1]) / 100) < 0.02
+
+        assert np.allclose(profile.correlation(), data.select_dtypes('number').corr(), atol=1e-9)
+        assert profile.missing_values().to_dict() == eda.get_missing_values().to_dict()
+        distribution = profile.categorical_distribution()
+        for column in ('browser', 'source'):
+            assert distribution[column].to_dict() == data[column].value_counts().to_dict()
+
+
+@pytest.mark.filterwarnings('error::RuntimeWarning')
+def test_profile_csv_pins_the_roles_of_the_first_chunk(tmp_path):
+    path = tmp_path / 'data.csv'
+    pd.DataFrame({
+        'amount': [1.0, 2.0, 3.0, np.nan, 5.0, 6.0, 7.0, 8.0, 9.0, 10.0],
+        # all null in the first chunk, strings afterwards
+        'coupon': [None] * 5 + ['A', 'B', 'A', None, 'C'],
+        'late': [np.nan] * 5 + [1.0, 2.0, 3.0, 4.0, 5.0],
+    }).to_csv(path, index=False)
+
+    profile = EdaAnalysis.profile_csv(path, chunksize=5)
+
+    assert profile.numerical == ['amount']
+    assert profile.categorical == ['coupon', 'late']
+    assert profile.describe().loc['count', 'amount'] == 9
+    assert profile.categorical_distribution()['coupon'].to_dict() == {'A': 2, 'B': 1, 'C': 1}
+    assert profile.missing_values().to_dict() == {'amount': 1, 'coupon': 6, 'late': 5}
+
+
+def test_quantile_sketch_merges():
+    rng = np.random.default_rng(1)
+    values = rng.normal(size=200000)
+    parts = [QuantileSketch(k=256, seed=i) for i in range(4)]
+    for part, chunk in zip(parts, np.array_split(values, 4)):
+        part.update(chunk)
+    sketch = parts[0]
+    for part in parts[1:]:
+        sketch.merge(part)
+    assert sum(len(level) for level in sketch.levels) < 256 * len(sketch.levels) + 1
+    for q in (0.01, 0.25, 0.5, 0.9, 0.99):
+        assert abs((values < sketch.quantile(q)).mean() - q) < 0.02
+
+
+def test_headless_plots_are_rendered_from_binned_counts(tmp_path, monkeypatch):
+    monkeypatch.setattr(eda, 'PLOT_DIR', str(tmp_path))
+    data = make_frame(5000)
+    counts, xedges, yedges = histogram2d_counts(data['purchase_value'], data['score'], bins=50)
+    expected, *_ = np.histogram2d(*data[['purchase_value', 'score']].dropna().to_numpy().T, bins=[xedges, yedges])
+    assert counts.sum() == data['score'].notnull().sum()
+    assert np.array_equal(counts, expected)
+
+    plot = EdaPlot(data)
+    paths = plot.render_plots(numerical=['age'], pairs=[('purchase_value', 'score')], n_workers=2)
+    paths.append(plot.scatter_plot('age', 'velocity', headless=True))
+    assert [p.rsplit('/', 1)[1] for p in paths] == [
+        'distribution_age.png', 'distribution_browser.png', 'distribution_source.png',
+        'density_purchase_value_score.png', 'density_age_velocity.png']
+    for path in paths:
+        with open(path, 'rb') as f:
+            assert f.read(8) == b'\x89PNG\r\n\x1a\n'
+
+
+def test_histograms_drop_infinite_values():
+    x = np.array([1.0, 2.0, np.inf, np.nan, 3.0, -np.inf])
+    y = np.array([1.0, np.inf, 2.0, 2.0, 3.0, 1.0])
+
+    counts, edges = histogram_counts(x, bins=4)
+    assert counts.sum() == 3 and np.isfinite(edges).all()
+    counts, xedges, yedges = histogram2d_counts(x, y, bins=4)
+    assert counts.sum() == 2 and np.isfinite(xedges).all() and np.isfinite(yedges).all()
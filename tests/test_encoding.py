@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.encoding import DataProcessing, FittedPreprocessor
+
+
+def make_cleaned_data(n_rows=500, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'user_id': rng.integers(1, 400000, n_rows),
+        'purchase_time': rng.choice(['2015-04-18 02:47:11', '2015-06-08 01:38:54', '2015-01-01 18:52:45'], n_rows),
+        'purchase_value': rng.integers(9, 150, n_rows).astype(float),
+        'device_id': rng.choice(['QVPSPJUOCKZAR', 'EOGFQPIZPYXFZ', 'YSSKYOSJHPPLJ'], n_rows),
+        'browser': rng.choice(['Chrome', 'Safari', 'IE'], n_rows),
+        'age': rng.integers(18, 76, n_rows),
+        'country': rng.choice(['Japan', 'Kenya', 'Brazil'], n_rows),
+        'class': rng.integers(0, 2, n_rows),
+    })
+
+
+def test_fitted_preprocessor_matches_refit_path():
+    df = make_cleaned_data()
+    dp = DataProcessing(df)
+    expected = dp.standardize_data(dp.encode_data().drop('class', axis=1))
+
+    preprocessor = dp.fit_preprocessor(target='class')
+
+    pd.testing.assert_frame_equal(preprocessor.transform(df), expected, check_dtype=False)
+    record = df.iloc[3].to_dict()
+    np.testing.assert_allclose(preprocessor.transform_one(record), expected.iloc[3].to_numpy())
+
+
+@pytest.mark.filterwarnings("error::FutureWarning", "error::DeprecationWarning")
+def test_unseen_categories_and_round_trip(tmp_path):
+    df = make_cleaned_data()
+    preprocessor = DataProcessing(df).fit_preprocessor(target='class', unknown_value=-1)
+    path = str(tmp_path / 'preprocessor.pkl')
+    preprocessor.save(path)
+    loaded = FittedPreprocessor.load(path)
+
+    new = make_cleaned_data(5, seed=1)
+    new.loc[0, 'browser'] = 'Opera'
+    batch = loaded.transform(new)
+    single = loaded.transform_one(new.iloc[0].to_dict())
+
+    browser = loaded.feature_names.index('browser')
+    expected = (-1 - loaded.means['browser']) / loaded.scales['browser']
+    assert batch.iloc[0, browser] == single[browser] == expected
+    np.testing.assert_allclose(batch.to_numpy(), preprocessor.transform(new).to_numpy())
+
+
+def test_compact_codes_match_label_encoding():
+    df = make_cleaned_data()
+    expected = DataProcessing(df).encode_data()
+
+    result = DataProcessing(df).encode_data_compact()
+
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+    assert result['device_id'].dtype == np.int32
+    # the source frame is left untouched
+    assert df['device_id'].dtype != np.int32
+
+
+def test_compact_high_cardinality_methods():
+    df = make_cleaned_data()
+    dp = DataProcessing(df)
+
+    hashed = dp.encode_data_compact('hash', high_cardinality_columns=['device_id'], n_buckets=64)
+    assert hashed['device_id'].between(0, 63).all()
+    assert hashed.groupby(df['device_id'])['device_id'].nunique().eq(1).all()
+    assert (hashed['browser'] == dp.encode_data()['browser']).all()
+
+    frequency = dp.encode_data_compact('frequency', high_cardinality_columns=['device_id', 'user_id'])
+    expected = df['device_id'].map(df['device_id'].value_counts(normalize=True))
+    np.testing.assert_allclose(frequency['device_id'], expected, rtol=1e-6)
+
+    target = dp.encode_data_compact('target', high_cardinality_columns=['device_id'], target='class',
+                                    smoothing=0, n_folds=3, random_state=1)
+    folds = np.random.default_rng(1).permutation(len(df)) % 3
+    expected = pd.Series(np.nan, index=df.index)
+    for fold in range(3):
+        rest = df[folds != fold]
+        means = df.loc[folds == fold, 'device_id'].map(rest.groupby('device_id')['class'].mean())
+        expected[folds == fold] = means.fillna(rest['class'].mean())
+    np.testing.assert_allclose(target['device_id'], expected, rtol=1e-6)
+
+
+def test_compact_target_encoding_does_not_leak_the_label():
+    df = make_cleaned_data()
+    # one row per key: in-sample means would reproduce the label exactly
+    df['device_id'] = [f'device-{i}' for i in range(len(df))]
+    target = DataProcessing(df).encode_data_compact('target', high_cardinality_columns=['device_id'],
+                                                    target='class', smoothing=0)
+    assert not np.allclose(target['device_id'], df['class'])
+    assert target['device_id'].between(0, 1).all()
+    with pytest.raises(ValueError):
+        DataProcessing(df).encode_data_compact('target', high_cardinality_columns=['device_id'],
+                                               target='class', n_folds=1)
+
+
+def test_compact_frequency_and_target_encode_null_keys():
+    df = make_cleaned_data()
+    df['device_id'] = df['device_id'].astype(object)
+    df.loc[[0, 7, 9], 'device_id'] = None
+    dp = DataProcessing(df)
+
+    frequency = dp.encode_data_compact('frequency', high_cardinality_columns=['device_id'])
+    assert np.allclose(frequency.loc[[0, 7, 9], 'device_id'], 3 / len(df))
+    target = dp.encode_data_compact('target', high_cardinality_columns=['device_id'], target='class')
+    assert target['device_id'].notna().all() and target['device_id'].between(0, 1).all()
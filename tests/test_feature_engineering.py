@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+from src.feature_engineering import FeatureEngineering, StreamingFeatureEngineering
+
+
+def write_merged_csv(path, n_rows=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    signup = pd.Timestamp('2015-01-01') + pd.to_timedelta(rng.integers(0, 200 * 86400, n_rows), 's')
+    purchase = signup + pd.to_timedelta(rng.integers(1, 120 * 86400, n_rows), 's')
+    pd.DataFrame({
+        # few users so that most of them have transactions in several chunks
+        'user_id': rng.integers(1, 150, n_rows),
+        'signup_time': signup,
+        'purchase_time': purchase,
+        'purchase_value': rng.integers(9, 150, n_rows),
+        'device_id': rng.choice(['QVPSPJUOCKZAR', 'EOGFQPIZPYXFZ'], n_rows),
+        'source': rng.choice(['SEO', 'Ads', 'Direct'], n_rows),
+        'browser': rng.choice(['Chrome', 'Safari', 'IE'], n_rows),
+        'sex': rng.choice(['M', 'F'], n_rows),
+        'age': rng.integers(18, 76, n_rows),
+        'ip_address': rng.uniform(0, 2 ** 32 - 1, n_rows),
+        'country': rng.choice(['Japan', 'Kenya', None], n_rows),
+        'class': rng.integers(0, 2, n_rows),
+    }).to_csv(path, index=False)
+
+
+def in_memory_features(csv_path):
+    df = pd.read_csv(csv_path)
+    df['signup_time'] = pd.to_datetime(df['signup_time'], errors='coerce')
+    df['purchase_time'] = pd.to_datetime(df['purchase_time'], errors='coerce')
+    fe = FeatureEngineering(df)
+    fe.get_purchase_weekday()
+    fe.get_purchase_hour()
+    fe.transaction_frequency()
+    fe.velocity_check()
+    return df
+
+
+def test_streaming_matches_in_memory(tmp_path):
+    csv_path = str(tmp_path / 'merged_data.csv')
+    write_merged_csv(csv_path)
+    expected = in_memory_features(csv_path)
+
+    streaming = StreamingFeatureEngineering(csv_path, chunk_size=128)
+    result = pd.concat(streaming.transform(), ignore_index=True)
+
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_streaming_to_csv(tmp_path):
+    csv_path = str(tmp_path / 'merged_data.csv')
+    output_path = str(tmp_path / 'cleaned_data.csv')
+    write_merged_csv(csv_path)
+    expected = in_memory_features(csv_path).dropna(axis=0)
+
+    rows = StreamingFeatureEngineering(csv_path, chunk_size=300).to_csv(output_path)
+
+    assert rows == len(expected)
+    result = pd.read_csv(output_path)
+    assert list(result.columns) == list(expected.columns)
+    assert result['transaction_frequency'].tolist() == expected['transaction_frequency'].tolist()
+
+
+def test_streaming_counts_skip_null_user_ids(tmp_path):
+    csv_path = str(tmp_path / 'merged_data.csv')
+    write_merged_csv(csv_path, n_rows=300)
+    df = pd.read_csv(csv_path)
+    df.loc[[5, 140, 141], 'user_id'] = np.nan
+    df.to_csv(csv_path, index=False)
+    expected = in_memory_features(csv_path)
+
+    streaming = StreamingFeatureEngineering(csv_path, chunk_size=64)
+    streaming.COUNT_BATCH = 2
+    counts = streaming.count_transactions()
+    result = pd.concat(streaming.transform(), ignore_index=True)
+
+    assert counts.dtype == np.int64 and counts.sum() == 297
+    pd.testing.assert_series_equal(counts, df['user_id'].value_counts().sort_index(), check_names=False,
+                                   check_index_type=False)
+    assert result['transaction_frequency'].isna().sum() == 3
+    pd.testing.assert_series_equal(result['transaction_frequency'].astype('float64'),
+                                   expected['transaction_frequency'].astype('float64'))
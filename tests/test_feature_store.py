@@ -0,0 +1,93 @@
+import pandas as pd
+
+from src.feature_engineering import FeatureEngineering
+from src.feature_store import OnlineFeatureStore
+from tests.test_feature_engineering import in_memory_features, write_merged_csv
+
+
+def test_store_matches_offline_features(tmp_path):
+    csv_path = str(tmp_path / 'merged_data.csv')
+    write_merged_csv(csv_path)
+    offline = in_memory_features(csv_path)
+    transactions = pd.read_csv(csv_path)
+
+    store = OnlineFeatureStore(ttl=float('inf'))
+    online = pd.DataFrame(store.update_many(transactions))
+
+    assert online['velocity_check'].tolist() == offline['velocity_check'].tolist()
+    assert online['purchase_hour'].tolist() == offline['purchase_hour'].tolist()
+    assert online['purchase_weekday'].tolist() == offline['purchase_weekday'].tolist()
+    # once the whole history is replayed the running counts equal the offline counts
+    final_counts = [store.count('user_id', user) for user in transactions['user_id']]
+    assert final_counts == offline['transaction_frequency'].tolist()
+
+
+def test_running_counts_and_time_since_last_purchase():
+    store = OnlineFeatureStore()
+    first = store.update({'user_id': 1, 'device_id': 'A', 'ip_address': 10.0,
+                          'signup_time': '2015-01-01 00:00:00', 'purchase_time': '2015-01-01 00:00:10'})
+    second = store.update({'user_id': 1, 'device_id': 'B', 'ip_address': 10.0,
+                           'signup_time': '2015-01-01 00:00:00', 'purchase_time': '2015-01-01 00:01:10'})
+
+    assert first['transaction_frequency'] == 1 and first['time_since_last_purchase'] is None
+    assert first['velocity_check'] == 10
+    assert second['transaction_frequency'] == 2 and second['time_since_last_purchase'] == 60
+    assert second['device_id_count'] == 1 and second['ip_address_count'] == 2
+
+
+def test_inactive_entities_are_evicted():
+    store = OnlineFeatureStore(ttl=3600, max_entities=50)
+    start = pd.Timestamp('2015-01-01')
+    for i in range(100):
+        store.update({'user_id': i, 'signup_time': start, 'purchase_time': start + pd.Timedelta(minutes=i)})
+    assert store.stats()['user_id'] == 50
+
+    store.update({'user_id': 'late', 'signup_time': start, 'purchase_time': start + pd.Timedelta(days=1)})
+    assert store.stats()['user_id'] == 1
+    assert store.count('user_id', 0) == 0
+
+
+def test_store_counts_match_offline_point_in_time_counts(tmp_path):
+    csv_path = str(tmp_path / 'merged_data.csv')
+    write_merged_csv(csv_path)
+    transactions = pd.read_csv(csv_path)
+    transactions['purchase_time'] = pd.to_datetime(transactions['purchase_time'])
+    offline = FeatureEngineering(transactions.copy()).transaction_frequency(point_in_time=True)
+
+    # replayed in event time order, as the requests would arrive
+    ordered = transactions.sort_values('purchase_time', kind='stable')
+    online = pd.DataFrame(OnlineFeatureStore(ttl=float('inf')).update_many(ordered), index=ordered.index)
+
+    assert online['transaction_frequency'].sort_index().tolist() == offline['transaction_frequency'].tolist()
+    assert (offline['transaction_frequency'] <= in_memory_features(csv_path)['transaction_frequency']).all()
+
+
+def test_out_of_order_events_expire():
+    store = OnlineFeatureStore(ttl=3 * 3600)
+    start = pd.Timestamp('2015-01-01')
+    store.update({'user_id': 'fresh', 'signup_time': start, 'purchase_time': start + pd.Timedelta(hours=5)})
+    # arrives after 'fresh' but happened before it, so it sits behind a live entity
+    store.update({'user_id': 'stale', 'signup_time': start, 'purchase_time': start + pd.Timedelta(hours=3)})
+    assert store.count('user_id', 'stale') == 1
+
+    store.update({'user_id': 'other', 'signup_time': start, 'purchase_time': start + pd.Timedelta(hours=6.5)})
+    assert store.count('user_id', 'stale') == 0
+    assert store.count('user_id', 'fresh') == 1
+    assert store.stats()['user_id'] == 2
+
+
+def test_late_events_have_no_negative_delay_and_scoring_can_skip_recording():
+    store = OnlineFeatureStore()
+    start = pd.Timestamp('2015-01-01')
+    store.update({'user_id': 1, 'signup_time': start, 'purchase_time': start + pd.Timedelta(hours=5)})
+    late = store.update({'user_id': 1, 'signup_time': start, 'purchase_time': start + pd.Timedelta(hours=2)})
+    assert late['transaction_frequency'] == 2 and late['time_since_last_purchase'] is None
+    later = {'user_id': 1, 'signup_time': start, 'purchase_time': start + pd.Timedelta(hours=6)}
+
+    # scoring without recording is repeatable and leaves the store unchanged
+    for _ in range(2):
+        peek = store.update(later, record=False)
+        assert peek['transaction_frequency'] == 3 and peek['time_since_last_purchase'] == 3600
+    assert store.count('user_id', 1) == 2
+    assert store.update(later) == peek
+    assert store.count('user_id', 1) == 3
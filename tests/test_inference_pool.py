@@ -0,0 +1,32 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.inference_pool import InferencePool, PoolSaturated
+
+
+def test_pool_rejects_when_full_and_times_out():
+    pool = InferencePool(max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(pool.run(release.wait))
+        queued = asyncio.ensure_future(pool.run(lambda: 'queued'))
+        await asyncio.sleep(0.05)
+        # one call running and one waiting: the pool is full
+        with pytest.raises(PoolSaturated):
+            await pool.run(lambda: 'rejected')
+        release.set()
+        assert await running is True
+        assert await queued == 'queued'
+        release.clear()
+        with pytest.raises(TimeoutError):
+            await pool.run(release.wait, timeout=0.05)
+        release.set()
+
+    asyncio.run(scenario())
+    pool.shutdown()
+    metrics = pool.metrics()
+    assert metrics['rejected'] == 1 and metrics['timed_out'] == 1
+    assert metrics['pending'] == 0 and metrics['completed'] == 3
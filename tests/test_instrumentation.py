@@ -0,0 +1,80 @@
+import pandas as pd
+import pytest
+
+from src import instrumentation
+from src.instrumentation import MetricsRegistry, STAGE_DURATION, STAGE_ERRORS, STAGE_ROWS, rows_of, timed, timer
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    requests = registry.counter('requests_total', 'Requests.', ['route'])
+    latency = registry.histogram('latency_seconds', 'Latency.', ['route'], buckets=(0.1, 1))
+    requests.inc(route='/predict')
+    requests.inc(2, route='/predict')
+    latency.observe(0.05, route='/predict')
+    latency.observe(0.5, route='/predict')
+    latency.observe(5, route='/predict')
+
+    lines = registry.render().splitlines()
+    assert '# TYPE requests_total counter' in lines
+    assert 'requests_total{route="/predict"} 3' in lines
+    assert '# TYPE latency_seconds histogram' in lines
+    assert 'latency_seconds_bucket{route="/predict",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/predict",le="1.0"} 2' in lines
+    assert 'latency_seconds_bucket{route="/predict",le="+Inf"} 3' in lines
+    assert 'latency_seconds_sum{route="/predict"} 5.55' in lines
+    assert 'latency_seconds_count{route="/predict"} 3' in lines
+    assert registry.counter('requests_total', 'Requests.', ['route']) is requests
+    with pytest.raises(ValueError):
+        registry.histogram('requests_total', 'Requests.', ['route'])
+
+
+class Stage:
+    def __init__(self, data):
+        self.data = data
+
+    @timed
+    def double(self):
+        return self.data * 2
+
+    @timed(stage='test.fit', rows=rows_of('data'))
+    def fit(self):
+        return 'model'
+
+    @timed
+    def fail(self):
+        raise ValueError('boom')
+
+
+def test_timed_records_durations_rows_and_errors():
+    if not instrumentation.METRICS_ENABLED:
+        pytest.skip('metrics disabled through METRICS_ENABLED=0')
+    stage = Stage(pd.DataFrame({'a': range(10)}))
+    double = f'{Stage.__qualname__}.double'
+    fail = f'{Stage.__qualname__}.fail'
+    calls, rows = STAGE_DURATION.count(stage=double), STAGE_ROWS.value(stage=double)
+
+    stage.double()
+    stage.double()
+    stage.fit()
+    with pytest.raises(ValueError):
+        stage.fail()
+    with timer('test.block') as t:
+        t.rows = 7
+
+    assert STAGE_DURATION.count(stage=double) == calls + 2
+    assert STAGE_ROWS.value(stage=double) == rows + 20
+    assert STAGE_ROWS.value(stage='test.fit') >= 10
+    assert STAGE_ERRORS.value(stage=fail) >= 1 and STAGE_ROWS.value(stage=fail) == 0
+    assert STAGE_ROWS.value(stage='test.block') >= 7
+    assert 'fraud_stage_duration_seconds_count{stage="test.fit"}' in instrumentation.REGISTRY.render()
+
+
+def test_timed_returns_the_function_when_disabled(monkeypatch):
+    monkeypatch.setattr(instrumentation, 'METRICS_ENABLED', False)
+
+    def stage():
+        return 1
+
+    assert timed(stage) is stage
+    assert timed(rows=len)(stage) is stage
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+
+from src.ip_geolocation import IPGeolocation, SortedIPGeolocation
+
+
+def make_ranges(n_ranges, seed=0):
+    """Random non-overlapping IP ranges with gaps between them."""
+    rng = np.random.default_rng(seed)
+    edges = np.sort(rng.choice(2 ** 32 - 1, size=2 * n_ranges, replace=False))
+    lower, upper = edges[0::2], edges[1::2]
+    # drop some ranges to leave wider gaps
+    keep = rng.random(n_ranges) > 0.2
+    countries = rng.choice(['Ethiopia', 'Kenya', 'Japan', 'Brazil', 'Canada'], size=n_ranges)
+    df = pd.DataFrame({
+        'lower_bound_ip_address': lower[keep].astype(float),
+        'upper_bound_ip_address': upper[keep],
+        'country': countries[keep],
+    })
+    # the source file is not guaranteed to be sorted
+    return df.sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+def make_transactions(df_ranges, n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    inside = rng.integers(len(df_ranges), size=n_rows // 2)
+    ips = np.concatenate([
+        # IPs inside known ranges, including both bounds
+        df_ranges['lower_bound_ip_address'].to_numpy()[inside[:n_rows // 4]],
+        df_ranges['upper_bound_ip_address'].to_numpy()[inside[n_rows // 4:]],
+        # uniformly random IPs, most of which land inside gaps
+        rng.uniform(0, 2 ** 32 - 1, size=n_rows - n_rows // 2),
+    ])
+    return pd.DataFrame({
+        'user_id': np.arange(len(ips)),
+        'signup_time': pd.Timestamp('2015-01-01'),
+        'purchase_time': pd.Timestamp('2015-02-01'),
+        'purchase_value': rng.integers(9, 150, size=len(ips)),
+        'device_id': 'QVPSPJUOCKZAR',
+        'source': 'SEO',
+        'browser': 'Chrome',
+        'sex': 'M',
+        'age': 30,
+        'ip_address': ips,
+        'class': rng.integers(2, size=len(ips)),
+    })
+
+
+def test_sorted_engine_matches_interval_tree():
+    for seed in range(3):
+        df_ranges = make_ranges(500, seed=seed)
+        df_ips = make_transactions(df_ranges, 2000, seed=seed)
+
+        expected = IPGeolocation(df_ranges).map_ips_to_countries(df_ips.copy())
+        result = SortedIPGeolocation(df_ranges).map_ips_to_countries(df_ips.copy())
+
+        pd.testing.assert_frame_equal(result, expected)
+        assert result['country'].notnull().any()
+        assert result['country'].isnull().any()
+
+
+def test_sorted_engine_without_ranges():
+    df_ranges = make_ranges(10).iloc[:0]
+    df_ips = make_transactions(make_ranges(10), 20)
+
+    result = SortedIPGeolocation(df_ranges).map_ips_to_countries(df_ips)
+
+    assert result['country'].isnull().all()
+
+
+def test_index_round_trip_and_rebuild(tmp_path):
+    csv_path = tmp_path / 'IpAddress_to_Country.csv'
+    index_path = str(tmp_path / 'ranges.idx')
+    df_ranges = make_ranges(300)
+    df_ranges.to_csv(csv_path, index=False)
+    df_ips = make_transactions(df_ranges, 1000)
+    expected = SortedIPGeolocation(df_ranges).map_ips_to_countries(df_ips.copy())
+
+    engine = SortedIPGeolocation.from_csv(str(csv_path), index_path)
+    assert isinstance(engine.lower, np.memmap)
+    pd.testing.assert_frame_equal(engine.map_ips_to_countries(df_ips.copy()), expected)
+
+    # a changed csv invalidates the index and triggers a rebuild
+    make_ranges(50, seed=7).to_csv(csv_path, index=False)
+    engine = SortedIPGeolocation.from_csv(str(csv_path), index_path)
+    assert len(engine.lower) == len(pd.read_csv(csv_path))
+
+
+def test_scalar_lookup_matches_batch_and_counts_cache_hits():
+    df_ranges = make_ranges(200)
+    df_ips = make_transactions(df_ranges, 400)
+    tree, engine = IPGeolocation(df_ranges), SortedIPGeolocation(df_ranges, cache_size=16)
+    expected = engine.map_ips_to_countries(df_ips.copy())['country']
+
+    for ip, country in zip(df_ips['ip_address'], expected):
+        assert engine.lookup(ip) == tree.lookup(ip) == (None if pd.isnull(country) else country)
+
+    lower = int(df_ranges['lower_bound_ip_address'].iloc[0])
+    assert engine.lookup(str(lower)) == df_ranges['country'].iloc[0]
+    assert engine.lookup('0.0.0.0') == tree.lookup(0)
+    assert engine.lookup(-1) is None and engine.lookup(2 ** 40) is None
+
+    engine.init_cache(16)
+    engine.lookup(lower)
+    engine.lookup(lower)
+    info = engine.cache_info()
+    assert (info.hits, info.misses, info.maxsize) == (1, 1, 16)
+
+
+def test_ranges_without_a_country_resolve_to_none(tmp_path):
+    df_ranges = make_ranges(50)
+    df_ranges['country'] = df_ranges['country'].astype(object)
+    df_ranges.loc[3, 'country'] = None
+    engine = SortedIPGeolocation(df_ranges)
+    inside = int(df_ranges['lower_bound_ip_address'][3])
+    other = int(df_ranges['lower_bound_ip_address'][4])
+
+    assert len(engine.lower) == len(df_ranges) - 1
+    assert engine.lookup(inside) is None
+    assert engine.lookup(other) == df_ranges['country'][4]
+    assert list(engine.resolve([inside, other])) == [None, df_ranges['country'][4]]
+
+    csv_path = tmp_path / 'ranges.csv'
+    df_ranges.to_csv(csv_path, index=False)
+    assert SortedIPGeolocation.from_csv(str(csv_path)).lookup(inside) is None
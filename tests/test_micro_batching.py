@@ -0,0 +1,111 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+import numpy as np
+import pytest
+
+from src.micro_batching import MicroBatcher
+
+
+def test_concurrent_requests_are_coalesced():
+    batch_sizes = []
+    release = threading.Event()
+
+    def predict(rows):
+        # hold the first call so the other requests pile up in the queue
+        release.wait(5)
+        batch_sizes.append(len(rows))
+        return rows.sum(axis=1)
+
+    batcher = MicroBatcher(predict, max_batch_size=8, max_wait=0.05).start()
+    rows = np.arange(60, dtype=float).reshape(30, 2)
+    with ThreadPoolExecutor(max_workers=30) as pool:
+        futures = [pool.submit(batcher.submit, row, 5) for row in rows]
+        release.set()
+        results = [f.result() for f in futures]
+    batcher.stop(5)
+
+    assert results == rows.sum(axis=1).tolist()
+    assert max(batch_sizes) <= 8
+    assert len(batch_sizes) < len(rows)
+    metrics = batcher.metrics()
+    assert metrics['rows'] == 30 and metrics['batches'] == len(batch_sizes)
+    assert metrics['batch_size_max'] == max(batch_sizes)
+
+
+def test_errors_are_returned_to_every_request_in_the_batch():
+    def predict(rows):
+        raise ValueError('bad batch')
+
+    batcher = MicroBatcher(predict, max_batch_size=4, max_wait=0.001).start()
+    with pytest.raises(ValueError, match='bad batch'):
+        batcher.submit([1.0, 2.0], timeout=5)
+    batcher.stop(5)
+
+    with pytest.raises(RuntimeError):
+        batcher.submit([1.0, 2.0])
+
+
+def test_a_malformed_row_only_fails_its_own_request():
+    release = threading.Event()
+
+    def predict(rows):
+        release.wait(5)
+        if rows.ndim != 2 or rows.shape[1] != 2:
+            raise ValueError('expected 2 features')
+        return rows.sum(axis=1)
+
+    batcher = MicroBatcher(predict, max_batch_size=8, max_wait=0.05).start()
+    # the 3 value row cannot be stacked with the others
+    rows = [[1.0, 2.0], [3.0, 4.0], [5.0, 6.0, 7.0], [8.0, 9.0]]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(batcher.submit, row, 5) for row in rows]
+        release.set()
+        outcomes = [f.exception() or f.result() for f in futures]
+    batcher.stop(5)
+
+    assert outcomes[0] == 3.0 and outcomes[1] == 7.0 and outcomes[3] == 17.0
+    assert isinstance(outcomes[2], ValueError)
+    assert batcher.metrics()['rows'] == 4
+
+
+# the worker thread is killed on purpose
+@pytest.mark.filterwarnings('ignore::pytest.PytestUnhandledThreadExceptionWarning')
+def test_short_results_and_dead_worker_fail_the_requests():
+    batcher = MicroBatcher(lambda rows: rows.sum(axis=1)[:-1], max_batch_size=4, max_wait=0.001).start()
+    with pytest.raises(ValueError, match='0 results for 1 rows'):
+        batcher.submit([1.0, 2.0], timeout=5)
+    batcher.stop(5)
+
+    def predict(rows):
+        raise SystemExit()
+
+    batcher = MicroBatcher(predict, max_batch_size=4, max_wait=0.001).start()
+    with pytest.raises(SystemExit):
+        batcher.submit([1.0, 2.0])
+    batcher._worker.join(5)
+    # a request queued after the worker died does not wait forever
+    with pytest.raises(RuntimeError, match='not running'):
+        batcher.submit([1.0, 2.0])
+
+
+def test_rows_are_batched_per_key():
+    calls = []
+    release = threading.Event()
+
+    def predict(rows, key):
+        release.wait(5)
+        calls.append((key, len(rows)))
+        return rows[:, 0] * key
+
+    batcher = MicroBatcher(predict, max_batch_size=16, max_wait=0.05).start()
+    keys = [1, 10] * 6
+    with ThreadPoolExecutor(max_workers=12) as pool:
+        futures = [pool.submit(batcher.submit, [float(i)], 5, key) for i, key in enumerate(keys)]
+        release.set()
+        results = [f.result() for f in futures]
+    batcher.stop(5)
+
+    assert results == [i * key for i, key in enumerate(keys)]
+    assert sum(size for _, size in calls) == 12
+    assert len(calls) < 12
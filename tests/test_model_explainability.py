@@ -0,0 +1,57 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+import shap
+from sklearn.ensemble import RandomForestClassifier
+
+from src.model_explainability import ModelExplainability
+
+
+def make_explainability(n_rows=600, n_features=5, seed=0):
+    rng = np.random.default_rng(seed)
+    x = pd.DataFrame(rng.normal(size=(n_rows, n_features)), columns=[f'f{i}' for i in range(n_features)])
+    y = (x['f0'] + x['f1'] * x['f2'] + 0.3 * rng.normal(size=n_rows) > 0.5).astype(int)
+    model = RandomForestClassifier(n_estimators=15, max_depth=6, random_state=0).fit(x[:400], y[:400])
+    return ModelExplainability(model, x[:400], x[400:], list(x.columns))
+
+
+def test_chunked_parallel_shap_values_are_cached(tmp_path):
+    me = make_explainability()
+    cache_dir = str(tmp_path / 'shap')
+
+    values = me.compute_shap_values(background_size=40, chunk_size=64, n_workers=2, cache_dir=cache_dir)
+    background = me.shap_background(40)
+    expected = shap.Explainer(me.model, background)(me.x_test, check_additivity=False).values[:, :, 1]
+    assert values.shape == (200, 5)
+    assert np.allclose(values, expected)
+    # local accuracy: the values add up to the fraud probability minus the background mean
+    expected_value = me.model.predict_proba(background)[:, 1].mean()
+    assert np.allclose(values.sum(axis=1) + expected_value, me.model.predict_proba(me.x_test)[:, 1])
+
+    files = os.listdir(cache_dir)
+    assert len(files) == 1 and files[0].startswith('shap_')
+    assert np.array_equal(me.compute_shap_values(background_size=40, chunk_size=200, cache_dir=cache_dir), values)
+    assert os.listdir(cache_dir) == files
+
+    # another background is another cache entry
+    kmeans = me.compute_shap_values(background_size=10, background_method='kmeans', cache_dir=cache_dir)
+    assert kmeans.shape == (200, 5) and len(os.listdir(cache_dir)) == 2
+
+
+@pytest.mark.filterwarnings('error:X does not have valid feature names:UserWarning')
+def test_batched_lime_explanations_do_not_depend_on_workers(tmp_path):
+    me = make_explainability()
+    output_path = str(tmp_path / 'lime.csv')
+
+    serial = me.explain_instances_with_lime([0, 3, 7], num_features=3, num_samples=500,
+                                            output_path=output_path)
+    parallel = me.explain_instances_with_lime([0, 3, 7], num_features=3, num_samples=500,
+                                              n_workers=2, output_path=None)
+    assert len(serial) == 9 and list(serial['rank'][:3]) == [1, 2, 3]
+    assert set(serial['feature']) <= set(me.feature_names)
+    assert np.allclose(serial.groupby('instance_index')['fraud_probability'].first(),
+                       me.model.predict_proba(me.x_test.iloc[[0, 3, 7]])[:, 1])
+    pd.testing.assert_frame_equal(serial, parallel)
+    pd.testing.assert_frame_equal(pd.read_csv(output_path), serial)
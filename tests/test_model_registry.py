@@ -0,0 +1,138 @@
+import multiprocessing
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from src.compiled_forest import CompiledForest
+from src.model_registry import ActiveModel, ModelRegistry
+from tests.test_model_training import make_dataset
+
+
+def test_register_lazy_load_and_hot_swap(tmp_path):
+    x, y = make_dataset()
+    registry = ModelRegistry(str(tmp_path / 'registry'))
+    first = RandomForestClassifier(n_estimators=5, random_state=0).fit(x, y)
+    second = RandomForestClassifier(n_estimators=7, random_state=1).fit(x, y)
+
+    assert registry.register('RF', first, list(x.columns), x_test=x, y_test=y) == 'v1'
+    warmed = []
+    active = ActiveModel(registry, 'RF', on_load=lambda loaded: warmed.append(loaded.version))
+    assert active._current is None
+
+    version = active.current
+    assert version.version == 'v1' and version.loaded_at is not None
+    assert set(version.metrics) >= {'accuracy', 'precision', 'recall', 'f1', 'roc_auc'}
+    assert version.feature_names == list(x.columns)
+    assert isinstance(version.forest.threshold, np.memmap)
+    assert np.array_equal(version.forest.predict_proba(x), first.predict_proba(x))
+
+    assert registry.register('RF', second, list(x.columns)) == 'v2'
+    assert registry.versions('RF') == ['v1', 'v2']
+
+    # requests keep scoring while the swap happens
+    errors, stop = [], threading.Event()
+
+    def serve():
+        while not stop.is_set():
+            held = active.current
+            try:
+                expected = {'v1': first, 'v2': second}[held.version].predict_proba(x[:5])
+                assert np.array_equal(held.forest.predict_proba(x[:5]), expected)
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=serve) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    swapped = active.swap()
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert swapped.version == 'v2' and active.current is swapped
+    assert active.swap('v1').version == 'v1'
+    # every version is warmed once, before it is served
+    assert warmed == ['v1', 'v2', 'v1']
+
+
+def test_published_versions_load_in_the_background(tmp_path):
+    x, y = make_dataset()
+    registry = ModelRegistry(str(tmp_path / 'registry'))
+    registry.register('RF', RandomForestClassifier(n_estimators=5, random_state=0).fit(x, y), list(x.columns))
+    registry.register('RF', RandomForestClassifier(n_estimators=7, random_state=1).fit(x, y), list(x.columns))
+    shared = multiprocessing.Array('c', 64)
+    release = threading.Event()
+
+    def slow_warm_up(loaded):
+        if loaded.version == 'v2':
+            release.wait(5)
+
+    swapping = ActiveModel(registry, 'RF', 'v1', shared_version=shared)
+    following = ActiveModel(registry, 'RF', 'v1', shared_version=shared, on_load=slow_warm_up)
+    assert swapping.current.version == following.current.version == 'v1'
+
+    swapping.swap('v2')
+    # the other worker keeps serving v1 while v2 loads, instead of blocking its requests
+    for _ in range(3):
+        assert following.current.version == 'v1'
+    release.set()
+    for _ in range(100):
+        if following.current.version == 'v2':
+            break
+        time.sleep(0.05)
+    assert following.current.version == 'v2' and following.version == 'v2'
+
+
+def unique_rss_kb():
+    """Memory only this process maps (private clean + dirty pages), in kB."""
+    with open('/proc/self/smaps_rollup') as f:
+        return sum(int(line.split()[1]) for line in f if line.startswith(('Private_Clean', 'Private_Dirty')))
+
+
+def touch_forest(forest, x, private, conn):
+    before = unique_rss_kb()
+    if private:
+        # what every worker pays when it loads its own copy
+        forest = CompiledForest.load(forest.path, mmap_mode=None)
+    for name in CompiledForest.ARRAYS:
+        getattr(forest, name).sum()
+    forest.predict_proba(x)
+    conn.send(unique_rss_kb() - before)
+
+
+@pytest.mark.skipif(not os.path.exists('/proc/self/smaps_rollup'), reason='needs Linux smaps_rollup')
+def test_forked_workers_share_the_model_arrays(tmp_path):
+    # noisy labels grow large trees, about 10 MB of node arrays
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=(20000, 6))
+    y = rng.integers(0, 2, 20000)
+    registry = ModelRegistry(str(tmp_path / 'registry'))
+    registry.register('RF', RandomForestClassifier(n_estimators=40, random_state=0).fit(x, y), list(range(6)))
+
+    # loaded once by the parent, before forking the workers
+    forest = ActiveModel(registry, 'RF').current.forest
+    forest.path = str(tmp_path / 'registry' / 'RF' / 'v1' / 'model.forest')
+    for name in CompiledForest.ARRAYS:
+        getattr(forest, name).sum()
+    forest.predict_proba(x[:200])
+    model_kb = forest.nbytes() / 1024
+
+    context = multiprocessing.get_context('fork')
+    growth = []
+    for private in [False, False, False, True]:
+        parent_conn, child_conn = context.Pipe()
+        worker = context.Process(target=touch_forest, args=(forest, x[:200], private, child_conn))
+        worker.start()
+        growth.append(parent_conn.recv())
+        worker.join()
+
+    assert model_kb > 8 * 1024
+    # workers attached to the parent's mapping only pay a fixed interpreter overhead
+    # (copy-on-write of touched Python objects), a private copy pays the whole model
+    assert max(growth[:3]) < 0.25 * model_kb
+    assert growth[3] - max(growth[:3]) > 0.8 * model_kb
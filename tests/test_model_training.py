@@ -0,0 +1,104 @@
+import sys
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import (accuracy_score, average_precision_score, f1_score, precision_score,
+                             recall_score, roc_auc_score)
+
+from src import model_training
+from src.model_training import EvaluateModel, SplitData, TrainData, TrainingOrchestrator, XGBoostTrials
+
+
+def make_dataset(n_rows=400, n_features=6, seed=0):
+    rng = np.random.default_rng(seed)
+    x = pd.DataFrame(rng.normal(size=(n_rows, n_features)), columns=[f'f{i}' for i in range(n_features)])
+    y = pd.Series((x['f0'] + 0.5 * rng.normal(size=n_rows) > 1).astype(int), name='class')
+    return x, y
+
+
+def test_orchestrator_trains_every_model_on_every_dataset(tmp_path):
+    datasets = {
+        'ecommerce': SplitData(*make_dataset(seed=0)).split_data(),
+        'credit_card': SplitData(*make_dataset(seed=1)).split_data(),
+    }
+    orchestrator = TrainingOrchestrator(datasets, cpu_budget=2, threads_per_job=1)
+
+    report = orchestrator.run(model_dir=str(tmp_path / 'models'))
+    orchestrator.write_report(str(tmp_path / 'report.csv'))
+
+    assert len(report) == 6
+    assert set(report['model']) == {'decision_tree', 'random_forest', 'xgboost'}
+    assert (report['fit_time_s'] > 0).all()
+    assert report[['accuracy', 'precision', 'recall', 'f1', 'roc_auc']].notnull().all().all()
+    assert all(path.endswith('.pkl') for path in report['model_path'])
+    assert len(pd.read_csv(tmp_path / 'report.csv')) == 6
+
+
+def test_xgboost_hist_early_stopping_and_trials():
+    x, y = make_dataset(n_rows=1500)
+    x_train, x_val, x_test, y_train, y_val, y_test = SplitData(x, y).split_data_with_validation()
+    _, expected_x_test, _, _ = SplitData(x, y).split_data()
+    assert x_test.index.equals(expected_x_test.index)
+    assert y_val.sum() > 0
+
+    model = TrainData(x_train, y_train).xgboost_hist_classifier(
+        x_val, y_val, early_stopping_rounds=5, n_estimators=500, n_jobs=1)
+    assert model.best_iteration < 499
+
+    trials = XGBoostTrials(x_train, y_train, x_val, y_val, n_jobs=1)
+    for max_depth in (2, 4):
+        trial_model = trials.train(early_stopping_rounds=5, max_depth=max_depth)
+        accuracy, *_ = EvaluateModel().evaluate_model(trial_model, x_test, y_test)
+        assert accuracy > 0.5
+    assert [r['max_depth'] for r in trials.results] == [2, 4]
+
+
+def test_threshold_sweep_matches_sklearn_and_bootstrap_covers_estimate():
+    x_train, x_test, y_train, y_test = SplitData(*make_dataset(n_rows=2000)).split_data()
+    models = {'forest': RandomForestClassifier(n_estimators=20, random_state=0).fit(x_train, y_train),
+              'logistic': LogisticRegression().fit(x_train, y_train)}
+    evaluator = EvaluateModel()
+
+    accuracy, precision, recall, f1, roc_auc, y_pred = evaluator.evaluate_model(models['forest'], x_test, y_test)
+    scores = models['forest'].predict_proba(x_test)[:, 1]
+    assert (y_pred == models['forest'].predict(x_test)).all()
+    assert np.allclose([accuracy, precision, recall, f1, roc_auc],
+                       [accuracy_score(y_test, y_pred), precision_score(y_test, y_pred),
+                        recall_score(y_test, y_pred), f1_score(y_test, y_pred), roc_auc_score(y_test, scores)])
+
+    # rounded scores exercise ties; every row is the rule score >= threshold
+    scores = np.round(scores, 1)
+    value = x_test['f1'].abs().to_numpy()
+    curve = evaluator.threshold_curve(y_test, scores, cost_fp=1.0, cost_fn=value)
+    assert np.isclose(evaluator.roc_auc(curve), roc_auc_score(y_test, scores))
+    assert np.isclose(evaluator.average_precision(curve), average_precision_score(y_test, scores))
+    for _, row in curve.iloc[1:].iterrows():
+        flagged = scores >= row['threshold']
+        assert row['tp'] == (flagged & (y_test == 1)).sum() and row['fp'] == (flagged & (y_test == 0)).sum()
+        expected = (flagged & (y_test == 0)).sum() + value[~flagged & (y_test == 1).to_numpy()].sum()
+        assert np.isclose(row['expected_cost'], expected / len(y_test))
+    best = evaluator.best_threshold(curve)
+    assert best['expected_cost'] == curve['expected_cost'].min()
+
+    ci = evaluator.bootstrap_ci(y_test, scores, threshold=0.5, n_boot=200, max_cells=20000)
+    assert list(ci.index) == ['roc_auc', 'average_precision', 'precision', 'recall', 'f1']
+    assert np.isclose(ci.loc['roc_auc', 'estimate'], roc_auc_score(y_test, scores))
+    assert np.isclose(ci.loc['f1', 'estimate'], f1_score(y_test, scores >= 0.5))
+    assert (ci['lower'] <= ci['estimate']).all() and (ci['estimate'] <= ci['upper']).all()
+    assert (ci['upper'] - ci['lower'] > 0).all()
+
+    summary, curves = evaluator.evaluate_models(models, x_test, y_test, cost_fn=5.0)
+    assert list(summary['model']) == ['forest', 'logistic'] and set(curves) == set(models)
+    assert summary.loc[0, 'roc_auc'] == evaluator.roc_auc(curves['forest'])
+    assert (summary['best_expected_cost'] <= curves['logistic']['expected_cost'].iloc[0]).all()
+
+
+def test_peak_memory_is_skipped_without_proc_or_resource(monkeypatch):
+    def no_proc(field):
+        raise OSError('no /proc')
+
+    monkeypatch.setattr(model_training, '_rss_mb', no_proc)
+    monkeypatch.setitem(sys.modules, 'resource', None)
+    assert model_training._peak_memory_mb(100.0) is None
@@ -0,0 +1,37 @@
+from src.model_tuning import SuccessiveHalvingSearch
+from tests.test_model_training import make_dataset
+
+
+def test_successive_halving_search_resumes_from_results(tmp_path):
+    x, y = make_dataset(n_rows=900)
+    results_path = str(tmp_path / 'trials.jsonl')
+
+    search = SuccessiveHalvingSearch(x, y, results_path, n_candidates=9, eta=3, n_workers=2)
+    report = search.run()
+
+    assert list(report['family']) == ['decision_tree', 'random_forest', 'xgboost']
+    # 9 candidates, then 3, then 1 per family
+    assert report['trials'].tolist() == [13, 13, 13]
+    by_rung = [r['n_rows'] for r in search.results if r['family'] == 'xgboost']
+    assert by_rung[0] < by_rung[-1]
+    assert search.fit_best('random_forest').predict(x.to_numpy()).shape == (900,)
+
+    with open(results_path) as f:
+        lines = f.readlines()
+    # drop the last rung of xgboost as if the search had been interrupted
+    with open(results_path, 'w') as f:
+        f.writelines(lines[:-1])
+
+    resumed = SuccessiveHalvingSearch(x, y, results_path, n_candidates=9, eta=3)
+    resumed_report = resumed.run()
+
+    assert len(resumed.results) == len(lines)
+    assert resumed_report['best_params'].tolist() == report['best_params'].tolist()
+
+    # another dataset or other settings do not reuse those scores
+    changed = SuccessiveHalvingSearch(x, 1 - y, results_path, n_candidates=9, eta=3)
+    assert changed.results == []
+    assert SuccessiveHalvingSearch(x, y, results_path, n_candidates=9, eta=3, n_splits=2).results == []
+    changed.run(families=('decision_tree',))
+    assert len(changed.results) == 13
+    assert len(SuccessiveHalvingSearch(x, y, results_path, n_candidates=9, eta=3).results) == len(lines)